@@ -0,0 +1,162 @@
+#Per-simulator gate cost model, fit to the output of the *_gates.py microbenchmarks
+
+import click
+import csv
+import json
+import math
+import os.path
+import sys
+
+# For each simulator and gate, the mean time per gate is fit as an exponential in width,
+#
+#     time(n) = 2^(intercept + slope * n)
+#
+# by least squares on log2(time). Measured widths are predicted from the measured means directly, and the fit is
+# only used to extrapolate to other widths. A circuit's time is predicted as the sum, over its gate census, of
+# count * time(n).
+
+# Gate names used by the frameworks' circuit objects, mapped to the names used by the microbenchmarks
+GATE_ALIASES = {
+    'cnot': 'cx',
+    'cu1': 'cp',
+    'cphase': 'cp',
+    'czpowgate': 'cp',
+    'sdg': 's',
+    'adjs': 's',
+    'tdg': 't',
+    'adjt': 't',
+    'unitary': 'mtrx',
+    'u': 'mtrx',
+    'u3': 'mtrx',
+    'matrixgate': 'mtrx',
+    'matrix': 'mtrx',
+    'sx': 'mtrx',
+    'rx': 'mtrx',
+    'ry': 'mtrx',
+    'rz': 'mtrx',
+    'p': 'mtrx'
+}
+
+IGNORED_GATES = 'measure', 'barrier', 'reset'
+
+def load_rows(filenames):
+    rows = []
+    for filename in filenames:
+        with open(filename) as csvfile:
+            for row in csv.DictReader(csvfile):
+                t = float(row['time'])
+                # Failed samples are recorded as -999. Other negative times are noise, from subtracting a baseline run,
+                # and are kept, so the fit is not biased upward for cheap gates.
+                if t == -999:
+                    continue
+                rows.append((row['name'], row['gate'], int(row['num_qubits']), int(row['target']), t))
+    return rows
+
+def mean(values):
+    return sum(values) / len(values)
+
+def fit_line(xs, ys):
+    if len(xs) < 2:
+        return ys[0], 0.0
+    x_mean = mean(xs)
+    y_mean = mean(ys)
+    var = sum((x - x_mean) ** 2 for x in xs)
+    if var == 0:
+        return y_mean, 0.0
+    slope = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / var
+    return y_mean - slope * x_mean, slope
+
+def fit_model(rows):
+    by_width = {}
+    by_target = {}
+    for name, gate, n, target, t in rows:
+        by_width.setdefault((name, gate, n), []).append(t)
+        by_target.setdefault((name, gate, n, target), []).append(t)
+
+    model = {}
+    for (name, gate, n), times in by_width.items():
+        entry = model.setdefault(name, {}).setdefault(gate, { 'widths': {}, 'targets': {} })
+        entry['widths'][str(n)] = mean(times)
+    for (name, gate, n, target), times in by_target.items():
+        model[name][gate]['targets'].setdefault(str(n), {})[str(target)] = mean(times)
+
+    for name in model:
+        for gate, entry in model[name].items():
+            points = [(int(n), math.log2(t)) for n, t in entry['widths'].items() if t > 0]
+            if len(points) == 0:
+                entry['intercept'], entry['slope'] = -math.inf, 0.0
+                continue
+            entry['intercept'], entry['slope'] = fit_line([p[0] for p in points], [p[1] for p in points])
+
+    return model
+
+def gate_time(entry, num_qubits):
+    if str(num_qubits) in entry['widths']:
+        return entry['widths'][str(num_qubits)]
+    return 2 ** (entry['intercept'] + entry['slope'] * num_qubits)
+
+def predict(model, name, num_qubits, census):
+    if name not in model:
+        raise click.BadParameter('No gate costs for simulator: ' + name)
+    costs = model[name]
+
+    prediction = {}
+    for gate, count in census.items():
+        g = gate.lower()
+        if g in IGNORED_GATES:
+            continue
+        g = GATE_ALIASES.get(g, g)
+        if g not in costs:
+            if 'mtrx' not in costs:
+                raise click.BadParameter('No cost for gate "{0}" (or mtrx) for simulator: {1}'.format(gate, name))
+            # Unmeasured gates are costed as an arbitrary single qubit gate
+            print('No cost for gate "{0}", costed as mtrx'.format(gate), file=sys.stderr)
+            g = 'mtrx'
+        prediction[gate] = count * gate_time(costs[g], num_qubits)
+
+    return prediction
+
+def load_census(census):
+    if os.path.isfile(census):
+        with open(census) as f:
+            census = f.read()
+    return json.loads(census)
+
+
+
+@click.group()
+def cli():
+    pass
+
+@cli.command()
+@click.argument('data', nargs=-1, required=True)
+@click.option('--out', default='gate_cost_model.json', help='Where to store the JSON cost model')
+def fit(data, out):
+    """Fit a gate cost model to one or more *_gates.py CSV outputs."""
+    model = fit_model(load_rows(data))
+    with open(out, 'w') as f:
+        json.dump(model, f, indent=2)
+
+    for name in sorted(model):
+        print(name)
+        for gate in sorted(model[name]):
+            entry = model[name][gate]
+            print("  {0:6s} time(n) = 2^({1:.3f} + {2:.3f} * n) s".format(gate, entry['intercept'], entry['slope']))
+
+@cli.command(name='predict')
+@click.option('--model', 'model_file', default='gate_cost_model.json', help='JSON cost model written by "fit"')
+@click.option('--name', required=True, help='Simulator name, as in the "name" column of the microbenchmark, e.g. qiskit_gates')
+@click.option('--qubits', required=True, type=int, help='Circuit width')
+@click.option('--census', required=True, help='Gate counts, as a JSON object (such as the gate_counts column of a benchmark CSV) or a path to a JSON file')
+def predict_command(model_file, name, qubits, census):
+    """Predict a circuit's time from its gate census."""
+    with open(model_file) as f:
+        model = json.load(f)
+    prediction = predict(model, name, qubits, load_census(census))
+
+    for gate in sorted(prediction):
+        print("{0:10s} {1:.6e} s".format(gate, prediction[gate]))
+    print("{0:10s} {1:.6e} s".format('total', sum(prediction.values())))
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,207 @@
+#CPU affinity and NUMA memory binding policies for benchmark runs, with a run-to-run variance report per policy
+
+import click
+import csv
+import glob
+import os
+import os.path
+import shutil
+import statistics
+import subprocess
+import tempfile
+
+from benchmark_telemetry import read_point_means
+from benchmark_csv import has_header
+
+# Policies choose the CPUs a benchmark may run on, from those this process may use:
+#
+#   none:    no pinning (every available CPU, and the OS may migrate threads between them)
+#   compact: fill hardware threads in order, core by core, socket by socket
+#   scatter: one hardware thread per physical core, alternating sockets, before any second thread of a core
+#   socket:  every hardware thread of one socket
+#   cpus:    an explicit CPU list, such as 0-7,16
+#
+# The memory binding is "none", "local" (the NUMA nodes of the chosen CPUs) or an explicit node list, and is applied
+# with numactl --membind. Benchmarks run with OMP_NUM_THREADS set to the number of CPUs chosen, and with
+# BENCHMARK_AFFINITY describing the policy, which telemetry (see benchmark_telemetry.py) records with the CPU set.
+#
+# Run as a script, this repeats one benchmark command under each policy, interleaving the policies so that drift in
+# the machine's state affects them alike, and reports the coefficient of variation (stdev / mean) of each point's mean
+# time (per series of rows, for scripts that write several per sample) across repeats:
+#
+#     python3 benchmark_affinity.py --policies none,compact,scatter,socket --threads 8 --repeats 5 -- \
+#         python3 qiskit/qiskit_sycamore.py --single True --qubits 26 --samples 3 --out sycamore_26.csv
+
+POLICIES = 'none', 'compact', 'scatter', 'socket', 'cpus'
+
+def parse_cpu_list(text):
+    cpus = []
+    for part in text.strip().split(','):
+        if part == '':
+            continue
+        if '-' in part:
+            lo, hi = part.split('-')
+            cpus.extend(range(int(lo), int(hi) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+def format_cpu_list(cpus):
+    return ','.join(str(c) for c in cpus)
+
+def read_int(path, default):
+    try:
+        with open(path) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return default
+
+# Socket, physical core and NUMA node of every CPU available to this process, from sysfs
+def cpu_topology():
+    topology = {}
+    for c in sorted(os.sched_getaffinity(0)):
+        base = '/sys/devices/system/cpu/cpu{0}/topology/'.format(c)
+        topology[c] = { 'socket': read_int(base + 'physical_package_id', 0), 'core': read_int(base + 'core_id', c), 'node': 0 }
+    for path in glob.glob('/sys/devices/system/node/node[0-9]*'):
+        node = int(os.path.basename(path)[len('node'):])
+        with open(os.path.join(path, 'cpulist')) as f:
+            for c in parse_cpu_list(f.read()):
+                if c in topology:
+                    topology[c]['node'] = node
+    return topology
+
+# Order CPUs by how a policy fills them
+def order_cpus(cpus, policy, topology):
+    if policy == 'scatter':
+        cores = {}
+        for c in sorted(cpus):
+            cores.setdefault((topology[c]['socket'], topology[c]['core']), []).append(c)
+        # Rank of each CPU among the hardware threads of its core, and of its core within its socket
+        thread_rank = {}
+        core_rank = {}
+        for members in cores.values():
+            for i, c in enumerate(members):
+                thread_rank[c] = i
+        for socket in set(s for s, core in cores.keys()):
+            for i, key in enumerate(sorted(k for k in cores.keys() if k[0] == socket)):
+                for c in cores[key]:
+                    core_rank[c] = i
+        return sorted(cpus, key=lambda c: (thread_rank[c], core_rank[c], topology[c]['socket'], c))
+    return sorted(cpus, key=lambda c: (topology[c]['socket'], topology[c]['core'], c))
+
+def select_cpus(policy, threads=None, socket=0, cpu_list='', topology=None):
+    if topology is None:
+        topology = cpu_topology()
+    available = sorted(topology.keys())
+    if policy == 'none':
+        return available
+    if policy == 'cpus':
+        cpus = [c for c in parse_cpu_list(cpu_list) if c in topology]
+        if len(cpus) == 0:
+            raise ValueError('No available CPUs in list: ' + cpu_list)
+        return cpus
+    if policy == 'socket':
+        cpus = [c for c in available if topology[c]['socket'] == socket]
+        if len(cpus) == 0:
+            raise ValueError('No available CPUs on socket ' + str(socket))
+        return cpus[:threads] if threads else cpus
+    if policy not in POLICIES:
+        raise ValueError('Unknown affinity policy: ' + policy)
+    cpus = order_cpus(available, policy, topology)
+    return sorted(cpus[:threads] if threads else cpus)
+
+def memory_nodes(membind, cpus, topology):
+    if membind == 'none':
+        return []
+    if membind == 'local':
+        return sorted(set(topology[c]['node'] for c in cpus))
+    return parse_cpu_list(membind)
+
+# Command prefix that binds memory to the given NUMA nodes, or nothing without nodes or numactl
+def membind_prefix(nodes):
+    if len(nodes) == 0 or shutil.which('numactl') is None:
+        return []
+    return ['numactl', '--membind=' + format_cpu_list(nodes)]
+
+def describe(policy, cpus, nodes):
+    return '{0} cpus={1} membind={2}'.format(policy, format_cpu_list(cpus), format_cpu_list(nodes) if len(nodes) > 0 else 'none')
+
+def run_pinned(command, cpus, nodes, description, env=None):
+    env = dict(os.environ if env is None else env, OMP_NUM_THREADS=str(len(cpus)), BENCHMARK_AFFINITY=description)
+    return subprocess.call(membind_prefix(nodes) + list(command), env=env, stdout=subprocess.DEVNULL, preexec_fn=lambda: os.sched_setaffinity(0, cpus))
+
+# Reporting
+def create_csv(filename, headers):
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+def coefficient_of_variation(xs):
+    if len(xs) < 2 or statistics.mean(xs) == 0:
+        return None
+    return statistics.stdev(xs) / statistics.mean(xs)
+
+@click.command(context_settings={ 'ignore_unknown_options': True })
+@click.argument('command', nargs=-1, type=click.UNPROCESSED, required=True)
+@click.option('--policies', default='none,compact,scatter,socket', help='Comma-separated policies to compare: ' + ', '.join(POLICIES))
+@click.option('--threads', default=0, help='CPUs per run, for compact and scatter (0 for every available CPU)')
+@click.option('--socket', default=0, help='Socket for the socket policy')
+@click.option('--cpus', 'cpu_list', default='', help='CPU list for the cpus policy, such as 0-7,16')
+@click.option('--membind', default='local', help='Memory binding: none, local, or a NUMA node list')
+@click.option('--repeats', default=5, help='Runs of the command under each policy')
+@click.option('--out', default='affinity_data.csv', help='Where to store the mean time of each point, in each run')
+@click.option('--report', default='affinity_report.csv', help='Where to store the variance report, per policy')
+def benchmark(command, policies, threads, socket, cpu_list, membind, repeats, out, report):
+    if membind != 'none' and shutil.which('numactl') is None:
+        print('numactl not found: memory is not bound')
+        membind = 'none'
+
+    topology = cpu_topology()
+    settings = []
+    for policy in policies.split(','):
+        cpus = select_cpus(policy, threads, socket, cpu_list, topology)
+        nodes = memory_nodes(membind, cpus, topology) if policy != 'none' else []
+        settings.append((policy, cpus, nodes))
+
+    writer = create_csv(out, ['name', 'policy', 'cpus', 'membind', 'repeat', 'point', 'time'])
+    means = { policy: {} for policy, cpus, nodes in settings }
+    telemetry = os.path.join(tempfile.mkdtemp(), 'telemetry.jsonl')
+
+    for r in range(repeats):
+        for policy, cpus, nodes in settings:
+            description = describe(policy, cpus, nodes)
+            print('repeat {0}: {1}'.format(r + 1, description), flush=True)
+            if os.path.exists(telemetry):
+                os.remove(telemetry)
+            returncode = run_pinned(command, cpus, nodes, description, dict(os.environ, BENCHMARK_TELEMETRY=telemetry))
+            if returncode != 0:
+                print('  exited with ' + str(returncode))
+            for point, t in read_point_means(telemetry).items():
+                means[policy].setdefault(point, []).append(t)
+                write_csv(writer, {'name': 'affinity', 'policy': policy, 'cpus': format_cpu_list(cpus), 'membind': format_cpu_list(nodes), 'repeat': r + 1, 'point': point, 'time': t})
+
+    report_writer = create_csv(report, ['name', 'policy', 'cpus', 'membind', 'repeats', 'points', 'mean_time', 'median_cv', 'max_cv'])
+    rows = []
+    for policy, cpus, nodes in settings:
+        cvs = [cv for cv in (coefficient_of_variation(ts) for ts in means[policy].values()) if cv is not None]
+        times = [t for ts in means[policy].values() for t in ts]
+        row = {'name': 'affinity', 'policy': policy, 'cpus': format_cpu_list(cpus), 'membind': format_cpu_list(nodes), 'repeats': repeats, 'points': len(means[policy]),
+               'mean_time': statistics.mean(times) if len(times) > 0 else '', 'median_cv': statistics.median(cvs) if len(cvs) > 0 else '', 'max_cv': max(cvs) if len(cvs) > 0 else ''}
+        write_csv(report_writer, row)
+        rows.append(row)
+
+    print()
+    print('{0:10s} {1:>12s} {2:>12s} {3:>12s}'.format('policy', 'mean time', 'median cv', 'max cv'))
+    for row in sorted(rows, key=lambda row: (row['median_cv'] == '', row['median_cv'])):
+        print('{0:10s} {1:>12s} {2:>12s} {3:>12s}'.format(row['policy'], *('{0:.4g}'.format(row[k]) if row[k] != '' else '-' for k in ('mean_time', 'median_cv', 'max_cv'))))
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,2 @@
+# Jobs, width splits and core sets are in benchmark_all_cpu.json
+python3 benchmark_orchestrator.py benchmark_all_cpu.json --out=orchestrator_cpu.csv
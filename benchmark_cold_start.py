@@ -0,0 +1,198 @@
+#Cold start of each simulator stack: interpreter startup, framework import, backend construction and first result
+
+import click
+import csv
+import json
+import os
+import os.path
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmark_csv import has_header
+
+# Every run is a fresh interpreter (python -c probe), which times, in order:
+#
+#   startup:      from spawning the interpreter to the first line of the probe
+#   import:       importing the framework, as the benchmark scripts do at module load
+#   backend:      constructing the simulator backend, as the scripts do at module load or per width
+#   first_result: building a two qubit Bell circuit and running it to a measured result
+#   total:        the whole process, from spawn to exit (so including interpreter teardown)
+#
+# Failed runs record -999 for every phase, with the exit status (or "timeout") in the returncode column, and the end of
+# their stderr is printed.
+#
+# Tracing imports slows them down, so the import breakdown comes from separate runs, with -X importtime, after the timed
+# runs. Its output (on stderr) is kept per module, and the modules with the most cumulative import time are written, as
+# medians over runs, to the import breakdown CSV. Only the first timed run of a stack is cold for the page cache; the
+# run column tells them apart.
+
+PHASES = 'startup', 'import', 'backend', 'first_result', 'total'
+
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference')
+
+# Each stack is (imports, backend, first result), as Python source
+stacks = {
+    'qiskit': (
+        "from qiskit import QuantumCircuit, execute, Aer",
+        "sim_backend = Aer.get_backend('qasm_simulator')",
+        "circ = QuantumCircuit(2, 2); circ.h(0); circ.cx(0, 1); circ.measure(0, 0); circ.measure(1, 1); execute([circ], sim_backend, shots=1).result()"
+    ),
+    'qiskit_gpu': (
+        "from qiskit import QuantumCircuit, execute; from qiskit.providers.aer import QasmSimulator",
+        "sim_backend = QasmSimulator(shots=1, method='statevector_gpu')",
+        "circ = QuantumCircuit(2, 2); circ.h(0); circ.cx(0, 1); circ.measure(0, 0); circ.measure(1, 1); execute([circ], sim_backend, shots=1).result()"
+    ),
+    'qiskit_qrack': (
+        "from qiskit import QuantumCircuit, execute; from qiskit.providers.qrack import QasmSimulator",
+        "sim_backend = QasmSimulator()",
+        "circ = QuantumCircuit(2, 2); circ.h(0); circ.cx(0, 1); circ.measure(0, 0); circ.measure(1, 1); execute([circ], sim_backend, shots=1).result()"
+    ),
+    'cirq': (
+        "import cirq",
+        "sim_backend = cirq.Simulator()",
+        "reg = cirq.LineQubit.range(2); circ = cirq.Circuit([cirq.H(reg[0]), cirq.CNOT(reg[0], reg[1]), cirq.measure(*reg, key='m')]); sim_backend.run(program=circ, repetitions=1)"
+    ),
+    'pyquil': (
+        "from pyquil import get_qc, Program; from pyquil.gates import H, CNOT",
+        "sim_backend = get_qc('2q-qvm')",
+        "sim_backend.run_and_measure(Program(H(0), CNOT(0, 1)), trials=1)"
+    ),
+    'projectq': (
+        "from projectq import MainEngine; import projectq.ops as ops",
+        "eng = MainEngine()",
+        "reg = eng.allocate_qureg(2); ops.H | reg[0]; ops.CNOT | (reg[0], reg[1]); ops.All(ops.Measure) | reg; eng.flush()"
+    ),
+    'pyqrack': (
+        "from pyqrack import QrackSimulator",
+        "sim = QrackSimulator(2)",
+        "sim.h(0); sim.mcx([0], 1); sim.m_all()"
+    ),
+    'qcgpu': (
+        "import qcgpu",
+        "state = qcgpu.State(2); state.backend.queue.finish()",
+        "state.h(0); state.cx(0, 1); state.measure(); state.backend.queue.finish()"
+    ),
+    'reference': (
+        "import sys; sys.path.append(" + repr(REFERENCE_PATH) + "); from reference_engine import StateVector",
+        "sim = StateVector(2)",
+        "sim.run([('h', (0,)), ('cx', (0, 1))]); sim.measure_all()"
+    )
+}
+
+PROBE = """import time as _time, json as _json
+_t0 = _time.time()
+{0}
+_t1 = _time.time()
+{1}
+_t2 = _time.time()
+{2}
+_t3 = _time.time()
+print(_json.dumps({{ 'start': _t0, 'import': _t1 - _t0, 'backend': _t2 - _t1, 'first_result': _t3 - _t2 }}))
+"""
+
+# Parse -X importtime lines ("import time: self [us] | cumulative | imported package") into
+# (module, depth, self seconds, cumulative seconds)
+def parse_importtime(stderr):
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        modules.append((stripped, (len(name) - len(stripped) - 1) // 2, int(fields[0]) / 1e6, int(fields[1]) / 1e6))
+    return modules
+
+# The last lines of a failed run's stderr, without any -X importtime lines
+def log_failure(stack, reason, stderr, lines=10):
+    tail = [line for line in (stderr or '').splitlines() if not line.startswith('import time:')][-lines:]
+    print('{0} failed ({1}):'.format(stack, reason), file=sys.stderr)
+    for line in tail:
+        print('    ' + line, file=sys.stderr)
+
+# Run the probe for a stack in a fresh interpreter, and return its phase times and its stderr
+def run_probe(stack, timeout, importtime=False):
+    imports, backend, first = stacks[stack]
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', PROBE.format(imports, backend, first)]
+    failed = { phase: -999 for phase in PHASES }
+    start = time.time()
+    try:
+        proc = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, timeout=timeout)
+    except subprocess.TimeoutExpired as e:
+        log_failure(stack, 'timeout', e.stderr.decode(errors='replace') if isinstance(e.stderr, bytes) else e.stderr)
+        return dict(failed, returncode='timeout'), ''
+    total = time.time() - start
+    if proc.returncode != 0:
+        log_failure(stack, 'exit {0}'.format(proc.returncode), proc.stderr)
+        return dict(failed, returncode=proc.returncode), ''
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    times = { 'startup': result['start'] - start, 'import': result['import'], 'backend': result['backend'], 'first_result': result['first_result'], 'total': total, 'returncode': 0 }
+    return times, proc.stderr
+
+# Reporting
+def create_csv(filename, headers):
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+@click.command()
+@click.option('--stacks', 'stack_names', default=','.join(stacks.keys()), help='Comma-separated simulator stacks: ' + ', '.join(stacks.keys()))
+@click.option('--runs', default=5, help='Fresh interpreters per stack')
+@click.option('--breakdown-runs', default=3, help='Fresh interpreters per stack, with -X importtime, for the import breakdown')
+@click.option('--timeout', default=600, help='Seconds before a run is abandoned')
+@click.option('--top', default=15, help='Modules with the most cumulative import time to keep, per stack')
+@click.option('--out', default='cold_start_data.csv', help='Where to store the phase times of each run')
+@click.option('--imports-out', default='cold_start_imports.csv', help='Where to store the import time breakdown of each stack')
+def benchmark(stack_names, runs, breakdown_runs, timeout, top, out, imports_out):
+    names = stack_names.split(',')
+    for name in names:
+        if name not in stacks:
+            raise click.BadParameter('Unknown stack: ' + name)
+
+    writer = create_csv(out, ['name', 'stack', 'run', 'startup', 'import', 'backend', 'first_result', 'total', 'returncode'])
+    imports_writer = create_csv(imports_out, ['name', 'stack', 'module', 'depth', 'self_time', 'cumulative_time', 'runs'])
+    phases = { name: {} for name in names }
+    modules = { name: {} for name in names }
+
+    # Interleave the stacks, so that each one's runs are spread over the same period
+    for r in range(runs):
+        for name in names:
+            times, stderr = run_probe(name, timeout)
+            write_csv(writer, {'name': 'cold_start', 'stack': name, 'run': r + 1, **times})
+            if times['returncode'] != 0:
+                continue
+            for phase in PHASES:
+                phases[name].setdefault(phase, []).append(times[phase])
+
+    for r in range(breakdown_runs):
+        for name in names:
+            times, stderr = run_probe(name, timeout, importtime=True)
+            for module, depth, self_time, cumulative in parse_importtime(stderr):
+                modules[name].setdefault((module, depth), []).append((self_time, cumulative))
+
+    for name in names:
+        medians = [(module, depth, statistics.median(t[0] for t in ts), statistics.median(t[1] for t in ts), len(ts)) for (module, depth), ts in modules[name].items()]
+        for module, depth, self_time, cumulative, count in sorted(medians, key=lambda m: -m[3])[:top]:
+            write_csv(imports_writer, {'name': 'cold_start', 'stack': name, 'module': module, 'depth': depth, 'self_time': self_time, 'cumulative_time': cumulative, 'runs': count})
+
+    print('{0:14s} {1:>10s} {2:>10s} {3:>10s} {4:>12s} {5:>10s}'.format('stack', 'startup', 'import', 'backend', 'first result', 'total'))
+    for name in names:
+        if len(phases[name]) == 0:
+            print('{0:14s} failed'.format(name))
+            continue
+        print('{0:14s} {1:>10.3f} {2:>10.3f} {3:>10.3f} {4:>12.3f} {5:>10.3f}'.format(name, *(statistics.median(phases[name][p]) for p in PHASES)))
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,27 @@
+#CSV output checks shared by the benchmark scripts
+
+import csv
+import os.path
+
+import click
+
+# Scripts in the simulator directories import this with:
+#
+#     sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+#     from benchmark_csv import has_header
+#
+# Every script appends to its --out file, and writes a header only to a new one. Appending rows under a different
+# header (such as one from before the census or timing columns) would misalign every column, so that is refused, as
+# qrack/qrack_benchmarks.hpp does. An empty file gets a header, as a new one does.
+
+def has_header(filename, headers):
+    if not os.path.isfile(filename) or os.path.getsize(filename) == 0:
+        return False
+
+    with open(filename, newline='') as f:
+        existing = next(csv.reader(f), [])
+
+    if existing != list(headers):
+        raise click.ClickException('Existing file {0} has a different header ({1}); expected {2}. Choose a new --out file.'.format(filename, ','.join(existing), ','.join(headers)))
+
+    return True
@@ -0,0 +1,238 @@
+#Run a combined experiment spec of benchmark scripts concurrently, on disjoint core sets, and track interference
+
+import asyncio
+import click
+import csv
+import json
+import os
+import os.path
+import statistics
+import sys
+import time
+
+from benchmark_affinity import cpu_topology, describe, memory_nodes, membind_prefix, order_cpus
+from benchmark_telemetry import read_point_means
+from benchmark_csv import has_header
+
+# The spec is a JSON file, such as benchmark_all_gpu.json:
+#
+#     {
+#         "env": { "PYOPENCL_CTX": "0" },
+#         "jobs": [
+#             { "name": "pyqrack_qft", "script": "pyqrack/pyqrack_qft.py", "args": ["--out=pyqrack_qft.csv"],
+#               "qubits": 28, "split": 20, "cores": 7, "resources": [], "affinity": "compact", "membind": "local" },
+#             ...
+#         ]
+#     }
+#
+# A job with a "split" width becomes two tasks. The small half (widths up to the split) runs on its own set of "cores"
+# cores, concurrently with the small halves of other jobs. The large half runs the remaining widths one at a time
+# (with --single True), on every core, alone. A job without a split is one task, with "cores" cores, or alone if
+# "cores" is "all". Tasks that name the same "resources" (such as "gpu") never run at the same time.
+#
+# Tasks that can share the machine start first, in spec order, as soon as their cores and resources are free. Then the
+# tasks that must run alone follow, one at a time. Each task is pinned to its cores with sched_setaffinity, and
+# OMP_NUM_THREADS is set to its core count. Core sets are planned once, before anything runs: in spec order, each task
+# takes the cores its job's "affinity" policy (see benchmark_affinity.py) picks from those not yet planned, "compact"
+# (the default) or "scatter", and once the machine is used up, planning starts over from every core (so those tasks wait
+# for the earlier tasks on their cores to finish). A job's "membind" ("none", the default, "local" or a node list) binds
+# its memory to NUMA nodes with numactl.
+#
+# Interference: before the concurrent run, the small half of each job is calibrated alone, on its planned cores, at its
+# largest width, with --samples calibration_samples + 1. Every task streams telemetry (see benchmark_telemetry.py) to
+# the run directory, and each point that both runs share is compared by its mean sample time, leaving out the first
+# sample of each point in both runs: the solo run's first sample pays for the cold start (imports, allocation, caches)
+# that the concurrent run paid for at narrower widths. The interference column is the median of concurrent / solo over
+# those points: 1.0 means the neighbors cost nothing. A task that never ran alongside another one (such as each GPU job
+# in benchmark_all_gpu.json, which all share the "gpu" resource) has no interference to measure, and the column is empty.
+
+class Task:
+    def __init__(self, name, job, commands, cores, resources):
+        self.name = name
+        self.job = job
+        self.commands = commands
+        self.cores = cores
+        self.resources = set(resources)
+        self.assigned = []
+        self.start = None
+        self.wall = None
+        self.returncode = None
+
+    def alone(self):
+        return self.cores == 'all'
+
+def script_command(job, args):
+    return [sys.executable, job['script']] + job.get('args', []) + args
+
+def make_tasks(spec):
+    tasks = []
+    for job in spec['jobs']:
+        cores = job.get('cores', 1)
+        resources = job.get('resources', [])
+        if 'split' in job:
+            split = job['split']
+            qubits = job['qubits']
+            tasks.append(Task(job['name'] + '_small', job, [script_command(job, ['--qubits', str(split)])], cores, resources))
+            large = [script_command(job, ['--single', 'True', '--qubits', str(w)]) for w in range(split + 1, qubits + 1)]
+            if len(large) > 0:
+                tasks.append(Task(job['name'] + '_large', job, large, 'all', resources))
+        else:
+            args = ['--qubits', str(job['qubits'])] if 'qubits' in job else []
+            tasks.append(Task(job['name'], job, [script_command(job, args)], cores, resources))
+    # Everything that can share the machine goes first
+    return [t for t in tasks if not t.alone()] + [t for t in tasks if t.alone()]
+
+def interference(solo, concurrent):
+    ratios = [concurrent[k] / solo[k] for k in solo if k in concurrent and solo[k] > 0]
+    if len(ratios) == 0:
+        return '', 0
+    return statistics.median(ratios), len(ratios)
+
+# Whether any other task was running at some point while this one was
+def had_neighbors(task, tasks):
+    end = task.start + task.wall
+    return any(other is not task and other.start is not None and other.start < end and task.start < other.start + other.wall for other in tasks)
+
+class Orchestrator:
+    def __init__(self, spec, run_dir):
+        self.env = dict(os.environ, **spec.get('env', {}))
+        self.run_dir = run_dir
+        self.topology = cpu_topology()
+        self.all_cores = sorted(self.topology.keys())
+        self.free_cores = list(self.all_cores)
+        self.busy_resources = set()
+        self.running = 0
+        self.changed = asyncio.Condition()
+
+    # Assign every task its core set, once, so that its solo calibration and its concurrent run use the same cores
+    def plan(self, tasks):
+        unplanned = list(self.all_cores)
+        for task in tasks:
+            if task.alone():
+                task.assigned = list(self.all_cores)
+                continue
+            count = min(task.cores, len(self.all_cores))
+            if len(unplanned) < count:
+                unplanned = list(self.all_cores)
+            cores = order_cpus(unplanned, task.job.get('affinity', 'compact'), self.topology)
+            task.assigned = sorted(cores[:count])
+            unplanned = [c for c in unplanned if c not in task.assigned]
+
+    def _fits(self, task):
+        if task.alone():
+            return self.running == 0
+        return all(c in self.free_cores for c in task.assigned) and len(task.resources & self.busy_resources) == 0
+
+    def _acquire(self, task):
+        self.free_cores = [c for c in self.free_cores if c not in task.assigned]
+        self.busy_resources |= task.resources
+        self.running += 1
+
+    def _release(self, task):
+        self.free_cores = sorted(self.free_cores + task.assigned)
+        self.busy_resources -= task.resources
+        self.running -= 1
+
+    async def _run_commands(self, task, commands, telemetry):
+        nodes = memory_nodes(task.job.get('membind', 'none'), task.assigned, self.topology)
+        description = describe(task.job.get('affinity', 'compact'), task.assigned, nodes)
+        env = dict(self.env, OMP_NUM_THREADS=str(len(task.assigned)), BENCHMARK_TELEMETRY=telemetry, BENCHMARK_AFFINITY=description)
+        cores = set(task.assigned)
+        if os.path.exists(telemetry):
+            os.remove(telemetry)
+        for command in commands:
+            proc = await asyncio.create_subprocess_exec(*(membind_prefix(nodes) + command), env=env, stdout=asyncio.subprocess.DEVNULL, preexec_fn=lambda: os.sched_setaffinity(0, cores))
+            returncode = await proc.wait()
+            if returncode != 0:
+                return returncode
+        return 0
+
+    async def _run(self, task):
+        task.start = time.time()
+        print('start  {0} on cores {1}'.format(task.name, ','.join(str(c) for c in task.assigned)), flush=True)
+        task.returncode = await self._run_commands(task, task.commands, os.path.join(self.run_dir, task.name + '.jsonl'))
+        task.wall = time.time() - task.start
+        print('finish {0} in {1:.1f}s (exit {2})'.format(task.name, task.wall, task.returncode), flush=True)
+        async with self.changed:
+            self._release(task)
+            self.changed.notify_all()
+
+    async def calibrate(self, tasks, samples):
+        for task in tasks:
+            if task.alone():
+                continue
+            self._acquire(task)
+            job = task.job
+            out = os.path.join(self.run_dir, task.name + '_solo.csv')
+            command = script_command(job, ['--single', 'True', '--qubits', str(job.get('split', job.get('qubits', 0))), '--samples', str(samples + 1), '--out', out])
+            print('solo   {0}'.format(task.name), flush=True)
+            await self._run_commands(task, [command], os.path.join(self.run_dir, task.name + '_solo.jsonl'))
+            self._release(task)
+
+    async def run(self, tasks):
+        pending = list(tasks)
+        running = []
+        while len(pending) > 0:
+            async with self.changed:
+                # Start every task that fits, in order, but nothing past a task that is waiting to run alone
+                started = []
+                for task in pending:
+                    if self._fits(task):
+                        self._acquire(task)
+                        started.append(task)
+                    elif task.alone():
+                        break
+                for task in started:
+                    pending.remove(task)
+                    running.append(asyncio.ensure_future(self._run(task)))
+                if len(pending) > 0:
+                    await self.changed.wait()
+        await asyncio.gather(*running)
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'task', 'cores', 'start', 'wall', 'returncode', 'interference', 'matched_points']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+@click.command()
+@click.argument('spec_path')
+@click.option('--run-dir', default='orchestrator_run', help='Where to keep telemetry and calibration output')
+@click.option('--calibrate', default=True, help='Calibrate each concurrent task alone first, to measure interference')
+@click.option('--calibration-samples', default=5, help='Samples per point in the solo calibration runs, after one warm-up sample')
+@click.option('--out', default='orchestrator_data.csv', help='Where to store the CSV output of each task')
+def orchestrate(spec_path, run_dir, calibrate, calibration_samples, out):
+    with open(spec_path) as f:
+        spec = json.load(f)
+    os.makedirs(run_dir, exist_ok=True)
+    tasks = make_tasks(spec)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    orchestrator = Orchestrator(spec, run_dir)
+    orchestrator.plan(tasks)
+    if calibrate:
+        loop.run_until_complete(orchestrator.calibrate(tasks, calibration_samples))
+    loop.run_until_complete(orchestrator.run(tasks))
+    loop.close()
+
+    writer = create_csv(out)
+    for task in tasks:
+        ratio, matched = '', 0
+        if calibrate and not task.alone() and task.start is not None and had_neighbors(task, tasks):
+            ratio, matched = interference(read_point_means(os.path.join(run_dir, task.name + '_solo.jsonl'), warmup=1), read_point_means(os.path.join(run_dir, task.name + '.jsonl'), warmup=1))
+        write_csv(writer, {'name': 'orchestrator', 'task': task.name, 'cores': len(task.assigned), 'start': task.start, 'wall': task.wall, 'returncode': task.returncode, 'interference': ratio, 'matched_points': matched})
+        if ratio != '':
+            print('{0}: interference {1:.3f} over {2} points'.format(task.name, ratio, matched))
+
+if __name__ == '__main__':
+    orchestrate()
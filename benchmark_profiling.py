@@ -0,0 +1,252 @@
+#Opt-in profiling of selected benchmark points, per phase, as collapsed stacks, pstats dumps and top-N tables
+
+import cProfile
+import csv
+import importlib
+import os
+import os.path
+import pstats
+import signal
+import sys
+import time
+
+from benchmark_csv import has_header
+
+# Scripts in the simulator directories import this with the usual sys.path entry for the repository root, and mark
+# points and phases alongside their telemetry:
+#
+#     profiler = Profiler(profile, profile_points, profile_dir, 'pyqrack_t_nn')
+#     pool = SimulatorPool(profiler.wrap('allocate', QrackSimulator), profiler.wrap('reset', lambda sim: sim.reset_all()))
+#     ...
+#     profiler.point(num_qubits=n+1, depth=d+1)
+#     t = pool.sample(n + 1, profiler.wrap('circuit', lambda sim: bench(sim, d + 1)))
+#     ...
+#     profiler.close()
+#
+# Modes:
+#
+#   off:      phases run as they are, at no cost
+#   cprofile: deterministic profiling with cProfile, dumped per point and phase as .prof files (for pstats, snakeviz or
+#             flameprof)
+#   sample:   a statistical profiler, on SIGPROF every interval of process CPU time, that records the Python stack of
+#             the main thread, below the phase. Stacks are written per point and phase as .folded files (one
+#             "frame;frame;... weight" line per stack, weight in microseconds) for flamegraph.pl or speedscope.
+#
+# Only the points matching --profile-points (such as "20:10,24", for width 20 at depth 10, and width 24 at any depth)
+# are profiled, or every point if it is empty. Profiles are summed over every sample of a point.
+#
+# A signal is only handled between Python bytecodes, so a sample that lands in a native call is taken when the call
+# returns, with the Python frame that made it as the leaf. Each sample is weighted by the time since the previous one,
+# so long native calls keep their weight. Time is split into three categories by its leaf (the innermost Python frame,
+# for samples, or the function itself, for cProfile self time):
+#
+#   native:   built-ins ("~"), such as C functions
+#   wrapper:  the installed package of a native wrapper module ("pyqrack", by default, matched by its package
+#             directory, so the benchmark scripts in this repository's pyqrack/ directory are not). These are the
+#             Python methods that marshal arguments for ctypes, such as mcx(). Neither profiler sees a ctypes foreign
+#             call as a function of its own, so its native time lands here too, with the marshalling: measure the
+#             split with pyqrack/pyqrack_dispatch.py.
+#   python:   everything else, the benchmark's own Python overhead: circuit construction and the benchmark loop
+#
+# <name>_phases.csv summarizes each profiled point and phase (wall time, time per category and the Python fraction), and
+# <name>_top.csv lists the functions with the most self time, with their category.
+
+PROFILE_MODES = 'off', 'cprofile', 'sample'
+
+def parse_points(text):
+    points = []
+    for part in text.split(','):
+        part = part.strip()
+        if part == '':
+            continue
+        fields = part.split(':')
+        point = { 'num_qubits': int(fields[0]) }
+        if len(fields) > 1:
+            point['depth'] = int(fields[1])
+        points.append(point)
+    return points
+
+def format_point(point):
+    return '_'.join('{0}{1}'.format(k, v) for k, v in point.items())
+
+# Directories of the installed packages of the given modules, skipping any that cannot be imported, or that resolve to
+# a plain directory (a namespace package, such as this repository's pyqrack/ when run from its root)
+def package_dirs(modules):
+    dirs = []
+    for m in modules:
+        try:
+            filename = getattr(importlib.import_module(m), '__file__', None)
+        except ImportError:
+            continue
+        if filename is not None:
+            dirs.append(os.path.dirname(os.path.abspath(filename)))
+    return dirs
+
+def frame_name(code):
+    return '{0} ({1}:{2})'.format(code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+
+class StackSampler:
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = {}
+        self.files = {}
+        self.root = None
+
+    def _handler(self, signum, frame):
+        now = time.perf_counter()
+        weight = now - self.last
+        self.last = now
+        stack = []
+        while frame is not None and frame is not self.root:
+            name = frame_name(frame.f_code)
+            self.files[name] = frame.f_code.co_filename
+            stack.append(name)
+            frame = frame.f_back
+        key = ';'.join(reversed(stack))
+        self.stacks[key] = self.stacks.get(key, 0) + weight
+
+    def start(self, root):
+        self.root = root
+        self.last = time.perf_counter()
+        self.previous = signal.signal(signal.SIGPROF, self._handler)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.previous)
+        self.root = None
+
+class Profiler:
+    def __init__(self, mode='off', points='', directory='profiles', name=None, interval=0.001, top=20, wrapper_modules=('pyqrack',)):
+        if mode not in PROFILE_MODES:
+            raise ValueError('Unknown profile mode: ' + mode)
+        self.mode = mode
+        self.points = parse_points(points)
+        self.directory = directory
+        self.name = name if name is not None else os.path.splitext(os.path.basename(sys.argv[0]))[0]
+        self.interval = interval
+        self.top = top
+        self.wrapper_dirs = package_dirs(wrapper_modules)
+        self.current = {}
+        self.active = False
+        # (point, phase) -> { 'blocks', 'wall', and 'stacks' (with the file of each frame) or 'stats' }
+        self.profiles = {}
+
+    def _selected(self, point):
+        if len(self.points) == 0:
+            return True
+        return any(all(point.get(k, v) == v for k, v in p.items()) for p in self.points)
+
+    # Start a point; like Telemetry.point(), with the point's key
+    def point(self, **key):
+        self.current = key
+        self.active = self.mode != 'off' and self._selected(key)
+
+    def _profile(self, phase):
+        key = (tuple(self.current.items()), phase)
+        return self.profiles.setdefault(key, { 'blocks': 0, 'wall': 0.0, 'stacks': {}, 'files': {}, 'stats': None })
+
+    # Run fn(*args) as a phase of the current point, profiled if the point is selected
+    def call(self, phase, fn, *args):
+        if not self.active:
+            return fn(*args)
+        profile = self._profile(phase)
+        start = time.perf_counter()
+        if self.mode == 'cprofile':
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(fn, *args)
+            finally:
+                profile['wall'] += time.perf_counter() - start
+                profile['blocks'] += 1
+                profiler.create_stats()
+                if profile['stats'] is None:
+                    profile['stats'] = pstats.Stats(profiler)
+                else:
+                    profile['stats'].add(profiler)
+        sampler = StackSampler(self.interval)
+        sampler.start(sys._getframe())
+        try:
+            return fn(*args)
+        finally:
+            sampler.stop()
+            profile['wall'] += time.perf_counter() - start
+            profile['blocks'] += 1
+            profile['files'].update(sampler.files)
+            for stack, weight in sampler.stacks.items():
+                stack = phase + (';' + stack if stack else '')
+                profile['stacks'][stack] = profile['stacks'].get(stack, 0) + weight
+
+    def wrap(self, phase, fn):
+        return lambda *args: self.call(phase, fn, *args)
+
+    def _category(self, filename):
+        if filename == '~':
+            return 'native'
+        filename = os.path.abspath(filename)
+        if any(filename.startswith(d + os.sep) for d in self.wrapper_dirs):
+            return 'wrapper'
+        return 'python'
+
+    # Self time per function, as (function, file, self time, calls) rows, most first
+    def _self_times(self, profile):
+        rows = []
+        if self.mode == 'cprofile':
+            for (filename, line, func), (cc, nc, tt, ct, callers) in profile['stats'].stats.items():
+                rows.append(('{0} ({1}:{2})'.format(func, os.path.basename(filename), line), filename, tt, nc))
+        else:
+            leaves = {}
+            for stack, weight in profile['stacks'].items():
+                leaf = stack.rsplit(';', 1)[-1]
+                leaves[leaf] = leaves.get(leaf, 0) + weight
+            for leaf, weight in leaves.items():
+                rows.append((leaf, profile['files'].get(leaf, ''), weight, ''))
+        return sorted(rows, key=lambda row: -row[2])
+
+    def _write(self, point, phase, profile):
+        base = os.path.join(self.directory, '{0}_{1}_{2}'.format(self.name, format_point(point), phase))
+        if self.mode == 'cprofile':
+            profile['stats'].dump_stats(base + '.prof')
+        else:
+            with open(base + '.folded', 'w') as f:
+                for stack, weight in sorted(profile['stacks'].items()):
+                    f.write('{0} {1}\n'.format(stack, int(round(weight * 1e6))))
+
+    def close(self):
+        if self.mode == 'off' or len(self.profiles) == 0:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        phases = create_csv(os.path.join(self.directory, self.name + '_phases.csv'), ['name', 'point', 'phase', 'mode', 'blocks', 'wall', 'profiled_time', 'native_time', 'wrapper_time', 'python_time', 'python_fraction'])
+        top = create_csv(os.path.join(self.directory, self.name + '_top.csv'), ['name', 'point', 'phase', 'mode', 'rank', 'function', 'self_time', 'self_fraction', 'calls', 'category'])
+
+        for (point, phase), profile in self.profiles.items():
+            point = dict(point)
+            self._write(point, phase, profile)
+            rows = self._self_times(profile)
+            total = sum(row[2] for row in rows)
+            times = { 'native': 0.0, 'wrapper': 0.0, 'python': 0.0 }
+            for row in rows:
+                times[self._category(row[1])] += row[2]
+            write_csv(phases, {'name': self.name, 'point': format_point(point), 'phase': phase, 'mode': self.mode, 'blocks': profile['blocks'], 'wall': profile['wall'],
+                               'profiled_time': total, 'native_time': times['native'], 'wrapper_time': times['wrapper'], 'python_time': times['python'],
+                               'python_fraction': times['python'] / total if total > 0 else ''})
+            for rank, (function, filename, self_time, calls) in enumerate(rows[:self.top]):
+                write_csv(top, {'name': self.name, 'point': format_point(point), 'phase': phase, 'mode': self.mode, 'rank': rank + 1, 'function': function,
+                                'self_time': self_time, 'self_fraction': self_time / total if total > 0 else '', 'calls': calls, 'category': self._category(filename)})
+            print('{0} {1}: {2:.3f}s over {3} blocks, {4:.1f}% Python, {5:.1f}% wrapper'.format(format_point(point), phase, profile['wall'], profile['blocks'],
+                  100 * times['python'] / total if total > 0 else 0, 100 * times['wrapper'] / total if total > 0 else 0))
+        self.profiles = {}
+
+# Reporting
+def create_csv(filename, headers):
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
@@ -0,0 +1,232 @@
+#Live telemetry for benchmark sweeps, as a JSON lines event stream to a file or a local UDP socket
+
+import atexit
+import json
+import math
+import os
+import resource
+import socket
+import statistics
+import sys
+import time
+
+# Scripts in the simulator directories import this with:
+#
+#     sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+#     from benchmark_telemetry import Telemetry, sweep
+#
+# Set BENCHMARK_TELEMETRY to a file path (events are appended to it) or to udp://host:port (one datagram per event) to
+# stream events, and watch them with telemetry_viewer.py. Without it, the usual progress bar is drawn on stdout, now
+# with an ETA. Every event is a JSON object with "event", "script", "pid" and "wall" (Unix time) fields:
+#
+#   start:   the planned points (such as width and depth pairs), the samples per point, and the CPU affinity (with the
+#            policy that chose it, from BENCHMARK_AFFINITY, as set by benchmark_affinity.py)
+#   point:   a point has started, with the fraction of the plan done before it, and the ETA
+#   sample:  a CSV row was written ("failure" instead, for a row with time -999)
+#   summary: a point has finished: sample and failure counts, time statistics, elapsed wall time, resource usage and ETA,
+#            one per series of rows written at that point (see below)
+#   end:     the sweep has finished, or the script is exiting
+#
+# The ETA fits log(wall time / depth) = a + b * num_qubits to the finished points, by least squares (state vector cost
+# is exponential in width and linear in depth), and sums its predictions over the points still to run. Until two
+# widths have finished, it extrapolates the mean wall time per point instead.
+
+FAILED = -999
+
+# Some scripts write several unlike rows per sample, such as one per simulator, Aer method, precision, dispatch mode or
+# approximation setting. Rows are summarized per series, keyed by these columns, where a row has them, so that one
+# summary never averages unlike times together.
+SERIES_FIELDS = ['name', 'method', 'precision', 'gate', 'mode', 'knob', 'value']
+
+def series(row):
+    return { k: row[k] for k in SERIES_FIELDS if row.get(k, '') != '' }
+
+def point_series_key(point, row_series):
+    return json.dumps({ **point, **row_series }, sort_keys=True)
+
+def sweep(widths, depths=None):
+    if depths is None:
+        return [{ 'num_qubits': w } for w in widths]
+    return [{ 'num_qubits': w, 'depth': d } for w in widths for d in depths]
+
+def resource_usage():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        'max_rss_kb': usage.ru_maxrss,
+        'children_max_rss_kb': children.ru_maxrss,
+        'user_time': usage.ru_utime + children.ru_utime,
+        'system_time': usage.ru_stime + children.ru_stime,
+        'load_average': os.getloadavg()[0]
+    }
+
+# Least squares fit of log(wall / depth) = a + b * num_qubits, or None with fewer than two widths
+def fit_scaling(finished):
+    xs = []
+    ys = []
+    for key, wall in finished:
+        if 'num_qubits' in key and wall > 0:
+            xs.append(key['num_qubits'])
+            ys.append(math.log(wall / key.get('depth', 1)))
+    if len(set(xs)) < 2:
+        return None
+    mx = sum(xs) / len(xs)
+    my = sum(ys) / len(ys)
+    b = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
+    return my - b * mx, b
+
+def format_eta(seconds):
+    if seconds is None:
+        return '?'
+    seconds = int(seconds)
+    return '{0}:{1:02d}:{2:02d}'.format(seconds // 3600, (seconds // 60) % 60, seconds % 60)
+
+# Mean sample time per point and series (keyed by both, merged, as sorted JSON), from the summaries in a telemetry file.
+# With warmup, the first warmup samples of each are left out, so the means come from the sample events instead.
+def read_point_means(path, warmup=0):
+    means = {}
+    if not os.path.isfile(path):
+        return means
+    times = {}
+    point = None
+    with open(path) as f:
+        for line in f:
+            e = json.loads(line)
+            if e['event'] == 'point':
+                point = e['point']
+            elif e['event'] == 'sample' and point is not None and isinstance(e['row'].get('time'), (int, float)):
+                times.setdefault(point_series_key(point, series(e['row'])), []).append(e['row']['time'])
+            elif e['event'] == 'summary' and 'mean' in e and warmup == 0:
+                means[point_series_key(e['point'], e.get('series', {}))] = e['mean']
+    if warmup > 0:
+        means = { k: statistics.mean(ts[warmup:]) for k, ts in times.items() if len(ts) > warmup }
+    return means
+
+# A csv.DictWriter that also reports every row it writes
+class WatchedWriter:
+    def __init__(self, writer, telemetry):
+        self.writer = writer
+        self.telemetry = telemetry
+
+    def writerow(self, row):
+        self.writer.writerow(row)
+        self.telemetry.record(row)
+
+    def __getattr__(self, name):
+        return getattr(self.writer, name)
+
+class Telemetry:
+    def __init__(self, plan, samples, destination=None):
+        self.script = os.path.basename(sys.argv[0])
+        self.plan = [dict(p) for p in plan]
+        self.samples = samples
+        self.file = None
+        self.sock = None
+        if destination is None:
+            destination = os.environ.get('BENCHMARK_TELEMETRY', '')
+        if destination.startswith('udp://'):
+            host, port = destination[len('udp://'):].rsplit(':', 1)
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.address = (host, int(port))
+        elif destination:
+            self.file = open(destination, 'a', buffering=1)
+
+        self.started = time.time()
+        self.current = None
+        self.finished = []
+        self.closed = False
+        self.emit('start', plan=self.plan, samples=samples, argv=sys.argv[1:], affinity=sorted(os.sched_getaffinity(0)), affinity_policy=os.environ.get('BENCHMARK_AFFINITY', ''))
+        atexit.register(self.close)
+
+    def streaming(self):
+        return self.file is not None or self.sock is not None
+
+    def emit(self, event, **fields):
+        if not self.streaming():
+            return
+        line = json.dumps({ 'event': event, 'script': self.script, 'pid': os.getpid(), 'wall': time.time(), **fields }, default=str)
+        if self.file is not None:
+            self.file.write(line + '\n')
+        else:
+            try:
+                self.sock.sendto(line.encode(), self.address)
+            except OSError:
+                # Nobody is listening
+                pass
+
+    def watch(self, writer):
+        return WatchedWriter(writer, self)
+
+    def _index(self, key):
+        return self.plan.index(key) if key in self.plan else len(self.finished)
+
+    def _predict(self, key, model):
+        if model is not None and 'num_qubits' in key:
+            return math.exp(model[0] + model[1] * key['num_qubits']) * key.get('depth', 1)
+        return statistics.mean(wall for k, wall in self.finished)
+
+    def eta(self):
+        if len(self.finished) == 0:
+            return None
+        model = fit_scaling(self.finished)
+        if self.current is None:
+            remaining = self.plan[len(self.finished):]
+            elapsed = 0
+        else:
+            remaining = self.plan[self._index(self.current['key']) + 1:]
+            elapsed = time.time() - self.current['start']
+            remaining = [self.current['key']] + remaining
+        total = sum(self._predict(key, model) for key in remaining)
+        return max(total - elapsed, 0)
+
+    def point(self, **key):
+        self._finish()
+        self.current = { 'key': key, 'start': time.time(), 'series': {} }
+        progress = self._index(key) / len(self.plan) if len(self.plan) > 0 else 0
+        eta = self.eta()
+        self.emit('point', point=key, progress=progress, eta=eta)
+        if not self.streaming():
+            print("\rProgress: [{0:50s}] {1:.1f}% ETA {2:10s}".format('#' * int(progress * 50), progress*100, format_eta(eta)), end="", flush=True)
+
+    def record(self, row):
+        t = row.get('time')
+        if self.current is not None:
+            row_series = series(row)
+            tally = self.current['series'].setdefault(json.dumps(row_series, sort_keys=True), { 'series': row_series, 'times': [], 'failures': 0 })
+            if t == FAILED:
+                tally['failures'] += 1
+            elif isinstance(t, (int, float)):
+                tally['times'].append(t)
+        self.emit('failure' if t == FAILED else 'sample', row=row)
+
+    def _finish(self):
+        if self.current is None:
+            return
+        current = self.current
+        self.finished.append((current['key'], time.time() - current['start']))
+        self.current = None
+        tallies = list(current['series'].values())
+        if len(tallies) == 0:
+            tallies = [{ 'series': {}, 'times': [], 'failures': 0 }]
+        progress = len(self.finished) / max(len(self.plan), 1)
+        eta = self.eta()
+        usage = resource_usage()
+        for tally in tallies:
+            times = tally['times']
+            summary = { 'point': current['key'], 'series': tally['series'], 'samples': len(times), 'failures': tally['failures'], 'elapsed': self.finished[-1][1] }
+            if len(times) > 0:
+                summary.update({ 'mean': statistics.mean(times), 'median': statistics.median(times), 'min': min(times), 'max': max(times) })
+            if len(times) > 1:
+                summary['stdev'] = statistics.stdev(times)
+            self.emit('summary', **summary, progress=progress, eta=eta, resources=usage)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._finish()
+        self.emit('end', points=len(self.finished), elapsed=time.time() - self.started)
+        if self.file is not None:
+            self.file.close()
+        if self.sock is not None:
+            self.sock.close()
@@ -0,0 +1,86 @@
+#Garbage collector control around the timed region of a benchmark sample
+
+import contextlib
+import gc
+import time
+
+# Building a QuantumCircuit or cirq.Circuit allocates a large graph of Python objects, and a GC cycle that happens to
+# fire inside the timed execute() or run() call traverses all of it, which shows up as a random spike. Scripts import
+# this with the usual sys.path entry for the repository root, and time each sample with:
+#
+#     timing = TimedRegion(gc_mode, gc_collect)
+#     ...
+#     with timing.region():
+#         execute(...).result()
+#     return timing.time, stats, timing.row()
+#
+# GC modes:
+#
+#   on:     leave the collector alone (the default, and the behavior before this option existed)
+#   off:    disable the collector inside the region
+#   freeze: move every object that exists when the region starts (the circuit, the simulator) into the permanent
+#           generation, so collections inside the region still run but no longer traverse them
+#
+# With gc_collect, a full collection runs just before the region (so, between samples), outside the timer, and its
+# pause is reported as gc_between. Every collection that starts inside the region is counted, with the objects it
+# collected and its pause, through gc.callbacks. A spike in time with gc_pause near zero is not the collector's.
+#
+# Page faults on the state vector stay inside the timer. Aer and Cirq allocate (and copy) their own state vectors inside
+# the timed call, and a buffer faulted in and freed beforehand is unmapped again at those sizes, so there is no buffer
+# that could be touched in advance.
+
+GC_MODES = 'on', 'off', 'freeze'
+TIMING_HEADERS = ['gc_mode', 'gc_collections', 'gc_collected', 'gc_pause', 'gc_between']
+
+class TimedRegion:
+    def __init__(self, gc_mode='on', gc_collect=False):
+        if gc_mode not in GC_MODES:
+            raise ValueError('Unknown GC mode: ' + gc_mode)
+        self.gc_mode = gc_mode
+        self.gc_collect = gc_collect
+        self.time = None
+        self._reset()
+
+    def _reset(self):
+        self.collections = 0
+        self.collected = 0
+        self.pause = 0.0
+        self.between = 0.0
+        self._gc_start = None
+
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            self.collections += 1
+            self.collected += info['collected']
+            self.pause += time.perf_counter() - self._gc_start
+            self._gc_start = None
+
+    @contextlib.contextmanager
+    def region(self):
+        self._reset()
+        if self.gc_collect:
+            start = time.perf_counter()
+            gc.collect()
+            self.between = time.perf_counter() - start
+
+        enabled = gc.isenabled()
+        if self.gc_mode == 'freeze':
+            gc.freeze()
+        elif self.gc_mode == 'off':
+            gc.disable()
+        gc.callbacks.append(self._callback)
+        start = time.time()
+        try:
+            yield self
+        finally:
+            self.time = time.time() - start
+            gc.callbacks.remove(self._callback)
+            if enabled:
+                gc.enable()
+            if self.gc_mode == 'freeze':
+                gc.unfreeze()
+
+    def row(self):
+        return { 'gc_mode': self.gc_mode, 'gc_collections': self.collections, 'gc_collected': self.collected, 'gc_pause': self.pause, 'gc_between': self.between }
@@ -0,0 +1,194 @@
+#Gate census and circuit statistics, recorded with each benchmark sample
+
+import json
+
+# Scripts in the simulator directories import this with:
+#
+#     sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+#     from circuit_census import ...
+#
+# A census is taken from a list of (gate name, qubit indices[, params]) tuples, as in reference/reference_engine.py,
+# before the circuit is timed. Measurements and barriers are counted in gate_counts, but not in the other statistics.
+# critical_depth is the length of the longest chain of gates that share qubits. The workload column flags circuits that
+# would make a timing meaningless: "empty" (no gates) or "no_entangling" (no multi-qubit gates, on more than one qubit).
+
+CENSUS_HEADERS = ['gate_counts', 'gates_1q', 'gates_2q', 'gates_3q', 't_count', 'critical_depth', 'gates_per_second', 'workload']
+
+NON_GATES = 'measure', 'barrier'
+
+# T and T^dagger, as named by Qiskit, Cirq, ProjectQ and the reference engines
+T_GATES = 't', 'tdg', 't**-1', 'tdag'
+
+def census(gates, num_qubits):
+    counts = {}
+    sizes = { 1: 0, 2: 0, 3: 0 }
+    t_count = 0
+    levels = [0] * num_qubits
+
+    for gate in gates:
+        name, qubits = gate[0].lower(), gate[1]
+        counts[name] = counts.get(name, 0) + 1
+        if name in NON_GATES:
+            continue
+        sizes[min(len(qubits), 3)] += 1
+        if name in T_GATES:
+            t_count += 1
+        level = max(levels[q] for q in qubits) + 1
+        for q in qubits:
+            levels[q] = level
+
+    total = sizes[1] + sizes[2] + sizes[3]
+    if total == 0:
+        workload = 'empty'
+    elif num_qubits > 1 and sizes[2] + sizes[3] == 0:
+        workload = 'no_entangling'
+    else:
+        workload = ''
+
+    return { 'gate_counts': counts, 'gates_1q': sizes[1], 'gates_2q': sizes[2], 'gates_3q': sizes[3], 't_count': t_count, 'critical_depth': max(levels, default=0), 'workload': workload }
+
+# CSV columns for a census, and the time of the sample it describes
+def census_row(stats, t):
+    total = stats['gates_1q'] + stats['gates_2q'] + stats['gates_3q']
+    row = dict(stats)
+    row['gate_counts'] = json.dumps(stats['gate_counts'], sort_keys=True)
+    row['gates_per_second'] = total / t if t > 0 else ''
+    return row
+
+def qiskit_census(circ):
+    index = { q: i for i, q in enumerate(circ.qubits) }
+    return census([(inst.name, [index[q] for q in qargs]) for inst, qargs, cargs in circ.data], circ.num_qubits)
+
+# Cirq gate names, in the vocabulary of the Qiskit census (and analysis/gate_cost_model.py). Gates that compare equal
+# to a fixed gate take its name, and the rest of each power gate family is named as the rotation it is.
+def cirq_gate_name(gate):
+    import cirq
+    if isinstance(gate, cirq.MatrixGate):
+        return 'matrix'
+    fixed = [(cirq.H, 'h'), (cirq.X, 'x'), (cirq.Y, 'y'), (cirq.Z, 'z'), (cirq.S, 's'), (cirq.S**-1, 'sdg'), (cirq.T, 't'),
+             (cirq.T**-1, 'tdg'), (cirq.CNOT, 'cx'), (cirq.CZ, 'cz'), (cirq.SWAP, 'swap'), (cirq.ISWAP, 'iswap'), (cirq.CCNOT, 'ccx')]
+    for g, name in fixed:
+        if gate == g:
+            return name
+    families = [(cirq.CZPowGate, 'cp'), (cirq.XPowGate, 'rx'), (cirq.YPowGate, 'ry'), (cirq.ZPowGate, 'rz'), (cirq.PhasedXPowGate, 'u')]
+    for cls, name in families:
+        if isinstance(gate, cls):
+            return name
+    return str(gate).lower()
+
+def cirq_census(circ, reg):
+    import cirq
+    index = { q: i for i, q in enumerate(reg) }
+    gates = []
+    for op in circ.all_operations():
+        if cirq.is_measurement(op):
+            name = 'measure'
+        else:
+            name = cirq_gate_name(op.gate)
+        gates.append((name, [index[q] for q in op.qubits]))
+    return census(gates, len(reg))
+
+def pyquil_census(prog, num_qubits):
+    gates = []
+    for inst in prog.instructions:
+        if hasattr(inst, 'name') and hasattr(inst, 'qubits'):
+            # Fused unitaries are defined as FUSED_<n>, one DEFGATE each
+            name = 'matrix' if inst.name.startswith('FUSED_') else inst.name
+            gates.append((name, [q.index for q in inst.qubits]))
+    return census(gates, num_qubits)
+
+# PyQrack applies gates as they are called, so there is no circuit to count. A GateRecorder stands in for the
+# simulator, and records each call as a gate, named as Qiskit would name it. Anti-controlled gates are counted as their
+# controlled equivalents, and a singly controlled diagonal phase matrix as "cp". Scripts drive it with the same
+# generator as the timed run, from the same random state, outside the timer:
+#
+#     state = random.getstate()
+#     stats = pyqrack_census(lambda circ: random_circuit(depth, circ), num_qubits)
+#     random.setstate(state)
+def pyqrack_controlled(pauli):
+    return lambda c, q: ({ 1: 'c', 2: 'cc' }.get(len(c), 'mc') + pauli, list(c) + [q])
+
+PYQRACK_GATES = {
+    'h': lambda q: ('h', [q]), 'x': lambda q: ('x', [q]), 'y': lambda q: ('y', [q]), 'z': lambda q: ('z', [q]),
+    's': lambda q: ('s', [q]), 'adjs': lambda q: ('sdg', [q]), 't': lambda q: ('t', [q]), 'adjt': lambda q: ('tdg', [q]),
+    'u': lambda q, th, ph, la: ('u', [q]),
+    'r': lambda b, angle, q: ('r' + getattr(b, 'name', 'PauliZ')[-1].lower(), [q]),
+    'mtrx': lambda m, q: ('unitary', [q]),
+    'mcmtrx': lambda c, m, q: ('cp' if len(c) == 1 and m[0] == 1 and m[1] == 0 and m[2] == 0 else 'unitary', list(c) + [q]),
+    'mcx': pyqrack_controlled('x'), 'mcy': pyqrack_controlled('y'), 'mcz': pyqrack_controlled('z'),
+    'macx': pyqrack_controlled('x'), 'macy': pyqrack_controlled('y'), 'macz': pyqrack_controlled('z'),
+    'swap': lambda q1, q2: ('swap', [q1, q2]), 'iswap': lambda q1, q2: ('iswap', [q1, q2]),
+    'm': lambda q: ('measure', [q])
+}
+
+class GateRecorder:
+    def __init__(self, num_qubits):
+        self._num_qubits = num_qubits
+        self.gates = []
+
+    def num_qubits(self):
+        return self._num_qubits
+
+    def m_all(self):
+        for q in range(self._num_qubits):
+            self.gates.append(('measure', [q]))
+
+    # Qrack's QFT, in the order Qrack applies it: from the last qubit down, controlled phases on the qubits above,
+    # then H. There are no swaps.
+    def qft(self, qubits):
+        for i in range(len(qubits)):
+            h_bit = len(qubits) - 1 - i
+            for j in range(i):
+                self.gates.append(('cp', [qubits[h_bit], qubits[h_bit + 1 + j]]))
+            self.gates.append(('h', [qubits[h_bit]]))
+
+    def __getattr__(self, name):
+        if name not in PYQRACK_GATES:
+            raise AttributeError(name)
+        return lambda *args: self.gates.append(PYQRACK_GATES[name](*args))
+
+def pyqrack_census(build, num_qubits):
+    recorder = GateRecorder(num_qubits)
+    build(recorder)
+    return census(recorder.gates, num_qubits)
+
+# qcgpu also applies gates as they are called. A QcgpuRecorder stands in for a qcgpu.State, in the same way.
+QCGPU_GATES = {
+    'h': lambda q: ('h', [q]), 'x': lambda q: ('x', [q]), 'y': lambda q: ('y', [q]), 'z': lambda q: ('z', [q]),
+    's': lambda q: ('s', [q]), 't': lambda q: ('t', [q]), 'u1': lambda q, la: ('p', [q]), 'u': lambda q, th, ph, la: ('u', [q]),
+    'apply_gate': lambda g, q: ('unitary', [q]),
+    'cx': lambda c, t: ('cx', [c, t]), 'cz': lambda c, t: ('cz', [c, t]), 'cu1': lambda c, t, la: ('cp', [c, t]),
+    'cu3': lambda c, t, th, ph, la: ('cu3', [c, t])
+}
+
+class QcgpuRecorder:
+    def __init__(self, num_qubits):
+        self.num_qubits = num_qubits
+        self.gates = []
+
+    def measure(self):
+        for q in range(self.num_qubits):
+            self.gates.append(('measure', [q]))
+
+    def __getattr__(self, name):
+        if name not in QCGPU_GATES:
+            raise AttributeError(name)
+        return lambda *args: self.gates.append(QCGPU_GATES[name](*args))
+
+def qcgpu_census(build, num_qubits):
+    recorder = QcgpuRecorder(num_qubits)
+    build(recorder)
+    return census(recorder.gates, num_qubits)
+
+# The single qubit QFT scripts measure as they go, and only apply a phase gate for each earlier result of 1, so their
+# census is rebuilt from the results, after the timed run. u and phase are the names of the gates each script applies.
+def single_qubit_qft_census(m_results, u='u', phase='p'):
+    gates = []
+    for i in range(len(m_results)):
+        gates.append((u, [0]))
+        gates += [(phase, [0]) for j in range(i) if m_results[j]]
+        gates.append(('h', [0]))
+        gates.append(('measure', [0]))
+        if m_results[i]:
+            gates.append(('x', [0]))
+    return census(gates, 1)
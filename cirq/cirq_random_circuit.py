@@ -1,14 +1,20 @@
 #Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
 
 import click
-import time
 import random
 import csv
 import os.path
 import math
+import sys
 
 import cirq
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, cirq_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+from benchmark_timing import GC_MODES, TIMING_HEADERS, TimedRegion
+
 # Implementation of random universal circuit
 def rand_circuit(num_qubits, depth, reg):
     single_bit_gates = cirq.H, cirq.X, cirq.Y, cirq.Z, cirq.T
@@ -22,7 +28,7 @@ def rand_circuit(num_qubits, depth, reg):
             circ.append(gate(reg[j]))
 
         # Multi bit gates
-        bit_set = [range(num_qubits)]
+        bit_set = [i for i in range(num_qubits)]
         while len(bit_set) > 1:
             b1 = random.choice(bit_set)
             bit_set.remove(b1)
@@ -45,19 +51,19 @@ def rand_circuit(num_qubits, depth, reg):
 
 sim_backend = cirq.Simulator()
 
-def bench(num_qubits, depth):
+def bench(num_qubits, depth, timing):
     reg = cirq.LineQubit.range(num_qubits)
     circ = rand_circuit(num_qubits, depth, reg)
-    start = time.time()
-    sim_backend.run(program=circ, repetitions=1)
-    return time.time() - start
+    stats = cirq_census(circ, reg)
+    with timing.region():
+        sim_backend.run(program=circ, repetitions=1)
+    return timing.time, stats, timing.row()
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS + TIMING_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'depth', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -74,9 +80,11 @@ def write_csv(writer, data):
 @click.option('--samples', default=100, help='Number of samples to take for each qubit.')
 @click.option('--qubits', default=28, help='How many qubits you want to test for')
 @click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--gc', 'gc_mode', default='on', type=click.Choice(GC_MODES), help='Garbage collector in the timed region: on, off, or freeze the objects built before it')
+@click.option('--gc-collect', default=False, help='Collect garbage between samples, outside the timed region')
 @click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
 @click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
-def benchmark(samples, qubits, depth, out, single):
+def benchmark(samples, qubits, depth, gc_mode, gc_collect, out, single):
     if single:
         low = qubits - 1
     else:
@@ -85,18 +93,21 @@ def benchmark(samples, qubits, depth, out, single):
 
     functions = bench,
     writer = create_csv(out)
+    timing = TimedRegion(gc_mode, gc_collect)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
 
     for n in range(low, high):
         for d in range(depth):
             # Progress counter
-            progress = (((n - low) * depth) + d) / ((high - low) * depth)
-            print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+            telemetry.point(num_qubits=n+1, depth=d+1)
 
             # Run the benchmarks
             for i in range(samples):
                 func = random.choice(functions)
-                t = func(n+1, d+1)
-                write_csv(writer, {'name': 'cirq_random', 'num_qubits': n+1, 'depth': d+1, 'time': t})
+                t, stats, gc_stats = func(n+1, d+1, timing)
+                write_csv(writer, {'name': 'cirq_random', 'num_qubits': n+1, 'depth': d+1, 'time': t, **census_row(stats, t), **gc_stats})
 
 if __name__ == '__main__':
     benchmark()
@@ -1,14 +1,21 @@
 #Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
 
 import click
-import time
 import random
 import csv
 import os.path
 import math
+import sys
 
+import numpy as np
 import cirq
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, cirq_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+from benchmark_timing import GC_MODES, TIMING_HEADERS, TimedRegion
+
 def sqrtx(t):
     return cirq.XPowGate(exponent=1/2).on(t)
 
@@ -18,8 +25,13 @@ def sqrty(t):
 def sqrtw(t):
     return cirq.PhasedXPowGate(phase_exponent=0.25, exponent=0.5).on(t)
 
+CP = cirq.unitary(cirq.CZPowGate(exponent=1/6))
+ISWAP = cirq.unitary(cirq.ISWAP)
+
 # Implementation of Sycamore circuit
-def sycamore_circuit(num_qubits, depth, reg):
+# With fusion='1q', the single bit gates are applied as one 2x2 unitary per qubit, per cycle.
+# With fusion='2q', those unitaries are multiplied into the CZ^(1/6) and iSWAP of each coupler, as one 4x4 unitary.
+def sycamore_circuit(num_qubits, depth, reg, fusion='none'):
     gateSequence = [ 0, 3, 2, 1, 2, 1, 0, 3 ]
     single_bit_gates = sqrtx, sqrty, sqrtw
     circ = cirq.Circuit()
@@ -32,6 +44,8 @@ def sycamore_circuit(num_qubits, depth, reg):
     lastSingleBitGates = []
 
     for i in range(depth):
+        fused = [np.identity(2) for j in range(num_qubits)]
+
         # Single bit gates
         singleBitGates = []
         for j in range(num_qubits):
@@ -39,11 +53,18 @@ def sycamore_circuit(num_qubits, depth, reg):
             if len(lastSingleBitGates) > 0:
                 while gate == lastSingleBitGates[j]:
                     gate = random.choice(single_bit_gates)
-            circ.append(gate(reg[j]))
+            if fusion == 'none':
+                circ.append(gate(reg[j]))
+            else:
+                fused[j] = cirq.unitary(gate(reg[j])) @ fused[j]
             singleBitGates.append(gate)
 
         lastSingleBitGates = singleBitGates
 
+        if fusion == '1q':
+            for j in range(num_qubits):
+                circ.append(cirq.MatrixGate(fused[j]).on(reg[j]))
+
         gate = gateSequence[0]
         gateSequence.pop(0)
         gateSequence.append(gate)
@@ -64,8 +85,20 @@ def sycamore_circuit(num_qubits, depth, reg):
                 b2 = tempRow * colLen + tempCol;
 
                 # Two bit gates
-                circ.append(cirq.CZPowGate(exponent=1/6).on(reg[b1], reg[b2]))
-                circ.append(cirq.ISWAP(reg[b1], reg[b2]))
+                if fusion == '2q':
+                    # Cirq matrices are big-endian, so b1 is the high bit.
+                    circ.append(cirq.MatrixGate(ISWAP @ CP @ np.kron(fused[b1], fused[b2])).on(reg[b1], reg[b2]))
+                    fused[b1] = None
+                    fused[b2] = None
+                else:
+                    circ.append(cirq.CZPowGate(exponent=1/6).on(reg[b1], reg[b2]))
+                    circ.append(cirq.ISWAP(reg[b1], reg[b2]))
+
+        if fusion == '2q':
+            # Qubits without a coupler in this cycle
+            for j in range(num_qubits):
+                if fused[j] is not None:
+                    circ.append(cirq.MatrixGate(fused[j]).on(reg[j]))
 
     for j in range(num_qubits):
         circ.append(cirq.measure(reg[j]))
@@ -74,19 +107,19 @@ def sycamore_circuit(num_qubits, depth, reg):
 
 sim_backend = cirq.Simulator()
 
-def bench(num_qubits, depth):
+def bench(num_qubits, depth, fusion, timing):
     reg = cirq.LineQubit.range(num_qubits)
-    circ = sycamore_circuit(num_qubits, depth, reg)
-    start = time.time()
-    sim_backend.run(program=circ, repetitions=1)
-    return time.time() - start
+    circ = sycamore_circuit(num_qubits, depth, reg, fusion)
+    stats = cirq_census(circ, reg)
+    with timing.region():
+        sim_backend.run(program=circ, repetitions=1)
+    return timing.time, stats, timing.row()
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS + TIMING_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'depth', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -103,9 +136,12 @@ def write_csv(writer, data):
 @click.option('--samples', default=100, help='Number of samples to take for each qubit.')
 @click.option('--qubits', default=28, help='How many qubits you want to test for')
 @click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--fusion', default='none', type=click.Choice(['none', '1q', '2q']), help='Fuse gates into 1 or 2 qubit unitaries before execution')
+@click.option('--gc', 'gc_mode', default='on', type=click.Choice(GC_MODES), help='Garbage collector in the timed region: on, off, or freeze the objects built before it')
+@click.option('--gc-collect', default=False, help='Collect garbage between samples, outside the timed region')
 @click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
 @click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
-def benchmark(samples, qubits, depth, out, single):
+def benchmark(samples, qubits, depth, fusion, gc_mode, gc_collect, out, single):
     if single:
         low = qubits - 1
     else:
@@ -114,18 +150,25 @@ def benchmark(samples, qubits, depth, out, single):
 
     functions = bench,
     writer = create_csv(out)
+    timing = TimedRegion(gc_mode, gc_collect)
+
+    name = 'cirq_sycamore'
+    if fusion != 'none':
+        name = name + '_fused_' + fusion
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
 
     for n in range(low, high):
         for d in range(depth):
             # Progress counter
-            progress = (((n - low) * depth) + d) / ((high - low) * depth)
-            print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+            telemetry.point(num_qubits=n+1, depth=d+1)
 
             # Run the benchmarks
             for i in range(samples):
                 func = random.choice(functions)
-                t = func(n+1, d+1)
-                write_csv(writer, {'name': 'cirq_sycamore', 'num_qubits': n+1, 'depth': d+1, 'time': t})
+                t, stats, gc_stats = func(n+1, d+1, fusion, timing)
+                write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'time': t, **census_row(stats, t), **gc_stats})
 
 if __name__ == '__main__':
     benchmark()
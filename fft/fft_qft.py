@@ -0,0 +1,115 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import csv
+import os.path
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+
+# Classical baseline for the QFT benchmarks: a complex FFT of length 2^n, on a random normalized vector (as for a
+# random n qubit state), timed over the same widths as the *_qft.py scripts. With --library pyfftw, the transform is
+# planned once per width, outside the timer, and executed in place, as FFTW3 would be used natively. With --library
+# scipy, scipy.fft also transforms in place (overwrite_x), so the two compare like for like. NumPy's FFT has no in place
+# option, and allocates its output inside the timer, so its rows are named numpy_fft_out_of_place.
+
+def random_vector(num_qubits):
+    vec = np.random.normal(size=1 << num_qubits) + 1j * np.random.normal(size=1 << num_qubits)
+    return vec / np.linalg.norm(vec)
+
+def bench_numpy(vec, plan):
+    start = time.time()
+    np.fft.fft(vec)
+    return time.time() - start
+
+def bench_scipy(vec, plan):
+    import scipy.fft
+    start = time.time()
+    scipy.fft.fft(vec, overwrite_x=True, workers=plan)
+    return time.time() - start
+
+def bench_pyfftw(vec, plan):
+    plan.input_array[:] = vec
+    start = time.time()
+    plan()
+    return time.time() - start
+
+def make_plan(library, num_qubits, threads):
+    if library == 'numpy':
+        return None
+    if library == 'scipy':
+        # scipy.fft plans internally; its "plan" here is just the worker count
+        return threads
+    import pyfftw
+    buf = pyfftw.empty_aligned(1 << num_qubits, dtype='complex128')
+    return pyfftw.FFTW(buf, buf, flags=('FFTW_MEASURE',), threads=threads)
+
+benchmarks = {
+    'numpy': bench_numpy,
+    'scipy': bench_scipy,
+    'pyfftw': bench_pyfftw
+}
+
+row_names = {
+    'numpy': 'numpy_fft_out_of_place',
+    'scipy': 'scipy_fft',
+    'pyfftw': 'pyfftw_fft'
+}
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'time']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=100, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--library', default='numpy', type=click.Choice(list(benchmarks.keys())), help='FFT implementation to use')
+@click.option('--threads', default=1, help='Number of threads for SciPy or pyFFTW')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, library, threads, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    bench = benchmarks[library]
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        plan = make_plan(library, n + 1, threads)
+
+        # Progress counter
+        telemetry.point(num_qubits=n+1)
+
+        # Run the benchmarks
+        for i in range(samples):
+            t = bench(random_vector(n + 1), plan)
+            write_csv(writer, {'name': row_names[library], 'num_qubits': n+1, 'time': t})
+
+        del plan
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,283 @@
+#Randomly interleaved samples across several simulators, on identical circuits, with paired speed ratios
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+import math
+import statistics
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'reference'))
+from reference_engine import GateSet, StateVector
+from reference_qft import qft_gates
+from reference_sycamore import sycamore_gates
+from reference_t_nn import t_nn_gates
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+
+# Separate sweeps run one simulator after another, so drift in the machine (thermal throttling, background load)
+# biases whichever runs later. Here, every sample draws one circuit (as reference engine IR), and runs it once on
+# every simulator, in a fresh random order. Each row records the time and, for the same circuit, the ratio to the
+# baseline simulator's time. Paired ratios cancel drift and circuit-to-circuit variation that both runs share, so
+# they are far less noisy than a ratio of means from independent sweeps.
+#
+# Each adapter translates the IR into its simulator's own circuit, and allocates what it needs, before the timer
+# starts, and returns a function to time that runs the circuit and measures every qubit. The simulators are imported
+# only when their adapters are used.
+
+# Captures the matrices that GateSet reduces a named gate to, for simulators without a native equivalent
+class MatrixCapture(GateSet):
+    def __init__(self):
+        self.ops = []
+
+    def mcmtrx(self, controls, m, target):
+        self.ops.append((list(controls), np.asarray(m, dtype=np.complex128).reshape(2, 2), [target]))
+
+    def mtrx2(self, q1, q2, m):
+        self.ops.append(([], np.asarray(m, dtype=np.complex128).reshape(4, 4), [q1, q2]))
+
+def gate_matrices(gate):
+    capture = MatrixCapture()
+    capture.run([gate])
+    return capture.ops
+
+def gate_params(gate):
+    return gate[2] if len(gate) > 2 else ()
+
+def prepare_reference(gates, num_qubits):
+    sim = StateVector(num_qubits)
+    def run():
+        sim.reset()
+        sim.run(gates)
+        return sim.measure_all()
+    return run
+
+# Gates that QuantumCircuit has under the same name, with any angles before the qubits
+QISKIT_GATES = 'h', 'x', 'y', 'z', 's', 'sdg', 't', 'tdg', 'sx', 'rx', 'ry', 'rz', 'p', 'u', 'cx', 'cy', 'cz', 'cp', 'ccx', 'swap', 'iswap'
+
+def qiskit_circuit(gates, num_qubits):
+    from qiskit import QuantumCircuit
+    from qiskit.extensions import UnitaryGate
+    circ = QuantumCircuit(num_qubits, num_qubits)
+    for gate in gates:
+        if gate[0] in QISKIT_GATES:
+            getattr(circ, gate[0])(*gate_params(gate), *gate[1])
+        else:
+            for controls, m, targets in gate_matrices(gate):
+                unitary = UnitaryGate(m)
+                if len(controls) > 0:
+                    unitary = unitary.control(len(controls))
+                # Qiskit takes the first qubit of a unitary as the least significant
+                circ.append(unitary, controls + list(reversed(targets)))
+    for j in range(num_qubits):
+        circ.measure(j, j)
+    return circ
+
+def prepare_qiskit_backend(gates, num_qubits, backend):
+    from qiskit import execute
+    circ = qiskit_circuit(gates, num_qubits)
+    def run():
+        return execute([circ], backend, timeout=600, shots=1).result()
+    return run
+
+def prepare_qiskit(gates, num_qubits):
+    from qiskit import Aer
+    return prepare_qiskit_backend(gates, num_qubits, Aer.get_backend('qasm_simulator'))
+
+def prepare_qiskit_gpu(gates, num_qubits):
+    from qiskit.providers.aer import QasmSimulator
+    return prepare_qiskit_backend(gates, num_qubits, QasmSimulator(shots=1, method='statevector_gpu'))
+
+def prepare_qiskit_qrack(gates, num_qubits):
+    from qiskit.providers.qrack import QasmSimulator
+    return prepare_qiskit_backend(gates, num_qubits, QasmSimulator())
+
+def prepare_cirq(gates, num_qubits):
+    import cirq
+    native = {
+        'h': cirq.H, 'x': cirq.X, 'y': cirq.Y, 'z': cirq.Z, 's': cirq.S, 'sdg': cirq.S**-1, 't': cirq.T, 'tdg': cirq.T**-1,
+        'cx': cirq.CNOT, 'cz': cirq.CZ, 'ccx': cirq.TOFFOLI, 'swap': cirq.SWAP, 'iswap': cirq.ISWAP
+    }
+    reg = cirq.LineQubit.range(num_qubits)
+    circ = cirq.Circuit()
+    for gate in gates:
+        if gate[0] in native:
+            circ.append(native[gate[0]].on(*[reg[q] for q in gate[1]]))
+        elif gate[0] == 'cp':
+            circ.append(cirq.CZPowGate(exponent=gate[2][0] / math.pi).on(reg[gate[1][0]], reg[gate[1][1]]))
+        else:
+            for controls, m, targets in gate_matrices(gate):
+                matrix_gate = cirq.MatrixGate(m)
+                if len(controls) > 0:
+                    matrix_gate = matrix_gate.controlled(len(controls))
+                circ.append(matrix_gate.on(*[reg[q] for q in controls + targets]))
+    circ.append(cirq.measure(*reg, key='m'))
+    sim = cirq.Simulator()
+    def run():
+        return sim.run(program=circ, repetitions=1)
+    return run
+
+def prepare_pyqrack(gates, num_qubits):
+    from pyqrack import QrackSimulator
+    sim = QrackSimulator(num_qubits)
+    native = {
+        'h': lambda q: sim.h(q), 'x': lambda q: sim.x(q), 'y': lambda q: sim.y(q), 'z': lambda q: sim.z(q),
+        's': lambda q: sim.s(q), 'sdg': lambda q: sim.adjs(q), 't': lambda q: sim.t(q), 'tdg': lambda q: sim.adjt(q),
+        'cx': lambda c, t: sim.mcx([c], t), 'cy': lambda c, t: sim.mcy([c], t), 'cz': lambda c, t: sim.mcz([c], t),
+        'ccx': lambda c1, c2, t: sim.mcx([c1, c2], t), 'swap': lambda q1, q2: sim.swap(q1, q2), 'iswap': lambda q1, q2: sim.iswap(q1, q2)
+    }
+    # pyqrack applies gates as they are called, so the translation is done once, up front, and replayed
+    ops = []
+    for gate in gates:
+        if gate[0] in native:
+            ops.append((native[gate[0]], gate[1]))
+        else:
+            for controls, m, targets in gate_matrices(gate):
+                if len(targets) == 2:
+                    # QrackSimulator has no general two qubit matrix gate
+                    raise ValueError('No pyqrack equivalent for two qubit gate: ' + gate[0])
+                if len(controls) > 0:
+                    ops.append((lambda c, t, m=list(m.reshape(-1)): sim.mcmtrx(c, m, t), (controls, targets[0])))
+                else:
+                    ops.append((lambda t, m=list(m.reshape(-1)): sim.mtrx(m, t), (targets[0],)))
+    def run():
+        sim.reset_all()
+        for fn, args in ops:
+            fn(*args)
+        return sim.m_all()
+    return run
+
+adapters = {
+    'reference': prepare_reference,
+    'qiskit': prepare_qiskit,
+    'qiskit_gpu': prepare_qiskit_gpu,
+    'qiskit_qrack': prepare_qiskit_qrack,
+    'cirq': prepare_cirq,
+    'pyqrack': prepare_pyqrack
+}
+
+circuits = {
+    'qft': lambda n, d: qft_gates(n),
+    'sycamore': sycamore_gates,
+    't_nn': t_nn_gates
+}
+
+def bench(run):
+    start = time.time()
+    run()
+    return time.time() - start
+
+# Geometric mean of paired ratios, with a 95% confidence interval from the spread of their logarithms
+def ratio_summary(ratios):
+    logs = [math.log(r) for r in ratios]
+    mean = statistics.mean(logs)
+    half = 1.96 * statistics.stdev(logs) / math.sqrt(len(logs)) if len(logs) > 1 else float('inf')
+    return math.exp(mean), math.exp(mean - half), math.exp(mean + half)
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'circuit', 'order', 'time', 'baseline', 'ratio']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of circuits to run on every simulator, for each point.')
+@click.option('--qubits', default=20, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='Circuit depth (ignored for qft)')
+@click.option('--circuit', 'circuit_name', default='sycamore', type=click.Choice(list(circuits.keys())), help='Circuit family')
+@click.option('--simulators', default='reference,qiskit,cirq', help='Comma-separated simulators, baseline first: ' + ', '.join(adapters.keys()))
+@click.option('--warmup', default=1, help='Untimed runs of the first circuit on every simulator, at each width')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, circuit_name, simulators, warmup, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    names = simulators.split(',')
+    for name in names:
+        if name not in adapters:
+            raise click.BadParameter('Unknown simulator: ' + name)
+    if len(set(names)) != len(names):
+        raise click.BadParameter('Each simulator may be listed only once')
+    baseline = names[0]
+    depths = [None] if circuit_name == 'qft' else [depth]
+
+    writer = create_csv(out)
+    # Paired ratios, per simulator, for each point (width, and depth)
+    ratios = { name: {} for name in names[1:] }
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)) if circuit_name == 'qft' else sweep(range(low + 1, high + 1), depths), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        for d in depths:
+            # Progress counter
+            if d is None:
+                telemetry.point(num_qubits=n+1)
+            else:
+                telemetry.point(num_qubits=n+1, depth=d)
+
+            # Run the benchmarks
+            for i in range(samples):
+                gates = circuits[circuit_name](n + 1, d)
+                runs = {}
+                for name in names:
+                    try:
+                        runs[name] = adapters[name](gates, n + 1)
+                        if i == 0:
+                            for w in range(warmup):
+                                runs[name]()
+                    except:
+                        runs[name] = None
+
+                order = list(names)
+                random.shuffle(order)
+                times = {}
+                for name in order:
+                    try:
+                        times[name] = bench(runs[name])
+                    except:
+                        times[name] = -999
+
+                for name in names:
+                    t = times[name]
+                    ratio = ''
+                    if t != -999 and times[baseline] != -999:
+                        ratio = t / times[baseline]
+                        if name != baseline:
+                            ratios[name].setdefault((n + 1, d), []).append(ratio)
+                    write_csv(writer, {'name': 'interleaved_' + name, 'num_qubits': n+1, 'depth': '' if d is None else d, 'circuit': i, 'order': order.index(name), 'time': t, 'baseline': baseline, 'ratio': ratio})
+                del runs
+
+    print()
+    for name, points in ratios.items():
+        if len(points) == 0:
+            print('{0} / {1}: no paired samples'.format(name, baseline))
+            continue
+        for (num_qubits, d), rs in sorted(points.items()):
+            point = '{0} qubits'.format(num_qubits) if d is None else '{0} qubits, depth {1}'.format(num_qubits, d)
+            mean, lo, hi = ratio_summary(rs)
+            print('{0} / {1} at {2}: geometric mean ratio {3:.4g} (95% CI {4:.4g} to {5:.4g}, {6} pairs)'.format(name, baseline, point, mean, lo, hi, len(rs)))
+
+if __name__ == '__main__':
+    benchmark()
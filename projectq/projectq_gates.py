@@ -0,0 +1,139 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import csv
+import os.path
+import sys
+import math
+
+from projectq import MainEngine
+import projectq.ops as ops
+from projectq.backends import Simulator
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+from random_unitary import random_u3
+
+# Per-gate microbenchmark: each sample applies one gate "reps" times to a fixed target (and its next neighbor, for
+# two qubit gates), and reports the average time per gate. The engine has no LocalOptimizer, so repeated gates are
+# not cancelled before they reach the simulator. ProjectQ has no iSWAP gate.
+# Fit a cost model to the output with analysis/gate_cost_model.py.
+
+def random_mtrx():
+    return ops.MatrixGate(random_u3())
+
+def apply_h(q1, q2, m):
+    ops.H | q1
+
+def apply_s(q1, q2, m):
+    ops.S | q1
+
+def apply_t(q1, q2, m):
+    ops.T | q1
+
+def apply_cx(q1, q2, m):
+    ops.CNOT | (q1, q2)
+
+def apply_cz(q1, q2, m):
+    ops.CZ | (q1, q2)
+
+def apply_swap(q1, q2, m):
+    ops.Swap | (q1, q2)
+
+def apply_cp(q1, q2, m):
+    ops.C(ops.R(math.pi / 6)) | (q1, q2)
+
+def apply_mtrx(q1, q2, m):
+    m | q1
+
+gates = {
+    'h': apply_h,
+    's': apply_s,
+    't': apply_t,
+    'cx': apply_cx,
+    'cz': apply_cz,
+    'swap': apply_swap,
+    'cp': apply_cp,
+    'mtrx': apply_mtrx
+}
+
+sim_backend = MainEngine(backend=Simulator(), engine_list=[])
+
+def prepare(num_qubits):
+    q = sim_backend.allocate_qureg(num_qubits)
+    for j in q:
+        random_mtrx() | j
+    for i in range(num_qubits - 1):
+        ops.CNOT | (q[i], q[i + 1])
+    sim_backend.flush()
+    return q
+
+def bench(num_qubits, gate, target, reps):
+    q = prepare(num_qubits)
+    other = (target + 1) % num_qubits
+    m = random_mtrx()
+    fn = gates[gate]
+    start = time.time()
+    for i in range(reps):
+        fn(q[target], q[other], m)
+    sim_backend.flush()
+    t = time.time() - start
+    ops.All(ops.Measure) | q
+    sim_backend.flush(deallocate_qubits=True)
+    return t / reps
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'gate', 'target', 'reps', 'time']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--reps', default=100, help='How many times to apply the gate, per sample')
+@click.option('--gates', 'gate_names', default=','.join(gates.keys()), help='Comma-separated gates to test')
+@click.option('--target-stride', default=1, help='Test every target-stride-th qubit index as the gate target')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, reps, gate_names, target_stride, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        # Progress counter
+        telemetry.point(num_qubits=n+1)
+
+        # Run the benchmarks
+        for gate in gate_names.split(','):
+            for target in range(0, n + 1, target_stride):
+                for i in range(samples):
+                    try:
+                        t = bench(n + 1, gate, target, reps)
+                        write_csv(writer, {'name': 'projectq_gates', 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': t})
+                    except:
+                        write_csv(writer, {'name': 'projectq_gates', 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': -999})
+
+if __name__ == '__main__':
+    benchmark()
@@ -6,59 +6,92 @@ import random
 import csv
 import os.path
 import math
+import sys
 
 from projectq import MainEngine
 import projectq.ops as ops
 from projectq.backends import Simulator
 from projectq.cengines import LocalOptimizer
 
-# Implementation of random universal circuit
-def rand_circuit(num_qubits, depth, q):
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, census, census_row
+from simulator_pool import LIFECYCLE_HEADERS, LIFECYCLE_POLICIES, SimulatorPool
+from benchmark_telemetry import Telemetry, sweep
+
+# Implementation of random universal circuit, as a list of (gate, qubit indices) pairs
+def rand_circuit(num_qubits, depth):
     single_bit_gates = ops.H, ops.X, ops.Y, ops.Z, ops.T
     multi_bit_gates = ops.Swap, ops.CNOT, ops.CZ, ops.Toffoli
+    circ = []
 
     for i in range(depth):
         # Single bit gates
         for j in range(num_qubits):
             gate = random.choice(single_bit_gates)
-            gate | q[j]
+            circ.append((gate, (j,)))
 
         # Multi bit gates
-        bit_set = [range(num_qubits)]
+        bit_set = [i for i in range(num_qubits)]
         while len(bit_set) > 1:
             b1 = random.choice(bit_set)
             bit_set.remove(b1)
             b2 = random.choice(bit_set)
             bit_set.remove(b2)
             gate = random.choice(multi_bit_gates)
-            while len(bit_set) == 0 and gate == circ.ccx:
+            while len(bit_set) == 0 and gate == ops.Toffoli:
                 gate = random.choice(multi_bit_gates)
-            if gate == circ.ccx:
+            if gate == ops.Toffoli:
                 b3 = random.choice(bit_set)
                 bit_set.remove(b3)
-                gate | (q[b1], q[b2], q[b3])
+                circ.append((gate, (b1, b2, b3)))
             else:
-                gate | (q[b1], q[b2])
+                circ.append((gate, (b1, b2)))
+
+    return circ
+
+gate_names = { ops.H: 'h', ops.X: 'x', ops.Y: 'y', ops.Z: 'z', ops.T: 't', ops.Swap: 'swap', ops.CNOT: 'cx', ops.CZ: 'cz', ops.Toffoli: 'ccx' }
+
+def apply_circuit(circ, q):
+    for gate, bits in circ:
+        gate | tuple(q[b] for b in bits)
 
     for j in q:
         ops.Measure | j
 
-sim_backend = MainEngine(backend=Simulator(), engine_list=[LocalOptimizer(m=868)])
+# A pooled "simulator" is an engine with a register allocated on it
+def allocate(num_qubits):
+    eng = MainEngine(backend=Simulator(), engine_list=[LocalOptimizer(m=868)])
+    q = eng.allocate_qureg(num_qubits)
+    eng.flush()
+    return eng, q
+
+# ProjectQ has no reset, so measure every qubit, and flip back the ones that came out 1
+def reset(sim):
+    eng, q = sim
+    ops.All(ops.Measure) | q
+    eng.flush()
+    for j in q:
+        if int(j):
+            ops.X | j
+    eng.flush()
 
-def bench(num_qubits, depth):
-    q = sim_backend.allocate_qureg(num_qubits)
-    sim_backend.flush()
+def teardown(sim):
+    eng, q = sim
+    eng.flush(deallocate_qubits=True)
+
+def bench(sim, circ):
+    eng, q = sim
     start = time.time()
-    rand_circuit(num_qubits, depth, q)
-    sim_backend.flush()
+    apply_circuit(circ, q)
+    eng.flush()
     return time.time() - start
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS + LIFECYCLE_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-
-    headers = ['name', 'num_qubits', 'depth', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -75,29 +108,40 @@ def write_csv(writer, data):
 @click.option('--samples', default=100, help='Number of samples to take for each qubit.')
 @click.option('--qubits', default=28, help='How many qubits you want to test for')
 @click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--lifecycle', default='reuse', type=click.Choice(LIFECYCLE_POLICIES), help='Reset and reuse one engine per width, or allocate a fresh one per sample')
+@click.option('--pool-size', default=1, help='How many engines to pre-allocate per width')
 @click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
 @click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
-def benchmark(samples, qubits, depth, out, single):
+def benchmark(samples, qubits, depth, lifecycle, pool_size, out, single):
     if single:
         low = qubits - 1
     else:
         low = 3
     high = qubits
 
-    functions = bench,
     writer = create_csv(out)
+    pool = SimulatorPool(allocate, reset, teardown, policy=lifecycle, size=pool_size)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
 
     for n in range(low, high):
+        pool.fill(n + 1)
+
         for d in range(depth):
             # Progress counter
-            progress = (((n - low) * depth) + d) / ((high - low) * depth)
-            print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+            telemetry.point(num_qubits=n+1, depth=d+1)
 
             # Run the benchmarks
             for i in range(samples):
-                func = random.choice(functions)
-                t = func(n+1, d+1)
-                write_csv(writer, {'name': 'projectq_random', 'num_qubits': n+1, 'depth': d+1, 'time': t})
+                circ = rand_circuit(n+1, d+1)
+                stats = census([(gate_names[gate], bits) for gate, bits in circ], n+1)
+                # The last sample at this width tears its engine down
+                retire = (d == depth - 1) and (i == samples - 1)
+                t = pool.sample(n+1, lambda sim: bench(sim, circ), retire)
+                write_csv(writer, {'name': 'projectq_random', 'num_qubits': n+1, 'depth': d+1, 'time': t, **census_row(stats, t), **pool.lifecycle_row()})
+
+        pool.drain(n + 1)
 
 if __name__ == '__main__':
     benchmark()
@@ -0,0 +1,187 @@
+#Python to native dispatch overhead of PyQrack's per-gate calls, against circuit level submission with QrackCircuit
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+import math
+import cmath
+import statistics
+
+from pyqrack import QrackSimulator, QrackCircuit, Pauli
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+from random_unitary import random_u3
+
+# Each sample applies "reps" gates of one type, with targets cycling over every qubit (and the next qubit as the second
+# operand of two qubit gates), in one of three modes, and reports the average time per gate:
+#
+#   call:  one QrackSimulator method call per gate, as the other pyqrack scripts drive the simulator
+#   build: appending the same gates to a QrackCircuit (each append is still one call across the FFI)
+#   run:   QrackCircuit.run() of the circuit built above, as one call
+#
+# The state is randomized and entangled first, outside the timer, as in pyqrack_gates.py. Note that QrackCircuit
+# fuses gates as they are appended, so "run" also includes the benefit of its optimizer, which is part of what circuit
+# level submission buys.
+#
+# The simulator is built without QUnit, the stabilizer hybrid or the tensor network layer. Those buffer gates, and the
+# runs of h, x or t on one qubit that a cycle over few qubits makes would be cancelled (h h, x x) or fused (t t t t) by
+# them, rather than applied, so "call" would time their optimizer instead of one applied gate per call. Every qubit is
+# read before each timer stops, so that nothing queued is left out of the time.
+#
+# At one qubit, a gate barely touches any amplitudes, so the per-call time there is taken as the dispatch cost, and the
+# simulation cost at a width is the per-call time there, minus the dispatch cost. The analysis printed at the end gives,
+# per gate, the dispatch cost, and the first width at which simulation cost overtakes it.
+
+def random_mtrx():
+    return list(random_u3().reshape(-1))
+
+H = [1 / math.sqrt(2), 1 / math.sqrt(2), 1 / math.sqrt(2), -1 / math.sqrt(2)]
+X = [0, 1, 1, 0]
+T = [1, 0, 0, cmath.exp(1j * math.pi / 4)]
+
+def rz_mtrx(angle):
+    return [cmath.exp(-1j * angle / 2), 0, 0, cmath.exp(1j * angle / 2)]
+
+# Each gate is (simulator call, circuit append), with the target, the other qubit and a random parameter
+gates = {
+    'h': (lambda sim, q1, q2, m, a: sim.h(q1), lambda circ, q1, q2, m, a: circ.mtrx(H, q1)),
+    'x': (lambda sim, q1, q2, m, a: sim.x(q1), lambda circ, q1, q2, m, a: circ.mtrx(X, q1)),
+    't': (lambda sim, q1, q2, m, a: sim.t(q1), lambda circ, q1, q2, m, a: circ.mtrx(T, q1)),
+    'rz': (lambda sim, q1, q2, m, a: sim.r(Pauli.PauliZ, a, q1), lambda circ, q1, q2, m, a: circ.mtrx(rz_mtrx(a), q1)),
+    'mtrx': (lambda sim, q1, q2, m, a: sim.mtrx(m, q1), lambda circ, q1, q2, m, a: circ.mtrx(m, q1)),
+    'cx': (lambda sim, q1, q2, m, a: sim.mcx([q1], q2), lambda circ, q1, q2, m, a: circ.ucmtrx([q1], X, q2, 1)),
+    'swap': (lambda sim, q1, q2, m, a: sim.swap(q1, q2), lambda circ, q1, q2, m, a: circ.swap(q1, q2))
+}
+
+two_bit_gates = 'cx', 'swap'
+
+def prepare(sim):
+    sim.reset_all()
+    num_qubits = sim.num_qubits()
+    for i in range(num_qubits):
+        sim.u(i, random.uniform(0, 4 * math.pi), random.uniform(0, 2 * math.pi), random.uniform(0, 2 * math.pi))
+    for i in range(num_qubits - 1):
+        sim.mcx([i], i + 1)
+
+def make_simulator(num_qubits):
+    return QrackSimulator(num_qubits, isTensorNetwork=False, isSchmidtDecompose=False, isSchmidtDecomposeMulti=False, isStabilizerHybrid=False)
+
+# Force any buffered gates to be applied, on every qubit
+def flush(sim):
+    for q in range(sim.num_qubits()):
+        sim.prob(q)
+
+def operands(num_qubits, reps):
+    return [(i % num_qubits, (i + 1) % num_qubits, random_mtrx(), random.uniform(0, 4 * math.pi)) for i in range(reps)]
+
+def bench(sim, gate, reps):
+    num_qubits = sim.num_qubits()
+    ops = operands(num_qubits, reps)
+    call, append = gates[gate]
+
+    prepare(sim)
+    start = time.time()
+    for q1, q2, m, a in ops:
+        call(sim, q1, q2, m, a)
+    flush(sim)
+    call_time = (time.time() - start) / reps
+
+    start = time.time()
+    circ = QrackCircuit()
+    for q1, q2, m, a in ops:
+        append(circ, q1, q2, m, a)
+    build_time = (time.time() - start) / reps
+
+    prepare(sim)
+    start = time.time()
+    circ.run(sim)
+    flush(sim)
+    run_time = (time.time() - start) / reps
+
+    return { 'call': call_time, 'build': build_time, 'run': run_time }
+
+# First width, after the lowest, at which the per-call time, less the dispatch cost, reaches the dispatch cost
+def crossover(call_times):
+    widths = sorted(call_times.keys())
+    dispatch = statistics.median(call_times[widths[0]])
+    for w in widths[1:]:
+        if statistics.median(call_times[w]) - dispatch >= dispatch:
+            return dispatch, w
+    return dispatch, None
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'gate', 'mode', 'reps', 'time']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=20, help='How many qubits you want to test for')
+@click.option('--reps', default=1000, help='How many gates to apply, per sample')
+@click.option('--gates', 'gate_names', default=','.join(gates.keys()), help='Comma-separated gates to test')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, reps, gate_names, out, single):
+    # Dispatch cost is measured against the smallest simulator, so start from one qubit
+    if single:
+        low = qubits - 1
+    else:
+        low = 0
+    high = qubits
+
+    writer = create_csv(out)
+    call_times = { gate: {} for gate in gate_names.split(',') }
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        sim = make_simulator(n + 1)
+
+        # Progress counter
+        telemetry.point(num_qubits=n+1)
+
+        # Run the benchmarks
+        for gate in gate_names.split(','):
+            if gate in two_bit_gates and n == 0:
+                continue
+            for i in range(samples):
+                try:
+                    times = bench(sim, gate, reps)
+                    for mode, t in times.items():
+                        write_csv(writer, {'name': 'pyqrack_dispatch', 'num_qubits': n+1, 'gate': gate, 'mode': mode, 'reps': reps, 'time': t})
+                    call_times[gate].setdefault(n + 1, []).append(times['call'])
+                except:
+                    del sim
+                    write_csv(writer, {'name': 'pyqrack_dispatch', 'num_qubits': n+1, 'gate': gate, 'mode': 'call', 'reps': reps, 'time': -999})
+                    sim = make_simulator(n + 1)
+
+        # Call old simulator width destructor BEFORE initializing new width
+        del sim
+
+    print()
+    for gate, times in call_times.items():
+        if len(times) < 2:
+            continue
+        dispatch, width = crossover(times)
+        print('{0}: dispatch {1:.3g}s per call at {2} qubit(s); simulation cost overtakes it at {3}'.format(gate, dispatch, min(times.keys()), '{0} qubits'.format(width) if width is not None else 'no width tested'))
+
+if __name__ == '__main__':
+    benchmark()
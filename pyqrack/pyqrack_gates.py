@@ -0,0 +1,157 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+import math
+import cmath
+
+from pyqrack import QrackSimulator
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+from random_unitary import random_u3
+
+# Per-gate microbenchmark: each sample applies one gate "reps" times to a fixed target (and its next neighbor, for
+# two qubit gates), and reports the average time per gate. The state is first randomized and entangled, outside the
+# timer, since Qrack is much faster on separable states. Fit a cost model to the output with analysis/gate_cost_model.py.
+#
+# Repeating h, x, s, t, cx, cz or swap back to back would let QUnit buffer the run and cancel it to the identity (or
+# to a short cycle) before it is applied, so each gate is preceded by a different random unitary on the target, which
+# does not commute with it. The time of the same unitaries alone is subtracted, as the other *_gates.py scripts
+# subtract a baseline circuit, so the result can be slightly negative for cheap gates.
+
+def random_mtrx():
+    return list(random_u3().reshape(-1))
+
+def apply_h(sim, q1, q2, m):
+    sim.h(q1)
+
+def apply_s(sim, q1, q2, m):
+    sim.s(q1)
+
+def apply_t(sim, q1, q2, m):
+    sim.t(q1)
+
+def apply_cx(sim, q1, q2, m):
+    sim.mcx([q1], q2)
+
+def apply_cz(sim, q1, q2, m):
+    sim.mcz([q1], q2)
+
+def apply_swap(sim, q1, q2, m):
+    sim.swap(q1, q2)
+
+def apply_iswap(sim, q1, q2, m):
+    sim.iswap(q1, q2)
+
+def apply_cp(sim, q1, q2, m):
+    sim.mcmtrx([q1], [1, 0, 0, cmath.exp(1j * math.pi / 6)], q2)
+
+def apply_mtrx(sim, q1, q2, m):
+    sim.mtrx(m, q1)
+
+def apply_none(sim, q1, q2, m):
+    pass
+
+gates = {
+    'h': apply_h,
+    's': apply_s,
+    't': apply_t,
+    'cx': apply_cx,
+    'cz': apply_cz,
+    'swap': apply_swap,
+    'iswap': apply_iswap,
+    'cp': apply_cp,
+    'mtrx': apply_mtrx
+}
+
+def prepare(sim):
+    sim.reset_all()
+    num_qubits = sim.num_qubits()
+    for i in range(num_qubits):
+        sim.u(i, random.uniform(0, 4 * math.pi), random.uniform(0, 2 * math.pi), random.uniform(0, 2 * math.pi))
+    for i in range(num_qubits - 1):
+        sim.mcx([i], i + 1)
+
+def run(sim, fn, target, other, m, partners):
+    prepare(sim)
+    start = time.time()
+    for p in partners:
+        sim.mtrx(p, target)
+        fn(sim, target, other, m)
+    # Force any buffered gates to be applied, before stopping the timer
+    sim.prob(target)
+    return time.time() - start
+
+def bench(sim, gate, target, reps):
+    num_qubits = sim.num_qubits()
+    other = (target + 1) % num_qubits
+    m = random_mtrx()
+    partners = [random_mtrx() for i in range(reps)]
+    return (run(sim, gates[gate], target, other, m, partners) - run(sim, apply_none, target, other, m, partners)) / reps
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'gate', 'target', 'reps', 'time']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--reps', default=100, help='How many times to apply the gate, per sample')
+@click.option('--gates', 'gate_names', default=','.join(gates.keys()), help='Comma-separated gates to test')
+@click.option('--target-stride', default=1, help='Test every target-stride-th qubit index as the gate target')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, reps, gate_names, target_stride, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        sim = QrackSimulator(n + 1)
+
+        # Progress counter
+        telemetry.point(num_qubits=n+1)
+
+        # Run the benchmarks
+        for gate in gate_names.split(','):
+            for target in range(0, n + 1, target_stride):
+                for i in range(samples):
+                    try:
+                        t = bench(sim, gate, target, reps)
+                        write_csv(writer, {'name': 'pyqrack_gates', 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': t})
+                    except:
+                        del sim
+                        write_csv(writer, {'name': 'pyqrack_gates', 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': -999})
+                        sim = QrackSimulator(n + 1)
+
+        # Call old simulator width destructor BEFORE initializing new width
+        del sim
+
+if __name__ == '__main__':
+    benchmark()
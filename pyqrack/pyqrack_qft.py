@@ -5,15 +5,26 @@ import time
 import random
 import csv
 import os.path
+import sys
 import math
 
 from pyqrack import QrackSimulator, Pauli
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, pyqrack_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
 # NOTE - |0> or any permutation basis eigenstate QFT is "trivial" for Qrack, and not a fairly
 #  representative test of general QFT performance, in realistic use cases. Hence, this script
 #  applies a random unitary gate to every qubit in the width before carrying out the QFT.
 #  As a result, every other simulator gets a significant handicap, but a representative one.
 
+def qft(sim):
+    qubits = [i for i in range(sim.num_qubits())]
+    sim.qft(qubits)
+    sim.m_all()
+
 def bench(sim):
     sim.reset_all()
     num_qubits = sim.num_qubits()
@@ -22,18 +33,15 @@ def bench(sim):
         # Initialize with uniformly random single qubit gates, across full width.
         sim.u(i, random.uniform(0, 2 * math.pi), random.uniform(0, 2 * math.pi), random.uniform(0, 2 * math.pi))
     start = time.time()
-    qubits = [i for i in range(num_qubits)]
-    sim.qft(qubits)
-    sim.m_all()
+    qft(sim)
 
     return time.time() - start
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -61,21 +69,25 @@ def benchmark(samples, qubits, out, single):
     functions = bench,
     writer = create_csv(out)
 
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
     for n in range(low, high):
         sim = QrackSimulator(n + 1)
+        # The random initialization is not timed, so it is not counted
+        stats = pyqrack_census(qft, n + 1)
 
         # Progress counter
-        progress = (n - low) / (high - low)
-        print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+        telemetry.point(num_qubits=n+1)
 
         # Run the benchmarks
         for i in range(samples):
             try:
                 t = bench(sim)
-                write_csv(writer, {'name': 'pyqrack_qft', 'num_qubits': n+1, 'time': t})
+                write_csv(writer, {'name': 'pyqrack_qft', 'num_qubits': n+1, 'time': t, **census_row(stats, t)})
             except:
                 del sim
-                write_csv(writer, {'name': 'pyqrack_qft', 'num_qubits': n+1, 'time': -999})
+                write_csv(writer, {'name': 'pyqrack_qft', 'num_qubits': n+1, 'time': -999, **census_row(stats, -999)})
                 sim = QrackSimulator(n + 1)
 
         # Call old simulator width destructor BEFORE initializing new width
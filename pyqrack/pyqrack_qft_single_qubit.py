@@ -5,10 +5,16 @@ import time
 import random
 import csv
 import os.path
+import sys
 import math
 
 from pyqrack import QrackSimulator, Pauli
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, single_qubit_qft_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
 # NOTE - |0> or any permutation basis eigenstate QFT is "trivial" for Qrack, and not a fairly
 #  representative test of general QFT performance, in realistic use cases. Hence, this script
 #  applies a random unitary gate to every qubit in the width before carrying out the QFT.
@@ -35,14 +41,13 @@ def bench(sim, num_qubits):
         if m_results[-1]:
             sim.x(0)
 
-    return time.time() - start
+    return time.time() - start, m_results
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -70,19 +75,23 @@ def benchmark(samples, qubits, out, single):
     functions = bench,
     writer = create_csv(out)
 
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
     for n in range(low, high):
         sim = QrackSimulator(1)
 
         # Progress counter
-        progress = (n - low) / (high - low)
-        print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+        telemetry.point(num_qubits=n+1)
 
         # Run the benchmarks
         for i in range(samples):
             try:
-                t = bench(sim, n)
-                write_csv(writer, {'name': 'pyqrack_qft', 'num_qubits': n+1, 'time': t})
+                t, m_results = bench(sim, n)
+                stats = single_qubit_qft_census(m_results, phase='unitary')
+                write_csv(writer, {'name': 'pyqrack_qft', 'num_qubits': n+1, 'time': t, **census_row(stats, t)})
             except:
+                # The gates of a failed run are not known, so its census columns are left empty
                 del sim
                 write_csv(writer, {'name': 'pyqrack_qft', 'num_qubits': n+1, 'time': -999})
                 sim = QrackSimulator(1)
@@ -0,0 +1,238 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os
+import os.path
+import sys
+import math
+
+from pyqrack import QrackSimulator, Pauli
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+
+# Qrack reads its approximation knobs from the environment when a simulator is constructed, so every setting gets a
+# freshly constructed simulator. The exact reference is a simulator constructed with the knob unset. Each sample
+# replays an identical random circuit on both (via a shared seed) and compares final state vectors, before measurement.
+
+def x_to_y(circ, q):
+    circ.s(q)
+
+def x_to_z(circ, q):
+    circ.h(q)
+
+def y_to_z(circ, q):
+    circ.adjs(q)
+    circ.h(q)
+
+def y_to_x(circ, q):
+    circ.adjs(q)
+
+def z_to_x(circ, q):
+    circ.h(q)
+
+def z_to_y(circ, q):
+    circ.h(q)
+    circ.s(q)
+
+def cx(circ, q1, q2):
+    circ.mcx([q1], q2)
+
+def cy(circ, q1, q2):
+    circ.mcy([q1], q2)
+
+def cz(circ, q1, q2):
+    circ.mcz([q1], q2)
+
+def acx(circ, q1, q2):
+    circ.macx([q1], q2)
+
+def acy(circ, q1, q2):
+    circ.macy([q1], q2)
+
+def acz(circ, q1, q2):
+    circ.macz([q1], q2)
+
+def swap(circ, q1, q2):
+    circ.swap(q1, q2)
+
+def ident(circ, q1, q2):
+    pass
+
+# Implementation of random universal circuit (as pyqrack_t_nn.py, but without the final measurement)
+def random_circuit(depth, circ):
+    num_qubits = circ.num_qubits()
+    single_bit_gates = x_to_y, x_to_z, y_to_z, y_to_x, z_to_x, z_to_y
+    two_bit_gates = swap, ident, cx, cz, cy, acx, acz, acy
+    gateSequence = [ 0, 3, 2, 1, 2, 1, 0, 3 ]
+    colLen = math.floor(math.sqrt(num_qubits))
+    while ((math.floor(num_qubits / colLen) * colLen) != num_qubits):
+        colLen = colLen - 1
+    rowLen = num_qubits // colLen;
+
+    for i in range(depth):
+        # Single bit gates
+        for j in range(num_qubits):
+            # Random basis switch
+            gate = random.choice(single_bit_gates)
+            gate(circ, j)
+            circ.r(Pauli.PauliZ, random.uniform(0, 4 * math.pi), j)
+
+        gate = gateSequence[0]
+        gateSequence.pop(0)
+        gateSequence.append(gate)
+
+        for row in range(1, rowLen, 2):
+            for col in range(0, colLen):
+                tempRow = row;
+                tempCol = col;
+
+                tempRow = tempRow + (1 if (gate & 2) else -1)
+                if colLen != 1:
+                    tempCol = tempCol + (1 if (gate & 1) else 0)
+
+                if (tempRow < 0) or (tempCol < 0) or (tempRow >= rowLen) or (tempCol >= colLen):
+                    continue;
+
+                b1 = row * colLen + col;
+                b2 = tempRow * colLen + tempCol;
+
+                # Two bit gates
+                g = random.choice(two_bit_gates)
+                g(circ, b1, b2)
+
+    return circ
+
+def make_simulator(num_qubits, knob, value):
+    if value is None:
+        os.environ.pop(knob, None)
+    else:
+        os.environ[knob] = str(value)
+    return QrackSimulator(num_qubits)
+
+def fidelity(ket1, ket2):
+    overlap = sum(a.conjugate() * b for a, b in zip(ket1, ket2))
+    return abs(overlap) ** 2
+
+def bench(sim, depth, seed):
+    sim.reset_all()
+    random.seed(seed)
+    start = time.time()
+    random_circuit(depth, sim)
+    # Force any buffered gates to be applied, before stopping the timer. prob(q) only flushes the shard holding q, so
+    # every qubit is read, or gates on the other shards would be left for out_ket() to apply, outside the timer.
+    for q in range(sim.num_qubits()):
+        sim.prob(q)
+    t = time.time() - start
+    # The full ket is only needed for the fidelity, and would add the same 2^n cost to every setting
+    ket = sim.out_ket()
+    return t, ket
+
+# Pareto frontier of (mean time, mean fidelity), per width and depth
+def pareto_frontier(points):
+    frontier = []
+    best_fidelity = -1
+    for p in sorted(points, key=lambda p: (p['time'], -p['fidelity'])):
+        if p['fidelity'] > best_fidelity:
+            frontier.append(p)
+            best_fidelity = p['fidelity']
+
+    return frontier
+
+# Reporting
+def create_csv(filename, headers):
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=16, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--knob', default='QRACK_QUNIT_SEPARABILITY_THRESHOLD', help='Qrack approximation environment variable to sweep')
+@click.option('--values', default='0.0001,0.001,0.01,0.05,0.1,0.1464466,0.2,0.3', help='Comma-separated settings of the knob to sweep')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--frontier-out', default='pareto_frontier.csv', help='Where to store the CSV Pareto frontier of each width')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, knob, values, out, frontier_out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    settings = [None] + [float(v) for v in values.split(',')]
+
+    writer = create_csv(out, ['name', 'num_qubits', 'depth', 'knob', 'value', 'time', 'fidelity'])
+    frontier_writer = create_csv(frontier_out, ['name', 'num_qubits', 'depth', 'knob', 'value', 'time', 'fidelity'])
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), [depth]), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        for d in [depth - 1]:
+            # Progress counter
+            telemetry.point(num_qubits=n+1, depth=d+1)
+
+            seeds = [random.getrandbits(32) for i in range(samples)]
+            times = { v: [] for v in settings }
+            fidelities = { v: [] for v in settings }
+
+            # Exact reference, with the knob unset
+            ref_sim = make_simulator(n + 1, knob, None)
+            ref_kets = []
+            for seed in seeds:
+                t, ket = bench(ref_sim, d + 1, seed)
+                ref_kets.append(ket)
+                times[None].append(t)
+                fidelities[None].append(1.0)
+                write_csv(writer, {'name': 'pyqrack_sdrp_frontier', 'num_qubits': n+1, 'depth': d+1, 'knob': knob, 'value': 'exact', 'time': t, 'fidelity': 1.0})
+            del ref_sim
+
+            for v in settings[1:]:
+                sim = make_simulator(n + 1, knob, v)
+                for i in range(samples):
+                    try:
+                        t, ket = bench(sim, d + 1, seeds[i])
+                        f = fidelity(ref_kets[i], ket)
+                        times[v].append(t)
+                        fidelities[v].append(f)
+                        write_csv(writer, {'name': 'pyqrack_sdrp_frontier', 'num_qubits': n+1, 'depth': d+1, 'knob': knob, 'value': v, 'time': t, 'fidelity': f})
+                    except:
+                        del sim
+                        write_csv(writer, {'name': 'pyqrack_sdrp_frontier', 'num_qubits': n+1, 'depth': d+1, 'knob': knob, 'value': v, 'time': -999, 'fidelity': -999})
+                        sim = make_simulator(n + 1, knob, v)
+
+                # Call old simulator destructor BEFORE initializing the next setting
+                del sim
+
+            os.environ.pop(knob, None)
+
+            points = []
+            for v in settings:
+                if len(times[v]) == 0:
+                    continue
+                points.append({'value': 'exact' if v is None else v, 'time': sum(times[v]) / len(times[v]), 'fidelity': sum(fidelities[v]) / len(fidelities[v])})
+
+            print()
+            print("Pareto frontier for {0} qubits, depth {1}:".format(n + 1, d + 1))
+            for p in pareto_frontier(points):
+                print("  {0}={1}: {2:.6f}s, fidelity {3:.6f}".format(knob, p['value'], p['time'], p['fidelity']))
+                write_csv(frontier_writer, {'name': 'pyqrack_sdrp_frontier', 'num_qubits': n+1, 'depth': d+1, 'knob': knob, 'value': p['value'], 'time': p['time'], 'fidelity': p['fidelity']})
+
+if __name__ == '__main__':
+    benchmark()
@@ -6,9 +6,18 @@ import random
 import csv
 import os.path
 import math
+import cmath
+import sys
 
 from pyqrack import QrackSimulator, Pauli
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, pyqrack_census, census_row
+from simulator_pool import LIFECYCLE_HEADERS, LIFECYCLE_POLICIES, SimulatorPool
+from benchmark_telemetry import Telemetry, sweep
+from benchmark_profiling import PROFILE_MODES, Profiler
+
 def sqrtx(circ, t):
     circ.u(t, -3 * math.pi / 2, -math.pi / 2, math.pi / 2)
 
@@ -18,13 +27,53 @@ def sqrty(circ, t):
 def sqrtw(circ, t):
     circ.mtrx([math.sqrt(1 / 2), -((1j / 2) ** (1 / 2)), (-1j / 2) ** (1 / 2), math.sqrt(1 / 2)], t)
 
-def bench(sim, depth):
-    sim.reset_all()
+# Flat row-major matrices of the same gates, for the optional fusion pre-pass
+def u3_mtrx(th, ph, la):
+    c = math.cos(th / 2)
+    s = math.sin(th / 2)
+    return [c, -cmath.exp(1j * la) * s, cmath.exp(1j * ph) * s, cmath.exp(1j * (ph + la)) * c]
+
+def mtrx_mul(a, b):
+    return [a[0] * b[0] + a[1] * b[2], a[0] * b[1] + a[1] * b[3], a[2] * b[0] + a[3] * b[2], a[2] * b[1] + a[3] * b[3]]
+
+IDENTITY = [1, 0, 0, 1]
+
+gate_matrices = {
+    sqrtx: u3_mtrx(-3 * math.pi / 2, -math.pi / 2, math.pi / 2),
+    sqrty: u3_mtrx(-3 * math.pi / 2, 0, 0),
+    sqrtw: [math.sqrt(1 / 2), -((1j / 2) ** (1 / 2)), (-1j / 2) ** (1 / 2), math.sqrt(1 / 2)]
+}
+
+# Records the mtrx(), iswap() and mcmtrx() calls of a drawn circuit, to replay them on a simulator
+class CallRecorder:
+    def __init__(self, num_qubits):
+        self.width = num_qubits
+        self.calls = []
+
+    def num_qubits(self):
+        return self.width
+
+    def mtrx(self, m, t):
+        self.calls.append(('mtrx', (m, t)))
+
+    def iswap(self, b1, b2):
+        self.calls.append(('iswap', (b1, b2)))
+
+    def mcmtrx(self, c, m, t):
+        self.calls.append(('mcmtrx', (c, m, t)))
+
+    def replay(self, sim):
+        for method, args in self.calls:
+            getattr(sim, method)(*args)
+
+# Draws a random circuit of the given depth, and applies it to sim as it is drawn.
+# With fusion='1q', each layer of single bit gates is multiplied into the previous one, per qubit, and applied as one mtrx()
+# call just before the qubit's next two bit gate (or the end of the circuit). PyQrack has no general two qubit matrix
+# gate, so there is no '2q' option.
+def draw(sim, depth, fusion):
     gateSequence = [ 0, 3, 2, 1, 2, 1, 0, 3 ]
     single_bit_gates = sqrtx, sqrty, sqrtw
 
-    start = time.time()
-
     num_qubits = sim.num_qubits()
 
     colLen = math.floor(math.sqrt(num_qubits))
@@ -33,6 +82,7 @@ def bench(sim, depth):
     rowLen = num_qubits // colLen;
 
     lastSingleBitGates = []
+    fused = [IDENTITY] * num_qubits
 
     for i in range(depth):
         # Single bit gates
@@ -42,7 +92,10 @@ def bench(sim, depth):
             if len(lastSingleBitGates) > 0:
                 while gate == lastSingleBitGates[j]:
                     gate = random.choice(single_bit_gates)
-            gate(sim, j)
+            if fusion == 'none':
+                gate(sim, j)
+            else:
+                fused[j] = mtrx_mul(gate_matrices[gate], fused[j])
             singleBitGates.append(gate)
 
         lastSingleBitGates = singleBitGates
@@ -67,20 +120,41 @@ def bench(sim, depth):
                 b2 = tempRow * colLen + tempCol;
 
                 # Two bit gates
+                if fusion != 'none':
+                    for b in (b1, b2):
+                        if fused[b] is not IDENTITY:
+                            sim.mtrx(fused[b], b)
+                            fused[b] = IDENTITY
                 sim.iswap(b1, b2)
                 sim.mcmtrx([b1], [1, 0, 0, pow(-1, math.pi / 6)], b2)
 
-    qubits = [i for i in range(num_qubits)]
+    for j in range(num_qubits):
+        if fused[j] is not IDENTITY:
+            sim.mtrx(fused[j], j)
+
+# The pool resets (or freshly allocates) the simulator before each sample
+# Without fusion, gates are applied as they are drawn, inside the timer, as the other Sycamore scripts do. With fusion,
+# the circuit is drawn and its products computed first, into a CallRecorder, and only the replay of the fused calls
+# (and the measurement) is timed, so the pre-pass cost is not charged to the simulator.
+def bench(sim, depth, fusion='none'):
+    if fusion == 'none':
+        start = time.time()
+        draw(sim, depth, fusion)
+    else:
+        recorder = CallRecorder(sim.num_qubits())
+        draw(recorder, depth, fusion)
+        start = time.time()
+        recorder.replay(sim)
+
     sim.m_all()
 
     return time.time() - start
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'depth', 'time'] + LIFECYCLE_HEADERS + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'depth', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -97,9 +171,15 @@ def write_csv(writer, data):
 @click.option('--samples', default=100, help='Number of samples to take for each qubit.')
 @click.option('--qubits', default=28, help='How many qubits you want to test for')
 @click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--lifecycle', default='reuse', type=click.Choice(LIFECYCLE_POLICIES), help='Reset and reuse one simulator per width, or allocate a fresh one per sample')
+@click.option('--pool-size', default=1, help='How many simulators to pre-allocate per width')
+@click.option('--fusion', default='none', type=click.Choice(['none', '1q']), help='Fuse single qubit gates into one unitary per qubit, between two bit gates')
+@click.option('--profile', default='off', type=click.Choice(PROFILE_MODES), help='Profile gate dispatch, per phase: off, cprofile, or sample (statistical)')
+@click.option('--profile-points', default='', help='Points to profile, as width or width:depth, comma-separated (every point if empty)')
+@click.option('--profile-dir', default='profiles', help='Where to store profiles, collapsed stacks and top-N tables')
 @click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
 @click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
-def benchmark(samples, qubits, depth, out, single):
+def benchmark(samples, qubits, depth, lifecycle, pool_size, fusion, profile, profile_points, profile_dir, out, single):
     if single:
         low = qubits - 1
     else:
@@ -107,27 +187,45 @@ def benchmark(samples, qubits, depth, out, single):
     high = qubits
 
     writer = create_csv(out)
+    name = 'pyqrack_sycamore'
+    if fusion != 'none':
+        name = name + '_fused_' + fusion
+    profiler = Profiler(profile, profile_points, profile_dir, name)
+    pool = SimulatorPool(profiler.wrap('allocate', QrackSimulator), profiler.wrap('reset', lambda sim: sim.reset_all()), policy=lifecycle, size=pool_size)
+    depths = [depth - 1]
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), [d + 1 for d in depths]), samples)
+    writer = telemetry.watch(writer)
 
     for n in range(low, high):
-        sim = QrackSimulator(n + 1)
+        profiler.point(num_qubits=n+1)
+        pool.fill(n + 1)
 
-        for d in [depth - 1]:
+        for d in depths:
             # Progress counter
-            progress = (((n - low) * depth) + d) / ((high - low) * depth)
-            print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+            telemetry.point(num_qubits=n+1, depth=d+1)
+            profiler.point(num_qubits=n+1, depth=d+1)
+            # Profiled samples carry the profiler's overhead, so they are kept apart
+            row_name = name + '_profiled' if profiler.active else name
 
             # Run the benchmarks
             for i in range(samples):
+                # The last sample at this width tears its simulator down
+                retire = (d == depths[-1]) and (i == samples - 1)
+                # Count the same circuit's gates, from the same random state, before the timed run draws it
+                state = random.getstate()
+                stats = pyqrack_census(lambda circ: bench(circ, d + 1, fusion), n + 1)
+                random.setstate(state)
                 try:
-                    t = bench(sim, d + 1)
-                    write_csv(writer, {'name': 'pyqrack_sycamore', 'num_qubits': n+1, 'depth': d+1, 'time': t})
+                    t = pool.sample(n + 1, profiler.wrap('circuit', lambda sim: bench(sim, d + 1, fusion)), retire)
+                    write_csv(writer, {'name': row_name, 'num_qubits': n+1, 'depth': d+1, 'time': t, **pool.lifecycle_row(), **census_row(stats, t)})
                 except:
-                    del sim
-                    write_csv(writer, {'name': 'pyqrack_sycamore', 'num_qubits': n+1, 'depth': d+1, 'time': -999})
-                    sim = QrackSimulator(n + 1)
+                    write_csv(writer, {'name': row_name, 'num_qubits': n+1, 'depth': d+1, 'time': -999, **pool.lifecycle_row(), **census_row(stats, -999)})
 
         # Call old simulator width destructor BEFORE initializing new width
-        del sim
+        pool.drain(n + 1)
+
+    profiler.close()
 
 if __name__ == '__main__':
     benchmark()
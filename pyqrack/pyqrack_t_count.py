@@ -0,0 +1,195 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+import math
+
+from pyqrack import QrackSimulator
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, pyqrack_census, census_row
+from benchmark_telemetry import Telemetry
+
+# Near-Clifford sweep, with the same seeded Clifford skeleton and T gate placement as qiskit/qiskit_t_count.py. Compare
+# with --no-stabilizer-hybrid to see where the stabilizer hybrid layer stops paying off.
+
+def x_to_y(circ, q):
+    circ.s(q)
+
+def x_to_z(circ, q):
+    circ.h(q)
+
+def y_to_z(circ, q):
+    circ.adjs(q)
+    circ.h(q)
+
+def y_to_x(circ, q):
+    circ.adjs(q)
+
+def z_to_x(circ, q):
+    circ.h(q)
+
+def z_to_y(circ, q):
+    circ.h(q)
+    circ.s(q)
+
+def cx(circ, q1, q2):
+    circ.mcx([q1], q2)
+
+def cy(circ, q1, q2):
+    circ.mcy([q1], q2)
+
+def cz(circ, q1, q2):
+    circ.mcz([q1], q2)
+
+def acx(circ, q1, q2):
+    circ.x(q1)
+    circ.mcx([q1], q2)
+
+def acy(circ, q1, q2):
+    circ.x(q1)
+    circ.mcy([q1], q2)
+
+def acz(circ, q1, q2):
+    circ.x(q1)
+    circ.mcz([q1], q2)
+
+def swap(circ, q1, q2):
+    circ.swap(q1, q2)
+
+def ident(circ, q1, q2):
+    pass
+
+# Implementation of near-Clifford circuit
+def t_count_circuit(num_qubits, depth, t_count, seed, circ):
+    random.seed(seed)
+    single_bit_gates = x_to_y, x_to_z, y_to_z, y_to_x, z_to_x, z_to_y
+    two_bit_gates = ident, swap, cx, cz, cy, acx, acz, acy
+    gateSequence = [ 0, 3, 2, 1, 2, 1, 0, 3 ]
+    colLen = math.floor(math.sqrt(num_qubits))
+    while ((math.floor(num_qubits / colLen) * colLen) != num_qubits):
+        colLen = colLen - 1
+    rowLen = num_qubits // colLen;
+
+    slots = list(range(num_qubits * depth))
+    random.shuffle(slots)
+    t_slots = set(slots[:t_count])
+
+    for i in range(depth):
+        # Single bit gates
+        for j in range(num_qubits):
+            # Random basis switch
+            gate = random.choice(single_bit_gates)
+            gate(circ, j)
+
+            # Random 1/4 increment phase change, x0 to x3
+            if random.getrandbits(1) > 0:
+                circ.z(j)
+            if random.getrandbits(1) > 0:
+                if random.getrandbits(1) > 0:
+                    circ.s(j)
+                else:
+                    circ.adjs(j)
+
+            # The sign is drawn for every slot, so the skeleton does not depend on t_count
+            adjoint = random.getrandbits(1) > 0
+            if (i * num_qubits + j) in t_slots:
+                if adjoint:
+                    circ.adjt(j)
+                else:
+                    circ.t(j)
+
+        gate = gateSequence[0]
+        gateSequence.pop(0)
+        gateSequence.append(gate)
+
+        for row in range(1, rowLen, 2):
+            for col in range(0, colLen):
+                tempRow = row;
+                tempCol = col;
+
+                tempRow = tempRow + (1 if (gate & 2) else -1)
+                if colLen != 1:
+                    tempCol = tempCol + (1 if (gate & 1) else 0)
+
+                if (tempRow < 0) or (tempCol < 0) or (tempRow >= rowLen) or (tempCol >= colLen):
+                    continue;
+
+                b1 = row * colLen + col;
+                b2 = tempRow * colLen + tempCol;
+
+                # Two bit gates
+                g = random.choice(two_bit_gates)
+                g(circ, b1, b2)
+
+    circ.m_all()
+
+    return circ
+
+def bench(sim, depth, t_count, seed):
+    sim.reset_all()
+    start = time.time()
+    t_count_circuit(sim.num_qubits(), depth, t_count, seed, sim)
+    return time.time() - start
+
+# Reporting
+def create_csv(filename):
+    # The census has the t_count column, counted from the circuit
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each T count.')
+@click.option('--qubits', default=24, help='Circuit width')
+@click.option('--depth', default=20, help='Circuit depth')
+@click.option('--max-t-count', default=32, help='Largest T count to test; T counts run from 0 to this')
+@click.option('--t-step', default=1, help='Step between tested T counts')
+@click.option('--stabilizer-hybrid/--no-stabilizer-hybrid', default=True, help='Use the Qrack stabilizer hybrid layer, or dense simulation')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+def benchmark(samples, qubits, depth, max_t_count, t_step, stabilizer_hybrid, out):
+    t_counts = list(range(0, min(max_t_count, qubits * depth) + 1, t_step))
+    seeds = [random.getrandbits(32) for i in range(samples)]
+
+    name = 'pyqrack_t_count' if stabilizer_hybrid else 'pyqrack_t_count_no_stabilizer_hybrid'
+    writer = create_csv(out)
+
+    sim = QrackSimulator(qubits, isStabilizerHybrid=stabilizer_hybrid)
+
+    telemetry = Telemetry([{ 'num_qubits': qubits, 'depth': depth, 't_count': t } for t in t_counts], samples)
+    writer = telemetry.watch(writer)
+
+    for t_count in t_counts:
+        # Progress counter
+        telemetry.point(num_qubits=qubits, depth=depth, t_count=t_count)
+
+        # Run the benchmarks
+        for seed in seeds:
+            # The circuit is fixed by its seed, so the census draws the same one
+            stats = pyqrack_census(lambda circ: t_count_circuit(qubits, depth, t_count, seed, circ), qubits)
+            try:
+                t = bench(sim, depth, t_count, seed)
+                write_csv(writer, {'name': name, 'num_qubits': qubits, 'depth': depth, 'time': t, **census_row(stats, t)})
+            except:
+                del sim
+                write_csv(writer, {'name': name, 'num_qubits': qubits, 'depth': depth, 'time': -999, **census_row(stats, -999)})
+                sim = QrackSimulator(qubits, isStabilizerHybrid=stabilizer_hybrid)
+
+if __name__ == '__main__':
+    benchmark()
@@ -6,9 +6,17 @@ import random
 import csv
 import os.path
 import math
+import sys
 
 from pyqrack import QrackSimulator, Pauli
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, pyqrack_census, census_row
+from simulator_pool import LIFECYCLE_HEADERS, LIFECYCLE_POLICIES, SimulatorPool
+from benchmark_telemetry import Telemetry, sweep
+from benchmark_profiling import PROFILE_MODES, Profiler
+
 def x_to_y(circ, q):
     circ.s(q)
 
@@ -100,18 +108,17 @@ def random_circuit(depth, circ):
 
     return circ
 
+# The pool resets (or freshly allocates) the simulator before each sample
 def bench(sim, depth):
-    sim.reset_all()
     start = time.time()
     circ = random_circuit(depth, sim)
     return time.time() - start
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'depth', 'time'] + LIFECYCLE_HEADERS + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-
-    headers = ['name', 'num_qubits', 'depth', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -128,9 +135,14 @@ def write_csv(writer, data):
 @click.option('--samples', default=100, help='Number of samples to take for each qubit.')
 @click.option('--qubits', default=28, help='How many qubits you want to test for')
 @click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--lifecycle', default='reuse', type=click.Choice(LIFECYCLE_POLICIES), help='Reset and reuse one simulator per width, or allocate a fresh one per sample')
+@click.option('--pool-size', default=1, help='How many simulators to pre-allocate per width')
+@click.option('--profile', default='off', type=click.Choice(PROFILE_MODES), help='Profile gate dispatch, per phase: off, cprofile, or sample (statistical)')
+@click.option('--profile-points', default='', help='Points to profile, as width or width:depth, comma-separated (every point if empty)')
+@click.option('--profile-dir', default='profiles', help='Where to store profiles, collapsed stacks and top-N tables')
 @click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
 @click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
-def benchmark(samples, qubits, depth, out, single):
+def benchmark(samples, qubits, depth, lifecycle, pool_size, profile, profile_points, profile_dir, out, single):
     if single:
         low = qubits - 1
     else:
@@ -138,27 +150,43 @@ def benchmark(samples, qubits, depth, out, single):
     high = qubits
 
     writer = create_csv(out)
-    
+    name = 'pyqrack_t_nn_no_compile'
+    profiler = Profiler(profile, profile_points, profile_dir, name)
+    pool = SimulatorPool(profiler.wrap('allocate', QrackSimulator), profiler.wrap('reset', lambda sim: sim.reset_all()), policy=lifecycle, size=pool_size)
+    depths = list(range(depth))
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), [d + 1 for d in depths]), samples)
+    writer = telemetry.watch(writer)
+
     for n in range(low, high):
-        sim = QrackSimulator(n + 1)
+        profiler.point(num_qubits=n+1)
+        pool.fill(n + 1)
 
-        for d in range(depth):
+        for d in depths:
             # Progress counter
-            progress = (((n - low) * depth) + d) / ((high - low) * depth)
-            print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+            telemetry.point(num_qubits=n+1, depth=d+1)
+            profiler.point(num_qubits=n+1, depth=d+1)
+            # Profiled samples carry the profiler's overhead, so they are kept apart
+            row_name = name + '_profiled' if profiler.active else name
 
             # Run the benchmarks
             for i in range(samples):
+                # The last sample at this width tears its simulator down
+                retire = (d == depths[-1]) and (i == samples - 1)
+                # Count the same circuit's gates, from the same random state, before the timed run draws it
+                state = random.getstate()
+                stats = pyqrack_census(lambda circ: random_circuit(d + 1, circ), n + 1)
+                random.setstate(state)
                 try:
-                    t = bench(sim, d + 1)
-                    write_csv(writer, {'name': 'pyqrack_t_nn_no_compile', 'num_qubits': n+1, 'depth': d+1, 'time': t})
+                    t = pool.sample(n + 1, profiler.wrap('circuit', lambda sim: bench(sim, d + 1)), retire)
+                    write_csv(writer, {'name': row_name, 'num_qubits': n+1, 'depth': d+1, 'time': t, **pool.lifecycle_row(), **census_row(stats, t)})
                 except:
-                    del sim
-                    write_csv(writer, {'name': 'pyqrack_t_nn_no_compile', 'num_qubits': n+1, 'depth': d+1, 'time': -999})
-                    sim = QrackSimulator(n + 1)
+                    write_csv(writer, {'name': row_name, 'num_qubits': n+1, 'depth': d+1, 'time': -999, **pool.lifecycle_row(), **census_row(stats, -999)})
 
         # Call old simulator width destructor BEFORE initializing new width
-        del sim
+        pool.drain(n + 1)
+
+    profiler.close()
 
 if __name__ == '__main__':
     benchmark()
@@ -0,0 +1,118 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+import math
+
+from pyquil import get_qc, Program
+from pyquil.quil import DefGate
+from pyquil.gates import H, S, T, CNOT, CZ, SWAP, ISWAP, CPHASE, RX, RZ
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+from random_unitary import random_u3
+
+# Per-gate microbenchmark: each sample times a program that applies one gate "reps" times to a fixed target (and its
+# next neighbor, for two qubit gates), minus the time of the same program without those gates, and reports the
+# average time per gate. Fit a cost model to the output with analysis/gate_cost_model.py.
+
+def random_mtrx():
+    return DefGate('MTRX', random_u3())
+
+gates = {
+    'h': lambda q1, q2, m: H(q1),
+    's': lambda q1, q2, m: S(q1),
+    't': lambda q1, q2, m: T(q1),
+    'cx': lambda q1, q2, m: CNOT(q1, q2),
+    'cz': lambda q1, q2, m: CZ(q1, q2),
+    'swap': lambda q1, q2, m: SWAP(q1, q2),
+    'iswap': lambda q1, q2, m: ISWAP(q1, q2),
+    'cp': lambda q1, q2, m: CPHASE(math.pi / 6, q1, q2),
+    'mtrx': lambda q1, q2, m: m.get_constructor()(q1)
+}
+
+def prepare(num_qubits, m):
+    circ = Program()
+    circ += m
+    for i in range(num_qubits):
+        circ += RX(random.uniform(0, 4 * math.pi), i)
+        circ += RZ(random.uniform(0, 4 * math.pi), i)
+    for i in range(num_qubits - 1):
+        circ += CNOT(i, i + 1)
+    return circ
+
+def run(sim_backend, circ):
+    start = time.time()
+    sim_backend.run_and_measure(circ, trials=1)
+    return time.time() - start
+
+def bench(sim_backend, num_qubits, gate, target, reps):
+    other = (target + 1) % num_qubits
+    m = random_mtrx()
+    fn = gates[gate]
+    baseline = prepare(num_qubits, m)
+    circ = baseline.copy()
+    for i in range(reps):
+        circ += fn(target, other, m)
+    return (run(sim_backend, circ) - run(sim_backend, baseline)) / reps
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'gate', 'target', 'reps', 'time']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--reps', default=100, help='How many times to apply the gate, per sample')
+@click.option('--gates', 'gate_names', default=','.join(gates.keys()), help='Comma-separated gates to test')
+@click.option('--target-stride', default=1, help='Test every target-stride-th qubit index as the gate target')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, reps, gate_names, target_stride, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        sim_backend = get_qc(str(n + 1) + 'q-qvm')
+
+        # Progress counter
+        telemetry.point(num_qubits=n+1)
+
+        # Run the benchmarks
+        for gate in gate_names.split(','):
+            for target in range(0, n + 1, target_stride):
+                for i in range(samples):
+                    try:
+                        t = bench(sim_backend, n + 1, gate, target, reps)
+                        write_csv(writer, {'name': 'pyquil_gates', 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': t})
+                    except:
+                        write_csv(writer, {'name': 'pyquil_gates', 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': -999})
+
+if __name__ == '__main__':
+    benchmark()
@@ -7,12 +7,18 @@ import random
 import csv
 import os.path
 import math
+import sys
 
 from typing import List
 
 from pyquil import get_qc, Program
 from pyquil.gates import SWAP, H, CPHASE
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, pyquil_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
 # Implementation of the Quantum Fourier Transform
 def _core_qft(qubits: List[int], coeff: int) -> Program:
     """
@@ -48,16 +54,16 @@ def qft(qubits: List[int]) -> Program:
 def bench(num_qubits):
     circ = qft(range(num_qubits))
     sim_backend = get_qc(str(num_qubits) + 'q-qvm')
+    stats = pyquil_census(circ, num_qubits)
     start = time.time()
     sim_backend.run_and_measure(circ, trials=1)
-    return time.time() - start
+    return time.time() - start, stats
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -85,16 +91,18 @@ def benchmark(samples, qubits, out, single):
     functions = bench,
     writer = create_csv(out)
 
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
     for n in range(low, high):
         # Progress counter
-        progress = (n - low) / (high - low)
-        print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+        telemetry.point(num_qubits=n+1)
 
         # Run the benchmarks
         for i in range(samples):
             func = random.choice(functions)
-            t = func(n + 1)
-            write_csv(writer, {'name': 'pyquil_qft', 'num_qubits': n+1, 'time': t})
+            t, stats = func(n + 1)
+            write_csv(writer, {'name': 'pyquil_qft', 'num_qubits': n+1, 'time': t, **census_row(stats, t)})
 
 if __name__ == '__main__':
     benchmark()
@@ -7,11 +7,19 @@ import random
 import csv
 import os.path
 import math
+import sys
 
 from typing import List
 
+import numpy as np
 from pyquil import get_qc, Program
 from pyquil.gates import SWAP, RX, RY, H, CPHASE
+from pyquil.quil import DefGate
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, pyquil_census, census_row
+from benchmark_telemetry import Telemetry, sweep
 
 def sqrtx(t):
     return RX(math.pi / 2, t)
@@ -24,13 +32,33 @@ def sqrty(t):
 # the other simulators, making reasonable allowance for easily-implemented extensions to the simulator API,
 # replacing "sqrth" with "H" is probably a fairer test.
 
+# Matrices of the same gates, for the optional fusion pre-pass
+gate_matrices = {
+    sqrtx: np.array([[1, -1j], [-1j, 1]]) / math.sqrt(2),
+    sqrty: np.array([[1, -1], [1, 1]]) / math.sqrt(2),
+    H: np.array([[1, 1], [1, -1]]) / math.sqrt(2)
+}
+
+CP = np.diag([1, 1, 1, np.exp(1j * math.pi / 6)])
+SWAP_MATRIX = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
+
+# Each fused unitary is its own DEFGATE, named FUSED_<n> after its position in the program (the census counts these as
+# "matrix")
+def fused_gate(circ, m, qubits):
+    defn = DefGate('FUSED_' + str(len(circ)), m)
+    circ.append(defn)
+    circ.append(defn.get_constructor()(*qubits))
+
 # Implementation of Sycamore circuit
-def _core_sycamore_circuit(reg: List[int], depth: int) -> Program:
+# With fusion='1q', the single bit gates are applied as one 2x2 unitary per qubit, per cycle.
+# With fusion='2q', those unitaries are multiplied into the CPHASE and SWAP of each coupler, as one 4x4 unitary.
+def _core_sycamore_circuit(reg: List[int], depth: int, fusion: str = 'none') -> Program:
     """
     Generates the core program to perform an approximation of the Sycamore chip benchmark
     
     :param qubits: A list of qubit indexes.
     :param depth: Benchmark circuit depth
+    :param fusion: Gate fusion mode: 'none', '1q' or '2q'
     :return: A Quil program to perform an approximation of the Sycamore chip benchmark
     """
 
@@ -47,6 +75,8 @@ def _core_sycamore_circuit(reg: List[int], depth: int) -> Program:
     rowLen = num_qubits // colLen;
 
     for i in range(depth):
+        fused = [np.identity(2) for j in range(num_qubits)]
+
         # Single bit gates
         singleBitGates = []
         for j in range(num_qubits):
@@ -54,11 +84,18 @@ def _core_sycamore_circuit(reg: List[int], depth: int) -> Program:
             if len(lastSingleBitGates) > 0:
                 while gate == lastSingleBitGates[j]:
                     gate = random.choice(single_bit_gates)
-            circ.append(gate(reg[j]))
+            if fusion == 'none':
+                circ.append(gate(reg[j]))
+            else:
+                fused[j] = gate_matrices[gate] @ fused[j]
             singleBitGates.append(gate)
 
         lastSingleBitGates = singleBitGates
 
+        if fusion == '1q':
+            for j in range(num_qubits):
+                fused_gate(circ, fused[j], [reg[j]])
+
         gate = gateSequence[0]
         gateSequence.pop(0)
         gateSequence.append(gate)
@@ -79,34 +116,47 @@ def _core_sycamore_circuit(reg: List[int], depth: int) -> Program:
                 b2 = tempRow * colLen + tempCol;
 
                 # Two bit gates
-                circ.append(CPHASE(math.pi / 6, reg[b1], reg[b2]))
-                circ.append(SWAP(reg[b1], reg[b2]))
+                if fusion == '2q':
+                    # Quil gate matrices take the first qubit as the high bit
+                    fused_gate(circ, SWAP_MATRIX @ CP @ np.kron(fused[b1], fused[b2]), [reg[b1], reg[b2]])
+                    fused[b1] = None
+                    fused[b2] = None
+                else:
+                    circ.append(CPHASE(math.pi / 6, reg[b1], reg[b2]))
+                    circ.append(SWAP(reg[b1], reg[b2]))
+
+        if fusion == '2q':
+            # Qubits without a coupler in this cycle
+            for j in range(num_qubits):
+                if fused[j] is not None:
+                    fused_gate(circ, fused[j], [reg[j]])
 
     return circ
 
-def sycamore_circuit(qubits: List[int], depth: int) -> Program:
+def sycamore_circuit(qubits: List[int], depth: int, fusion: str = 'none') -> Program:
     """
     Generate a program to perform an approximation of the Sycamore chip benchmark.
     :param qubits: A list of qubit indexes.
     :param depth: Benchmark circuit depth
+    :param fusion: Gate fusion mode: 'none', '1q' or '2q'
     :return: A Quil program to perform an approximation of the Sycamore chip benchmark
     """
-    p = Program().inst(_core_sycamore_circuit(qubits, depth))
+    p = Program().inst(_core_sycamore_circuit(qubits, depth, fusion))
     return p
 
-def bench(num_qubits, depth):
-    circ = sycamore_circuit(range(num_qubits), depth)
+def bench(num_qubits, depth, fusion):
+    circ = sycamore_circuit(range(num_qubits), depth, fusion)
     sim_backend = get_qc(str(num_qubits) + 'q-qvm')
+    stats = pyquil_census(circ, num_qubits)
     start = time.time()
     sim_backend.run_and_measure(circ, trials=1)
-    return time.time() - start
+    return time.time() - start, stats
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'depth', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -123,9 +173,10 @@ def write_csv(writer, data):
 @click.option('--samples', default=100, help='Number of samples to take for each qubit.')
 @click.option('--qubits', default=28, help='How many qubits you want to test for')
 @click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--fusion', default='none', type=click.Choice(['none', '1q', '2q']), help='Fuse gates into 1 or 2 qubit unitaries before execution')
 @click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
 @click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
-def benchmark(samples, qubits, depth, out, single):
+def benchmark(samples, qubits, depth, fusion, out, single):
     if single:
         low = qubits - 1
     else:
@@ -134,18 +185,23 @@ def benchmark(samples, qubits, depth, out, single):
 
     functions = bench,
     writer = create_csv(out)
+    name = 'pyquil_random'
+    if fusion != 'none':
+        name = name + '_fused_' + fusion
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
 
     for n in range(low, high):
         for d in range(depth):
             # Progress counter
-            progress = (((n - low) * depth) + d) / ((high - low) * depth)
-            print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+            telemetry.point(num_qubits=n+1, depth=d+1)
 
             # Run the benchmarks
             for i in range(samples):
                 func = random.choice(functions)
-                t = func(n+1, d+1)
-                write_csv(writer, {'name': 'pyquil_random', 'num_qubits': n+1, 'depth': d+1, 'time': t})
+                t, stats = func(n+1, d+1, fusion)
+                write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'time': t, **census_row(stats, t)})
 
 if __name__ == '__main__':
     benchmark()
@@ -0,0 +1,141 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import csv
+import os.path
+import sys
+import math
+
+import qcgpu
+from qcgpu import Gate
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, qcgpu_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+from random_unitary import random_u3
+
+# Per-gate microbenchmark: each sample applies one gate "reps" times to a fixed target (and its next neighbor, for
+# two qubit gates), and reports the average time per gate. qcgpu has no iSWAP, and SWAP is decomposed into 3 CNOTs,
+# as in qcgpu_sycamore_approximation.py. Fit a cost model to the output with analysis/gate_cost_model.py.
+
+def random_mtrx():
+    return Gate(random_u3())
+
+def apply_h(state, q1, q2, m):
+    state.h(q1)
+
+def apply_s(state, q1, q2, m):
+    state.s(q1)
+
+def apply_t(state, q1, q2, m):
+    state.u1(q1, math.pi / 4)
+
+def apply_cx(state, q1, q2, m):
+    state.cx(q1, q2)
+
+def apply_cz(state, q1, q2, m):
+    state.cz(q1, q2)
+
+def apply_swap(state, q1, q2, m):
+    state.cx(q1, q2)
+    state.cx(q2, q1)
+    state.cx(q1, q2)
+
+def apply_cp(state, q1, q2, m):
+    state.cu1(q1, q2, math.pi / 6)
+
+def apply_mtrx(state, q1, q2, m):
+    state.apply_gate(m, q1)
+
+gates = {
+    'h': apply_h,
+    's': apply_s,
+    't': apply_t,
+    'cx': apply_cx,
+    'cz': apply_cz,
+    'swap': apply_swap,
+    'cp': apply_cp,
+    'mtrx': apply_mtrx
+}
+
+def prepare(num_qubits):
+    state = qcgpu.State(num_qubits)
+    for i in range(num_qubits):
+        state.apply_gate(random_mtrx(), i)
+    for i in range(num_qubits - 1):
+        state.cx(i, i + 1)
+    state.backend.queue.finish()
+    return state
+
+def bench(num_qubits, gate, target, reps):
+    state = prepare(num_qubits)
+    other = (target + 1) % num_qubits
+    m = random_mtrx()
+    fn = gates[gate]
+    start = time.time()
+    for i in range(reps):
+        fn(state, target, other, m)
+    state.backend.queue.finish()
+    return (time.time() - start) / reps
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'gate', 'target', 'reps', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--reps', default=100, help='How many times to apply the gate, per sample')
+@click.option('--gates', 'gate_names', default=','.join(gates.keys()), help='Comma-separated gates to test')
+@click.option('--target-stride', default=1, help='Test every target-stride-th qubit index as the gate target')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, reps, gate_names, target_stride, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    for gate in gate_names.split(','):
+        if gate not in gates:
+            raise click.BadParameter('Unknown gate: ' + gate)
+
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        # Progress counter
+        telemetry.point(num_qubits=n+1)
+
+        # Run the benchmarks
+        for gate in gate_names.split(','):
+            for target in range(0, n + 1, target_stride):
+                # The time is per application, so the census is of one application
+                stats = qcgpu_census(lambda circ: gates[gate](circ, target, (target + 1) % (n + 1), None), n + 1)
+                for i in range(samples):
+                    try:
+                        t = bench(n + 1, gate, target, reps)
+                        write_csv(writer, {'name': 'qcgpu_gates', 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': t, **census_row(stats, t)})
+                    except:
+                        write_csv(writer, {'name': 'qcgpu_gates', 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': -999, **census_row(stats, -999)})
+
+if __name__ == '__main__':
+    benchmark()
@@ -7,29 +7,42 @@ import statistics
 import csv
 import os.path
 import math
+import sys
 
 import qcgpu
 
-def bench(num_qubits):
-    start = time.time()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, qcgpu_census, census_row
+from simulator_pool import LIFECYCLE_HEADERS, SimulatorPool
+from benchmark_telemetry import Telemetry, sweep
+
+# qcgpu has no reset, so every sample gets a fresh state, allocated (and initialized) before the timer starts
+def allocate(num_qubits):
     state = qcgpu.State(num_qubits)
+    state.backend.queue.finish()
+    return state
 
+def qft(state):
+    num_qubits = state.num_qubits
     for j in range(num_qubits):
         for k in range(j):
             state.cu1(j, k, math.pi/float(2**(j-k)))
         state.h(j)
     state.measure()
 
+def bench(state):
+    start = time.time()
+    qft(state)
     state.backend.queue.finish()
     return time.time() - start
     
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'time'] + LIFECYCLE_HEADERS + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -45,9 +58,10 @@ def write_csv(writer, data):
 @click.command()
 @click.option('--samples', default=100, help='Number of samples to take for each qubit.')
 @click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--pool-size', default=1, help='How many states to pre-allocate per width')
 @click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
 @click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
-def benchmark(samples, qubits, out, single):
+def benchmark(samples, qubits, pool_size, out, single):
     if single:
         low = qubits - 1
     else:
@@ -56,17 +70,25 @@ def benchmark(samples, qubits, out, single):
 
     functions = bench,
     writer = create_csv(out)
+    pool = SimulatorPool(allocate, policy='fresh', size=pool_size)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
 
     for n in range(low, high):
+        stats = qcgpu_census(qft, n + 1)
+
         # Progress counter
-        progress = (n - low) / (high - low)
-        print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+        telemetry.point(num_qubits=n+1)
 
         # Run the benchmarks
         for i in range(samples):
             func = random.choice(functions)
-            t = func(n + 1)
-            write_csv(writer, {'name': 'qcgpu_qft', 'num_qubits': n+1, 'time': t})
+            pool.fill(n + 1)
+            t = pool.sample(n + 1, func)
+            write_csv(writer, {'name': 'qcgpu_qft', 'num_qubits': n+1, 'time': t, **pool.lifecycle_row(), **census_row(stats, t)})
+
+        pool.drain(n + 1)
 
 if __name__ == '__main__':
     benchmark()
@@ -6,11 +6,17 @@ import random
 import statistics
 import csv
 import os.path
+import sys
 import math
 import numpy as np
 
 import qcgpu
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, single_qubit_qft_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
 def phase_root_n(sim, n, q):
     phase_root_n_matrix = np.array([
         [1, 0],
@@ -47,15 +53,14 @@ def bench(num_qubits):
         if m_results[-1]:
             state.x(0)
 
-    return time.time() - start
+    return time.time() - start, m_results
     
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -83,16 +88,19 @@ def benchmark(samples, qubits, out, single):
     functions = bench,
     writer = create_csv(out)
 
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
     for n in range(low, high):
         # Progress counter
-        progress = (n - low) / (high - low)
-        print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+        telemetry.point(num_qubits=n+1)
 
         # Run the benchmarks
         for i in range(samples):
             func = random.choice(functions)
-            t = func(n + 1)
-            write_csv(writer, {'name': 'qcgpu_qft', 'num_qubits': n+1, 'time': t})
+            t, m_results = func(n + 1)
+            stats = single_qubit_qft_census(m_results, u='unitary', phase='unitary')
+            write_csv(writer, {'name': 'qcgpu_qft', 'num_qubits': n+1, 'time': t, **census_row(stats, t)})
 
 if __name__ == '__main__':
     benchmark()
@@ -6,10 +6,24 @@ import random
 import csv
 import os.path
 import math
+import sys
 
+import numpy as np
 import qcgpu
 from qcgpu import Gate
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, qcgpu_census, census_row
+from simulator_pool import LIFECYCLE_HEADERS, SimulatorPool
+from benchmark_telemetry import Telemetry, sweep
+
+# qcgpu has no reset, so every sample gets a fresh state, allocated (and initialized) before the timer starts
+def allocate(num_qubits):
+    state = qcgpu.State(num_qubits)
+    state.backend.queue.finish()
+    return state
+
 # Decomposition of ISWAP
 # We assume that the addition of iswap to the API is a basically trivial task.
 # This keeps parity with similarly motivated allowances for Qiskit and QVM.
@@ -40,8 +54,17 @@ def sqrtw(circ, t):
     # To 18 digits of precision for the angle parameters:
     circ.apply_gate(Gate([[(1-1j)/2, 1/math.sqrt(2)+0j], [1j/math.sqrt(2), (1-1j)/2]]), t)
 
+# Matrices of the same gates (up to global phase), for the optional fusion pre-pass
+SQRTX = np.array([[1+1j, 1-1j], [1-1j, 1+1j]]) / 2
+SQRTY = np.array([[1+1j, -1-1j], [1+1j, 1+1j]]) / 2
+SQRTW = np.array([[(1-1j)/2, 1/math.sqrt(2)+0j], [1j/math.sqrt(2), (1-1j)/2]])
+
+gate_matrices = { sqrtx: SQRTX, sqrty: SQRTY, sqrtw: SQRTW }
+
 # Implementation of Sycamore circuit
-def sycamore_circuit(num_qubits, depth, circ):
+# With fusion='1q', both layers of single bit gates in each cycle are multiplied into one 2x2 unitary per qubit.
+# (qcgpu has no general two qubit gate, so there is no '2q' option.)
+def sycamore_circuit(num_qubits, depth, circ, fusion='none'):
     gateSequence = [ 0, 3, 2, 1, 2, 1, 0, 3 ]
     single_bit_gates = sqrtx, sqrty, sqrtw
 
@@ -53,10 +76,15 @@ def sycamore_circuit(num_qubits, depth, circ):
     lastSingleBitGates = []
 
     for i in range(depth):
+        fused = [np.identity(2) for j in range(num_qubits)]
+
         # Single bit gates
         for j in range(num_qubits):
             gate = random.choice(single_bit_gates)
-            gate(circ, j)
+            if fusion == 'none':
+                gate(circ, j)
+            else:
+                fused[j] = gate_matrices[gate] @ fused[j]
 
         singleBitGates = []
         for j in range(num_qubits):
@@ -64,11 +92,18 @@ def sycamore_circuit(num_qubits, depth, circ):
             if len(lastSingleBitGates) > 0:
                 while gate == lastSingleBitGates[j]:
                     gate = random.choice(single_bit_gates)
-            gate(circ, j)
+            if fusion == 'none':
+                gate(circ, j)
+            else:
+                fused[j] = gate_matrices[gate] @ fused[j]
             singleBitGates.append(gate)
 
         lastSingleBitGates = singleBitGates
 
+        if fusion == '1q':
+            for j in range(num_qubits):
+                circ.apply_gate(Gate(fused[j]), j)
+
         gate = gateSequence[0]
         gateSequence.pop(0)
         gateSequence.append(gate)
@@ -97,19 +132,18 @@ def sycamore_circuit(num_qubits, depth, circ):
 
     return circ
 
-def bench(num_qubits, depth):
+def bench(state, depth, fusion):
+    num_qubits = state.num_qubits
     start = time.time()
-    state = qcgpu.State(num_qubits)
-    sycamore_circuit(num_qubits, depth, state)
+    sycamore_circuit(num_qubits, depth, state, fusion)
     state.backend.queue.finish()
     return time.time() - start
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'depth', 'time'] + LIFECYCLE_HEADERS + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'depth', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -126,9 +160,11 @@ def write_csv(writer, data):
 @click.option('--samples', default=100, help='Number of samples to take for each qubit.')
 @click.option('--qubits', default=28, help='How many qubits you want to test for')
 @click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--fusion', default='none', type=click.Choice(['none', '1q']), help='Fuse single qubit gates into one unitary per qubit, per cycle')
+@click.option('--pool-size', default=1, help='How many states to pre-allocate per width')
 @click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
 @click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
-def benchmark(samples, qubits, depth, out, single):
+def benchmark(samples, qubits, depth, fusion, pool_size, out, single):
     if single:
         low = qubits - 1
     else:
@@ -137,18 +173,32 @@ def benchmark(samples, qubits, depth, out, single):
 
     functions = bench,
     writer = create_csv(out)
+    pool = SimulatorPool(allocate, policy='fresh', size=pool_size)
+
+    name = 'qcgpu_sycamore'
+    if fusion != 'none':
+        name = name + '_fused_' + fusion
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
 
     for n in range(low, high):
         for d in range(depth):
             # Progress counter
-            progress = (((n - low) * depth) + d) / ((high - low) * depth)
-            print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+            telemetry.point(num_qubits=n+1, depth=d+1)
 
             # Run the benchmarks
             for i in range(samples):
                 func = random.choice(functions)
-                t = func(n+1, d+1)
-                write_csv(writer, {'name': 'qcgpu_sycamore', 'num_qubits': n+1, 'depth': d+1, 'time': t})
+                # Count the same circuit's gates, from the same random state, before the timed run draws it
+                state = random.getstate()
+                stats = qcgpu_census(lambda circ: sycamore_circuit(n + 1, d + 1, circ, fusion), n + 1)
+                random.setstate(state)
+                pool.fill(n + 1)
+                t = pool.sample(n + 1, lambda state: func(state, d+1, fusion))
+                write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'time': t, **pool.lifecycle_row(), **census_row(stats, t)})
+
+        pool.drain(n + 1)
 
 if __name__ == '__main__':
     benchmark()
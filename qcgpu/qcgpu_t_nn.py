@@ -6,9 +6,22 @@ import random
 import csv
 import os.path
 import math
+import sys
 
 import qcgpu
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, qcgpu_census, census_row
+from simulator_pool import LIFECYCLE_HEADERS, SimulatorPool
+from benchmark_telemetry import Telemetry, sweep
+
+# qcgpu has no reset, so every sample gets a fresh state, allocated (and initialized) before the timer starts
+def allocate(num_qubits):
+    state = qcgpu.State(num_qubits)
+    state.backend.queue.finish()
+    return state
+
 def x_to_y(circ, q):
     circ.s(q)
 
@@ -62,8 +75,8 @@ def ident(circ, q1, q2):
     pass
 
 # Implementation of random universal circuit
-def random_circuit(num_qubits, depth):
-    circ = qcgpu.State(num_qubits)
+def random_circuit(depth, circ):
+    num_qubits = circ.num_qubits
     single_bit_gates = x_to_y, x_to_z, y_to_z, y_to_x, z_to_x, z_to_y
     # two_bit_gates = ident, ident, cx, cz, cy, acx, acz, acy
     two_bit_gates = swap, ident, cx, cz, cy, acx, acz, acy
@@ -108,17 +121,16 @@ def random_circuit(num_qubits, depth):
 
     return circ
 
-def bench(num_qubits, depth):
+def bench(state, depth):
     start = time.time()
-    circ = random_circuit(num_qubits, depth)
+    circ = random_circuit(depth, state)
     return time.time() - start
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'depth', 'time'] + LIFECYCLE_HEADERS + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-
-    headers = ['name', 'num_qubits', 'depth', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -135,9 +147,10 @@ def write_csv(writer, data):
 @click.option('--samples', default=100, help='Number of samples to take for each qubit.')
 @click.option('--qubits', default=28, help='How many qubits you want to test for')
 @click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--pool-size', default=1, help='How many states to pre-allocate per width')
 @click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
 @click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
-def benchmark(samples, qubits, depth, out, single):
+def benchmark(samples, qubits, depth, pool_size, out, single):
     if single:
         low = qubits - 1
     else:
@@ -145,17 +158,27 @@ def benchmark(samples, qubits, depth, out, single):
     high = qubits
 
     writer = create_csv(out)
-    
+    pool = SimulatorPool(allocate, policy='fresh', size=pool_size)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
+
     for n in range(low, high):
         for d in range(depth):
             # Progress counter
-            progress = (((n - low) * depth) + d) / ((high - low) * depth)
-            print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+            telemetry.point(num_qubits=n+1, depth=d+1)
 
             # Run the benchmarks
             for i in range(samples):
-                t = bench(n + 1, d + 1)
-                write_csv(writer, {'name': 'qcgpu_t_nn', 'num_qubits': n+1, 'depth': d+1, 'time': t})
+                # Count the same circuit's gates, from the same random state, before the timed run draws it
+                state = random.getstate()
+                stats = qcgpu_census(lambda circ: random_circuit(d + 1, circ), n + 1)
+                random.setstate(state)
+                pool.fill(n + 1)
+                t = pool.sample(n + 1, lambda state: bench(state, d + 1))
+                write_csv(writer, {'name': 'qcgpu_t_nn', 'num_qubits': n+1, 'depth': d+1, 'time': t, **pool.lifecycle_row(), **census_row(stats, t)})
+
+        pool.drain(n + 1)
 
 if __name__ == '__main__':
     benchmark()
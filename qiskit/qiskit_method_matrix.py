@@ -0,0 +1,166 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+
+from qiskit import QuantumCircuit
+from qiskit import execute, Aer
+
+from qiskit_qft import qft
+from qiskit_sycamore import sycamore_circuit
+from qiskit_t_nn import random_circuit
+from qiskit_t_count import t_count_circuit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+
+# Aer simulation method sweep, on CPU. Each sample builds one circuit per family, width and depth, and runs it with
+# every method, in random order. The crossover map records which method had the lowest mean time at each point, and
+# by how much it beat the runner up. Methods that fail, or do not apply, are left out of the map.
+
+# Gates the stabilizer method can run
+CLIFFORD_OPS = { 'h', 's', 'sdg', 'x', 'y', 'z', 'cx', 'cy', 'cz', 'swap', 'id', 'measure', 'barrier' }
+
+families = {
+    'qft': lambda n, d, circ: qft(n, circ),
+    'sycamore': lambda n, d, circ: sycamore_circuit(n, d, circ),
+    't_nn': lambda n, d, circ: random_circuit(n, d, circ),
+    # The T-count skeleton with no T gates: Clifford only
+    'clifford': lambda n, d, circ: t_count_circuit(n, d, 0, random.getrandbits(32), circ)
+}
+
+methods = 'statevector', 'density_matrix', 'matrix_product_state', 'extended_stabilizer', 'stabilizer', 'unitary'
+
+sim_backend = Aer.get_backend('qasm_simulator')
+unitary_backend = Aer.get_backend('unitary_simulator')
+
+def applicable(circ, method, max_density_qubits, max_unitary_qubits):
+    if method == 'density_matrix':
+        return circ.num_qubits <= max_density_qubits
+    if method == 'unitary':
+        return circ.num_qubits <= max_unitary_qubits
+    if method == 'stabilizer':
+        return set(circ.count_ops().keys()) <= CLIFFORD_OPS
+    return True
+
+def bench(circ, method):
+    if method == 'unitary':
+        # The unitary simulator takes no measurements
+        circ = circ.remove_final_measurements(inplace=False)
+        start = time.time()
+        job = execute([circ], unitary_backend, timeout=600)
+    else:
+        start = time.time()
+        job = execute([circ], sim_backend, timeout=600, shots=1, method=method)
+    result = job.result()
+    if not result.success:
+        raise RuntimeError(result.status)
+    return time.time() - start
+
+# Reporting
+def create_csv(filename, headers):
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+def print_crossover_map(family, crossover):
+    # One letter per method, as in the legend
+    letters = { 'statevector': 's', 'density_matrix': 'd', 'matrix_product_state': 'p', 'extended_stabilizer': 'x', 'stabilizer': 'c', 'unitary': 'u' }
+    widths = sorted(set(n for n, d in crossover))
+    depths = sorted(set(d for n, d in crossover))
+    print()
+    print("Fastest method for {0} (s=statevector, d=density_matrix, p=matrix_product_state, x=extended_stabilizer, c=stabilizer, u=unitary):".format(family))
+    print("depth\\width " + ' '.join("{0:>3d}".format(n) for n in widths))
+    for d in depths:
+        print("{0:>11d} ".format(d) + ' '.join("{0:>3s}".format(letters[crossover[(n, d)]] if (n, d) in crossover else '-') for n in widths))
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--depths', default='1,5,10,20', help='Comma-separated circuit depths to test (not used by qft)')
+@click.option('--families', 'family_names', default=','.join(families.keys()), help='Comma-separated circuit families to test')
+@click.option('--methods', 'method_names', default=','.join(methods), help='Comma-separated Aer methods to test')
+@click.option('--max-density-qubits', default=14, help='Widest circuit to run with density_matrix')
+@click.option('--max-unitary-qubits', default=12, help='Widest circuit to run with unitary')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--crossover-out', default='method_crossover.csv', help='Where to store the CSV crossover map')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depths, family_names, method_names, max_density_qubits, max_unitary_qubits, out, crossover_out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    method_list = method_names.split(',')
+    for method in method_list:
+        if method not in methods:
+            raise click.BadParameter('Unknown method: ' + method)
+
+    family_list = family_names.split(',')
+    depth_list = [int(d) for d in depths.split(',')]
+
+    writer = create_csv(out, ['name', 'family', 'method', 'num_qubits', 'depth', 'time'])
+    crossover_writer = create_csv(crossover_out, ['family', 'num_qubits', 'depth', 'fastest', 'time', 'runner_up', 'runner_up_time'])
+
+    # qft has no depth, so its points are keyed by width alone
+    plan = []
+    for family in family_list:
+        family_plan = sweep(range(low + 1, high + 1)) if family == 'qft' else sweep(range(low + 1, high + 1), depth_list)
+        plan += [{ 'family': family, **p } for p in family_plan]
+    telemetry = Telemetry(plan, samples)
+    writer = telemetry.watch(writer)
+
+    for family in family_list:
+        family_depths = [0] if family == 'qft' else depth_list
+        crossover = {}
+
+        for n in range(low, high):
+            for d in family_depths:
+                # Progress counter
+                if family == 'qft':
+                    telemetry.point(family=family, num_qubits=n+1)
+                else:
+                    telemetry.point(family=family, num_qubits=n+1, depth=d)
+
+                times = { method: [] for method in method_list }
+                for i in range(samples):
+                    circ = QuantumCircuit(n + 1, n + 1)
+                    families[family](n + 1, d, circ)
+
+                    # Run the benchmarks
+                    for method in random.sample(method_list, len(method_list)):
+                        if not applicable(circ, method, max_density_qubits, max_unitary_qubits):
+                            continue
+                        try:
+                            t = bench(circ, method)
+                            times[method].append(t)
+                            write_csv(writer, {'name': 'qiskit_method_matrix', 'family': family, 'method': method, 'num_qubits': n+1, 'depth': d, 'time': t})
+                        except:
+                            write_csv(writer, {'name': 'qiskit_method_matrix', 'family': family, 'method': method, 'num_qubits': n+1, 'depth': d, 'time': -999})
+
+                ranked = sorted((sum(ts) / len(ts), method) for method, ts in times.items() if len(ts) > 0)
+                if len(ranked) == 0:
+                    continue
+                crossover[(n + 1, d)] = ranked[0][1]
+                write_csv(crossover_writer, {'family': family, 'num_qubits': n+1, 'depth': d, 'fastest': ranked[0][1], 'time': ranked[0][0], 'runner_up': ranked[1][1] if len(ranked) > 1 else '', 'runner_up_time': ranked[1][0] if len(ranked) > 1 else ''})
+
+        print_crossover_map(family, crossover)
+
+if __name__ == '__main__':
+    benchmark()
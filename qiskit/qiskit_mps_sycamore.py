@@ -0,0 +1,100 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import csv
+import os.path
+import sys
+
+from qiskit import QuantumCircuit
+from qiskit import execute, Aer
+
+from qiskit_sycamore import sycamore_circuit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, qiskit_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
+# Sycamore circuits on Aer's matrix_product_state method. The final MPS is saved before measurement, to report its
+# largest bond dimension and size. Aer does not report its truncation error, so that column is left empty; compare
+# with reference/reference_mps_sycamore.py at the same --max-bond and --threshold for an estimate.
+
+sim_backend = Aer.get_backend('qasm_simulator')
+
+def bench(circ, max_bond, threshold):
+    circ.remove_final_measurements()
+    circ.save_matrix_product_state()
+    circ.measure_all()
+
+    options = { 'matrix_product_state_truncation_threshold': threshold }
+    if max_bond > 0:
+        options['matrix_product_state_max_bond_dimension'] = max_bond
+
+    start = time.time()
+    job = execute([circ], sim_backend, timeout=600, shots=1, method='matrix_product_state', **options)
+    result = job.result()
+    t = time.time() - start
+
+    gammas, lambdas = result.data(0)['matrix_product_state']
+    max_bond_dim = max([len(l) for l in lambdas], default=1)
+    memory = sum(g[0].nbytes + g[1].nbytes for g in gammas) + sum(l.nbytes for l in lambdas)
+
+    return t, max_bond_dim, memory
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'max_bond', 'threshold', 'max_bond_dim', 'truncation_error', 'memory', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=100, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--max-bond', default=0, help='Maximum bond dimension (0 for no limit)')
+@click.option('--threshold', default=1e-16, help="Aer's matrix_product_state_truncation_threshold")
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, max_bond, threshold, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        for d in range(depth):
+            # Progress counter
+            telemetry.point(num_qubits=n+1, depth=d+1)
+
+            # Run the benchmarks
+            for i in range(samples):
+                circ = QuantumCircuit(n + 1, n + 1)
+                sycamore_circuit(n + 1, d + 1, circ)
+                # Counted before bench adds the save instruction, which is not a gate
+                stats = qiskit_census(circ)
+                try:
+                    t, max_bond_dim, memory = bench(circ, max_bond, threshold)
+                    write_csv(writer, {'name': 'qiskit_mps_sycamore', 'num_qubits': n+1, 'depth': d+1, 'max_bond': max_bond, 'threshold': threshold, 'max_bond_dim': max_bond_dim, 'truncation_error': '', 'memory': memory, 'time': t, **census_row(stats, t)})
+                except:
+                    write_csv(writer, {'name': 'qiskit_mps_sycamore', 'num_qubits': n+1, 'depth': d+1, 'max_bond': max_bond, 'threshold': threshold, 'max_bond_dim': -999, 'truncation_error': '', 'memory': -999, 'time': -999, **census_row(stats, -999)})
+
+if __name__ == '__main__':
+    benchmark()
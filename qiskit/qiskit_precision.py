@@ -0,0 +1,119 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+import multiprocessing
+import resource
+import tempfile
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit import execute, Aer
+
+from qiskit_sycamore import sycamore_circuit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+
+# Precision sweep of Aer's statevector method on Sycamore circuits, as reference/reference_precision.py: each run is
+# in its own child process, for its peak memory, and fidelity is against the double precision final state.
+
+def run_child(conn, path, num_qubits, depth, precision, seed):
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    random.seed(seed)
+    circ = QuantumCircuit(num_qubits, num_qubits)
+    sycamore_circuit(num_qubits, depth, circ)
+    circ.remove_final_measurements()
+    circ.save_statevector()
+    sim_backend = Aer.get_backend('qasm_simulator')
+    start = time.time()
+    job = execute([circ], sim_backend, timeout=600, shots=1, method='statevector', precision=precision)
+    result = job.result()
+    t = time.time() - start
+    # ru_maxrss is in kilobytes, on Linux
+    peak = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) * 1024
+    np.save(path, np.asarray(result.get_statevector()))
+    conn.send((t, peak))
+    conn.close()
+
+def bench(num_qubits, depth, precision, seed, state_dir):
+    fd, path = tempfile.mkstemp(suffix='.npy', dir=state_dir)
+    os.close(fd)
+    try:
+        conn, child_conn = multiprocessing.Pipe()
+        p = multiprocessing.Process(target=run_child, args=(child_conn, path, num_qubits, depth, precision, seed))
+        p.start()
+        t, peak = conn.recv()
+        p.join()
+        # The mapping outlives the file's name
+        state = np.load(path, mmap_mode='r')
+    finally:
+        os.remove(path)
+    return t, peak, state
+
+# Upcast one chunk at a time, rather than whole copies of both states
+def fidelity(ket1, ket2, chunk=1 << 20):
+    overlap = 0
+    for i in range(0, len(ket1), chunk):
+        overlap += np.vdot(ket1[i:i + chunk].astype(np.complex128), ket2[i:i + chunk].astype(np.complex128))
+    return abs(overlap) ** 2
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'precision', 'time', 'peak_memory', 'fidelity']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--state-dir', default='.', help='Where each run writes its final state for the fidelity (at large widths, not a tmpfs)')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, state_dir, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), [depth]), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        for d in [depth - 1]:
+            # Progress counter
+            telemetry.point(num_qubits=n+1, depth=d+1)
+
+            # Run the benchmarks
+            for i in range(samples):
+                seed = random.getrandbits(32)
+                try:
+                    t, peak, exact = bench(n + 1, d + 1, 'double', seed, state_dir)
+                    write_csv(writer, {'name': 'qiskit_precision_sycamore', 'num_qubits': n+1, 'depth': d+1, 'precision': 'double', 'time': t, 'peak_memory': peak, 'fidelity': 1.0})
+                    t, peak, state = bench(n + 1, d + 1, 'single', seed, state_dir)
+                    write_csv(writer, {'name': 'qiskit_precision_sycamore', 'num_qubits': n+1, 'depth': d+1, 'precision': 'single', 'time': t, 'peak_memory': peak, 'fidelity': fidelity(exact, state)})
+                except:
+                    write_csv(writer, {'name': 'qiskit_precision_sycamore', 'num_qubits': n+1, 'depth': d+1, 'precision': '', 'time': -999, 'peak_memory': -999, 'fidelity': -999})
+
+if __name__ == '__main__':
+    benchmark()
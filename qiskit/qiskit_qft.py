@@ -1,15 +1,21 @@
 #Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
 
 import click
-import time
 import random
 import csv
 import os.path
 import math
+import sys
 
 from qiskit import QuantumCircuit
 from qiskit import execute, Aer
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, qiskit_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+from benchmark_timing import GC_MODES, TIMING_HEADERS, TimedRegion
+
 # Implementation of the Quantum Fourier Transform
 def qft(num_qubits, circ):
     # Quantum Fourier Transform
@@ -24,20 +30,20 @@ def qft(num_qubits, circ):
 
 sim_backend = Aer.get_backend('qasm_simulator')
 
-def bench(num_qubits):
+def bench(num_qubits, timing):
     circ = QuantumCircuit(num_qubits, num_qubits)
     qft(num_qubits, circ)
-    start = time.time()
-    job = execute([circ], sim_backend, timeout=600, shots=1)
-    result = job.result()
-    return time.time() - start
+    stats = qiskit_census(circ)
+    with timing.region():
+        job = execute([circ], sim_backend, timeout=600, shots=1)
+        result = job.result()
+    return timing.time, stats, timing.row()
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'time'] + CENSUS_HEADERS + TIMING_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -53,9 +59,11 @@ def write_csv(writer, data):
 @click.command()
 @click.option('--samples', default=100, help='Number of samples to take for each qubit.')
 @click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--gc', 'gc_mode', default='on', type=click.Choice(GC_MODES), help='Garbage collector in the timed region: on, off, or freeze the objects built before it')
+@click.option('--gc-collect', default=False, help='Collect garbage between samples, outside the timed region')
 @click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
 @click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
-def benchmark(samples, qubits, out, single):
+def benchmark(samples, qubits, gc_mode, gc_collect, out, single):
     if single:
         low = qubits - 1
     else:
@@ -64,17 +72,20 @@ def benchmark(samples, qubits, out, single):
 
     functions = bench,
     writer = create_csv(out)
+    timing = TimedRegion(gc_mode, gc_collect)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
 
     for n in range(low, high):
         # Progress counter
-        progress = (n - low) / (high - low)
-        print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+        telemetry.point(num_qubits=n+1)
 
         # Run the benchmarks
         for i in range(samples):
             func = random.choice(functions)
-            t = func(n + 1)
-            write_csv(writer, {'name': 'qiskit_qft', 'num_qubits': n+1, 'time': t})
+            t, stats, gc_stats = func(n + 1, timing)
+            write_csv(writer, {'name': 'qiskit_qft', 'num_qubits': n+1, 'time': t, **census_row(stats, t), **gc_stats})
 
 if __name__ == '__main__':
     benchmark()
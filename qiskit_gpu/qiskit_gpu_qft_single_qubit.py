@@ -6,12 +6,18 @@ import random
 import csv
 import os.path
 import math
+import sys
 
 from qiskit import QuantumCircuit
 from qiskit import execute, Aer
 from qiskit.providers.aer import QasmSimulator
 from qiskit.circuit.library.standard_gates.p import PhaseGate
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, qiskit_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
 # Implementation of the Quantum Fourier Transform
 def qft(num_qubits, circ):
     start = time.time()
@@ -33,17 +39,17 @@ sim_backend = QasmSimulator(shots=1, method='statevector_gpu')
 def bench(num_qubits):
     circ = QuantumCircuit(1, num_qubits)
     qft(num_qubits, circ)
+    stats = qiskit_census(circ)
     start = time.time()
     job = execute([circ], sim_backend, timeout=600)
     result = job.result()
-    return time.time() - start
+    return time.time() - start, stats
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -71,16 +77,18 @@ def benchmark(samples, qubits, out, single):
     functions = bench,
     writer = create_csv(out)
 
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
     for n in range(low, high):
         # Progress counter
-        progress = (n - low) / (high - low)
-        print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+        telemetry.point(num_qubits=n+1)
 
         # Run the benchmarks
         for i in range(samples):
             func = random.choice(functions)
-            t = func(n + 1)
-            write_csv(writer, {'name': 'qiskit_qft', 'num_qubits': n+1, 'time': t})
+            t, stats = func(n + 1)
+            write_csv(writer, {'name': 'qiskit_qft', 'num_qubits': n+1, 'time': t, **census_row(stats, t)})
 
 if __name__ == '__main__':
     benchmark()
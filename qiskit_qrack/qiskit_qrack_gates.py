@@ -0,0 +1,148 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+import math
+
+from qiskit import QuantumCircuit
+from qiskit import execute
+from qiskit.providers.qrack import QasmSimulator
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+from random_unitary import random_u3
+
+# Per-gate microbenchmark: each sample times a circuit that applies one gate "reps" times to a fixed target (and its
+# next neighbor, for two qubit gates), minus the time of the same circuit without those gates, and reports the average
+# time per gate. Transpiler optimization is off, so repeated gates are not cancelled.
+# Fit a cost model to the output with analysis/gate_cost_model.py.
+
+def random_mtrx():
+    return random_u3()
+
+def apply_h(circ, q1, q2, m):
+    circ.h(q1)
+
+def apply_s(circ, q1, q2, m):
+    circ.s(q1)
+
+def apply_t(circ, q1, q2, m):
+    circ.t(q1)
+
+def apply_cx(circ, q1, q2, m):
+    circ.cx(q1, q2)
+
+def apply_cz(circ, q1, q2, m):
+    circ.cz(q1, q2)
+
+def apply_swap(circ, q1, q2, m):
+    circ.swap(q1, q2)
+
+def apply_iswap(circ, q1, q2, m):
+    circ.iswap(q1, q2)
+
+def apply_cp(circ, q1, q2, m):
+    circ.cp(math.pi / 6, q1, q2)
+
+def apply_mtrx(circ, q1, q2, m):
+    circ.unitary(m, [q1])
+
+gates = {
+    'h': apply_h,
+    's': apply_s,
+    't': apply_t,
+    'cx': apply_cx,
+    'cz': apply_cz,
+    'swap': apply_swap,
+    'iswap': apply_iswap,
+    'cp': apply_cp,
+    'mtrx': apply_mtrx
+}
+
+def prepare(num_qubits):
+    circ = QuantumCircuit(num_qubits, num_qubits)
+    for i in range(num_qubits):
+        circ.u(random.uniform(0, 4 * math.pi), random.uniform(0, 2 * math.pi), random.uniform(0, 2 * math.pi), i)
+    for i in range(num_qubits - 1):
+        circ.cx(i, i + 1)
+    return circ
+
+sim_backend = QasmSimulator(shots=1)
+
+def run(circ):
+    start = time.time()
+    job = execute([circ], sim_backend, timeout=600, shots=1, optimization_level=0)
+    result = job.result()
+    return time.time() - start
+
+def bench(num_qubits, gate, target, reps):
+    other = (target + 1) % num_qubits
+    m = random_mtrx()
+    fn = gates[gate]
+    baseline = prepare(num_qubits)
+    circ = baseline.copy()
+    for i in range(reps):
+        fn(circ, target, other, m)
+    for j in range(num_qubits):
+        baseline.measure(j, j)
+        circ.measure(j, j)
+    return (run(circ) - run(baseline)) / reps
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'gate', 'target', 'reps', 'time']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--reps', default=100, help='How many times to apply the gate, per sample')
+@click.option('--gates', 'gate_names', default=','.join(gates.keys()), help='Comma-separated gates to test')
+@click.option('--target-stride', default=1, help='Test every target-stride-th qubit index as the gate target')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, reps, gate_names, target_stride, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        # Progress counter
+        telemetry.point(num_qubits=n+1)
+
+        # Run the benchmarks
+        for gate in gate_names.split(','):
+            for target in range(0, n + 1, target_stride):
+                for i in range(samples):
+                    try:
+                        t = bench(n + 1, gate, target, reps)
+                        write_csv(writer, {'name': 'qiskit_qrack_gates', 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': t})
+                    except:
+                        write_csv(writer, {'name': 'qiskit_qrack_gates', 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': -999})
+
+if __name__ == '__main__':
+    benchmark()
@@ -6,12 +6,19 @@ import random
 import csv
 import os.path
 import math
+import sys
 
+import numpy as np
 from qiskit import QuantumCircuit
 from qiskit import execute
 from qiskit.compiler.transpiler import transpile
 from qiskit.providers.qrack import QasmSimulator
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, qiskit_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
 def sqrtx(circ, t):
     circ.sx(t)
 
@@ -21,8 +28,19 @@ def sqrty(circ, t):
 def sqrtw(circ, t):
     circ.unitary([[(1-1j)/2, 1/math.sqrt(2)+0j], [1j/math.sqrt(2), (1-1j)/2]], [t])
 
+# Matrices of the same gates, for the optional fusion pre-pass
+SQRTX = np.array([[1+1j, 1-1j], [1-1j, 1+1j]]) / 2
+SQRTY = np.array([[1, -1], [1, 1]]) / math.sqrt(2)
+SQRTW = np.array([[(1-1j)/2, 1/math.sqrt(2)+0j], [1j/math.sqrt(2), (1-1j)/2]])
+CP = np.diag([1, 1, 1, np.exp(1j * math.pi / 6)])
+ISWAP = np.array([[1, 0, 0, 0], [0, 0, 1j, 0], [0, 1j, 0, 0], [0, 0, 0, 1]])
+
+gate_matrices = { sqrtx: SQRTX, sqrty: SQRTY, sqrtw: SQRTW }
+
 # Implementation of Sycamore circuit
-def sycamore_circuit(num_qubits, depth, circ):
+# With fusion='1q', both layers of single bit gates in each cycle are multiplied into one 2x2 unitary per qubit.
+# With fusion='2q', those unitaries are further multiplied into the CP and iSWAP of each coupler, as one 4x4 unitary.
+def sycamore_circuit(num_qubits, depth, circ, fusion='none'):
     gateSequence = [ 0, 3, 2, 1, 2, 1, 0, 3 ]
     single_bit_gates = sqrtx, sqrty, sqrtw
 
@@ -34,10 +52,15 @@ def sycamore_circuit(num_qubits, depth, circ):
     lastSingleBitGates = []
 
     for i in range(depth):
+        fused = [np.identity(2) for j in range(num_qubits)]
+
         # Single bit gates
         for j in range(num_qubits):
             gate = random.choice(single_bit_gates)
-            gate(circ, j)
+            if fusion == 'none':
+                gate(circ, j)
+            else:
+                fused[j] = gate_matrices[gate] @ fused[j]
 
         singleBitGates = []
         for j in range(num_qubits):
@@ -45,11 +68,18 @@ def sycamore_circuit(num_qubits, depth, circ):
             if len(lastSingleBitGates) > 0:
                 while gate == lastSingleBitGates[j]:
                     gate = random.choice(single_bit_gates)
-            gate(circ, j)
+            if fusion == 'none':
+                gate(circ, j)
+            else:
+                fused[j] = gate_matrices[gate] @ fused[j]
             singleBitGates.append(gate)
 
         lastSingleBitGates = singleBitGates
 
+        if fusion == '1q':
+            for j in range(num_qubits):
+                circ.unitary(fused[j], [j])
+
         gate = gateSequence[0]
         gateSequence.pop(0)
         gateSequence.append(gate)
@@ -70,8 +100,20 @@ def sycamore_circuit(num_qubits, depth, circ):
                 b2 = tempRow * colLen + tempCol;
 
                 # Two bit gates
-                circ.cp(math.pi / 6, b1, b2)
-                circ.iswap(b1, b2)
+                if fusion == '2q':
+                    # Qiskit matrices are little-endian, so b1 is the low bit.
+                    circ.unitary(ISWAP @ CP @ np.kron(fused[b2], fused[b1]), [b1, b2])
+                    fused[b1] = None
+                    fused[b2] = None
+                else:
+                    circ.cp(math.pi / 6, b1, b2)
+                    circ.iswap(b1, b2)
+
+        if fusion == '2q':
+            # Qubits without a coupler in this cycle
+            for j in range(num_qubits):
+                if fused[j] is not None:
+                    circ.unitary(fused[j], [j])
 
     for j in range(num_qubits):
         circ.measure(j, j)
@@ -80,21 +122,21 @@ def sycamore_circuit(num_qubits, depth, circ):
 
 sim_backend = QasmSimulator(shots=1)
 
-def bench(num_qubits, depth):
+def bench(num_qubits, depth, fusion):
     circ = QuantumCircuit(num_qubits, num_qubits)
-    sycamore_circuit(num_qubits, depth, circ)
+    sycamore_circuit(num_qubits, depth, circ, fusion)
+    stats = qiskit_census(circ)
     start = time.time()
     circ = transpile(circ, backend=sim_backend, optimization_level=3)
     job = execute([circ], sim_backend, timeout=600)
     result = job.result()
-    return time.time() - start
+    return time.time() - start, stats
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-   
-    headers = ['name', 'num_qubits', 'depth', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -111,9 +153,10 @@ def write_csv(writer, data):
 @click.option('--samples', default=100, help='Number of samples to take for each qubit.')
 @click.option('--qubits', default=28, help='How many qubits you want to test for')
 @click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--fusion', default='none', type=click.Choice(['none', '1q', '2q']), help='Fuse gates into 1 or 2 qubit unitaries before execution')
 @click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
 @click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
-def benchmark(samples, qubits, depth, out, single):
+def benchmark(samples, qubits, depth, fusion, out, single):
     if single:
         low = qubits - 1
     else:
@@ -123,17 +166,23 @@ def benchmark(samples, qubits, depth, out, single):
     functions = bench,
     writer = create_csv(out)
 
+    name = 'qiskit_sycamore'
+    if fusion != 'none':
+        name = name + '_fused_' + fusion
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), [5, 10, 15, 20]), samples)
+    writer = telemetry.watch(writer)
+
     for n in range(low, high):
         for d in [4, 9, 14, 19]:
             # Progress counter
-            progress = (((n - low) * depth) + d) / ((high - low) * depth)
-            print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+            telemetry.point(num_qubits=n+1, depth=d+1)
 
             # Run the benchmarks
             for i in range(samples):
                 func = random.choice(functions)
-                t = func(n+1, d+1)
-                write_csv(writer, {'name': 'qiskit_sycamore', 'num_qubits': n+1, 'depth': d+1, 'time': t})
+                t, stats = func(n+1, d+1, fusion)
+                write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'time': t, **census_row(stats, t)})
 
 if __name__ == '__main__':
     benchmark()
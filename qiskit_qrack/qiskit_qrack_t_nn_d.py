@@ -6,12 +6,18 @@ import random
 import csv
 import os.path
 import math
+import sys
 
 from qiskit import QuantumCircuit
 from qiskit import execute
 from qiskit.providers.qrack import QasmSimulator
 from qiskit.compiler.transpiler import transpile
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, qiskit_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
 def x_to_y(circ, q):
     circ.s(q)
 
@@ -125,18 +131,18 @@ def random_circuit(num_qubits, depth, circ):
 def bench(sim_backend, num_qubits, depth):
     circ = QuantumCircuit(num_qubits, num_qubits)
     circ = random_circuit(num_qubits, depth, circ)
+    stats = qiskit_census(circ)
     start = time.time()
     circ = transpile(circ, optimization_level=3)
     job = execute([circ], sim_backend, timeout=3600, shots=1)
     result = job.result()
-    return time.time() - start
+    return time.time() - start, stats
 
 # Reporting
 def create_csv(filename):
-    file_exists = os.path.isfile(filename)
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
     csvfile = open(filename, 'a')
-
-    headers = ['name', 'num_qubits', 'depth', 'time']
     writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
 
     if not file_exists:
@@ -166,17 +172,19 @@ def benchmark(samples, qubits, depth, out, single):
     
     sim = QasmSimulator(shots=1)
 
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
+
     for n in range(low, high):
         for d in range(depth):
             # Progress counter
-            progress = (((n - low) * depth) + d) / ((high - low) * depth)
-            print("\rProgress: [{0:50s}] {1:.1f}%".format('#' * int(progress * 50), progress*100), end="", flush=True)
+            telemetry.point(num_qubits=n+1, depth=d+1)
 
             # Run the benchmarks
             for i in range(samples):
                 try:
-                    t = bench(sim, n+1, d+1)
-                    write_csv(writer, {'name': 'qiskit_qrack_t_nn_d', 'num_qubits': n+1, 'depth': d+1, 'time': t})
+                    t, stats = bench(sim, n+1, d+1)
+                    write_csv(writer, {'name': 'qiskit_qrack_t_nn_d', 'num_qubits': n+1, 'depth': d+1, 'time': t, **census_row(stats, t)})
                 except:
                     del sim
                     write_csv(writer, {'name': 'qiskit_qrack_t_nn_d', 'num_qubits': n+1, 'depth': d+1, 'time': -999})
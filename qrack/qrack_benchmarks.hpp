@@ -5,13 +5,231 @@
 
 #pragma once
 
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <fstream>
 #include <iostream>
+#include <map>
+#include <stdexcept>
+#include <string>
+#include <vector>
 
 #include "qrack/qfactory.hpp"
 
-const int MAX_QUBITS = 31;
-const int ITERATIONS = 100;
-const double CLOCK_FACTOR = 1000.0 / CLOCKS_PER_SEC; // Report in ms
+const double CLOCK_FACTOR = 1000.0 / CLOCKS_PER_SEC; // Report CPU time in ms
+
+// Run-time parameters, set from the command line by parseBenchmarkArgs().
+// Depth limits of 0 defer to the range each benchmark passes to benchmarkLoop().
+struct BenchmarkOptions {
+    int minQubits = 31;
+    int maxQubits = 31;
+    int minDepth = 0;
+    int maxDepth = 0;
+    int iterations = 100;
+    Qrack::QInterfaceType engine = Qrack::QINTERFACE_OPTIMAL_MULTI;
+    std::string out = "";
+    std::string format = "csv";
+};
+
+BenchmarkOptions benchmarkOptions;
+
+const std::map<std::string, Qrack::QInterfaceType> INTERFACE_TYPES = {
+    { "cpu", Qrack::QINTERFACE_CPU },
+    { "opencl", Qrack::QINTERFACE_OPENCL },
+    { "qunit", Qrack::QINTERFACE_QUNIT },
+    { "qunit_multi", Qrack::QINTERFACE_QUNIT_MULTI },
+    { "optimal", Qrack::QINTERFACE_OPTIMAL },
+    { "optimal_multi", Qrack::QINTERFACE_OPTIMAL_MULTI },
+};
+
+void printBenchmarkUsage(const char* program)
+{
+    std::cerr << "Usage: " << program << " [options]" << std::endl;
+    std::cerr << "  --qubits=N          Only run the benchmark for N qubits (same as --min-qubits=N --max-qubits=N)"
+              << std::endl;
+    std::cerr << "  --min-qubits=N      Smallest width to test for (default 31)" << std::endl;
+    std::cerr << "  --max-qubits=N      Largest width to test for (default 31)" << std::endl;
+    std::cerr << "  --min-depth=N       Smallest circuit depth to test for" << std::endl;
+    std::cerr << "  --max-depth=N       Largest circuit depth to test for" << std::endl;
+    std::cerr << "  --samples=N         Number of samples to take for each width and depth (at least 4, default 100)"
+              << std::endl;
+    std::cerr << "  --interface=TYPE    One of cpu, opencl, qunit, qunit_multi, optimal, optimal_multi (default)"
+              << std::endl;
+    std::cerr << "  --out=FILE          Also append each sample to FILE, as rows of the Python benchmark schema"
+              << std::endl;
+    std::cerr << "  --format=FORMAT     Row format for --out: csv (default) or json (one object per line)" << std::endl;
+}
+
+// A whole-string integer option value. A malformed or out of range value prints the usage, rather than letting
+// std::stoi's exception abort the harness.
+int parseIntOption(const std::string& arg, const std::string& value, const char* program)
+{
+    try {
+        size_t end;
+        int result = std::stoi(value, &end);
+        if (end == value.size()) {
+            return result;
+        }
+    } catch (const std::invalid_argument&) {
+    } catch (const std::out_of_range&) {
+    }
+
+    std::cerr << "Invalid integer value for " << arg << ": " << value << std::endl;
+    printBenchmarkUsage(program);
+    exit(1);
+}
+
+// Accepts both "--key=value" and "--key value", like the Python scripts' click options.
+void parseBenchmarkArgs(int argc, char* argv[])
+{
+    for (int i = 1; i < argc; i++) {
+        std::string arg = argv[i];
+        std::string value;
+
+        if (arg == "--help") {
+            printBenchmarkUsage(argv[0]);
+            exit(0);
+        }
+
+        size_t eq = arg.find('=');
+        if (eq != std::string::npos) {
+            value = arg.substr(eq + 1);
+            arg = arg.substr(0, eq);
+        } else if ((i + 1) < argc) {
+            value = argv[++i];
+        } else {
+            std::cerr << "Missing value for " << arg << std::endl;
+            printBenchmarkUsage(argv[0]);
+            exit(1);
+        }
+
+        if (arg == "--qubits") {
+            benchmarkOptions.minQubits = parseIntOption(arg, value, argv[0]);
+            benchmarkOptions.maxQubits = benchmarkOptions.minQubits;
+        } else if (arg == "--min-qubits") {
+            benchmarkOptions.minQubits = parseIntOption(arg, value, argv[0]);
+        } else if (arg == "--max-qubits") {
+            benchmarkOptions.maxQubits = parseIntOption(arg, value, argv[0]);
+        } else if (arg == "--min-depth") {
+            benchmarkOptions.minDepth = parseIntOption(arg, value, argv[0]);
+        } else if (arg == "--max-depth") {
+            benchmarkOptions.maxDepth = parseIntOption(arg, value, argv[0]);
+        } else if ((arg == "--samples") || (arg == "--iterations")) {
+            benchmarkOptions.iterations = parseIntOption(arg, value, argv[0]);
+        } else if (arg == "--interface") {
+            if (INTERFACE_TYPES.find(value) == INTERFACE_TYPES.end()) {
+                std::cerr << "Unknown interface type: " << value << std::endl;
+                printBenchmarkUsage(argv[0]);
+                exit(1);
+            }
+            benchmarkOptions.engine = INTERFACE_TYPES.at(value);
+        } else if (arg == "--out") {
+            benchmarkOptions.out = value;
+        } else if (arg == "--format") {
+            if ((value != "csv") && (value != "json")) {
+                std::cerr << "Unknown output format: " << value << std::endl;
+                printBenchmarkUsage(argv[0]);
+                exit(1);
+            }
+            benchmarkOptions.format = value;
+        } else {
+            std::cerr << "Unknown option: " << arg << std::endl;
+            printBenchmarkUsage(argv[0]);
+            exit(1);
+        }
+    }
+
+    if ((benchmarkOptions.minQubits < 1) || (benchmarkOptions.maxQubits < benchmarkOptions.minQubits)) {
+        std::cerr << "Invalid qubit range" << std::endl;
+        exit(1);
+    }
+
+    if (benchmarkOptions.iterations < 4) {
+        std::cerr << "At least 4 samples are required, for quartiles" << std::endl;
+        exit(1);
+    }
+}
+
+// A string as the body of a JSON string literal: quotes, backslashes and control characters are escaped
+std::string jsonEscape(const std::string& str)
+{
+    std::string escaped;
+    for (char c : str) {
+        if ((c == '"') || (c == '\\')) {
+            escaped += '\\';
+            escaped += c;
+        } else if (static_cast<unsigned char>(c) < 0x20) {
+            char code[7];
+            snprintf(code, sizeof(code), "\\u%04x", static_cast<unsigned char>(c));
+            escaped += code;
+        } else {
+            escaped += c;
+        }
+    }
+    return escaped;
+}
+
+// Same schema as the Python scripts' CSV output (time in seconds), so native and Python binding numbers can be
+// collected into one data set.
+class BenchmarkRowWriter {
+protected:
+    std::ofstream file;
+    bool isJson;
+
+public:
+    BenchmarkRowWriter(std::string filename, std::string format)
+        : isJson(format == "json")
+    {
+        if (filename == "") {
+            return;
+        }
+
+        const std::string header = "name,num_qubits,depth,time,cpu_time,parallelism";
+
+        // An empty file gets a header, as a new one does
+        std::ifstream existing(filename);
+        bool fileExists = existing.good() && (existing.peek() != std::ifstream::traits_type::eof());
+
+        if (fileExists && !isJson) {
+            // Appending rows under a different header (such as one from before the cpu_time and parallelism columns)
+            // would misalign every column, so refuse.
+            std::string existingHeader;
+            std::getline(existing, existingHeader);
+            if (existingHeader != header) {
+                std::cerr << "Existing file " << filename << " has a different header (" << existingHeader
+                          << "); expected " << header << ". Choose a new --out file." << std::endl;
+                exit(1);
+            }
+        }
+        existing.close();
+
+        file.open(filename, std::ios::app);
+
+        if (!fileExists && !isJson) {
+            // file doesn't exist yet, write a header
+            file << header << std::endl;
+        }
+    }
+
+    void write(std::string name, int numBits, int depth, double seconds, double cpuSeconds)
+    {
+        double parallelism = (seconds > 0) ? (cpuSeconds / seconds) : 0;
+
+        if (!file.is_open()) {
+            return;
+        }
+
+        if (isJson) {
+            file << "{\"name\": \"" << jsonEscape(name) << "\", \"num_qubits\": " << numBits << ", \"depth\": " << depth
+                 << ", \"time\": " << seconds << ", \"cpu_time\": " << cpuSeconds << ", \"parallelism\": " << parallelism
+                 << "}" << std::endl;
+        } else {
+            file << name << "," << numBits << "," << depth << "," << seconds << "," << cpuSeconds << "," << parallelism
+                 << std::endl;
+        }
+    }
+};
 
 double formatTime(double t, bool logNormal)
 {
@@ -24,7 +242,7 @@ double formatTime(double t, bool logNormal)
 
 Qrack::QInterfacePtr MakeRandQubit()
 {
-    Qrack::QInterfacePtr qubit = Qrack::CreateQuantumInterface(Qrack::QINTERFACE_OPTIMAL_MULTI, 1U, 0);
+    Qrack::QInterfacePtr qubit = Qrack::CreateQuantumInterface(benchmarkOptions.engine, 1U, 0);
 
     Qrack::real1 theta = 4 * M_PI * qubit->Rand();
     Qrack::real1 phi = 2 * M_PI * qubit->Rand();
@@ -35,14 +253,19 @@ Qrack::QInterfacePtr MakeRandQubit()
     return qubit;
 }
 
-void benchmarkLoopVariable(std::function<void(Qrack::QInterfacePtr, int, int)> fn, bitLenInt mxQbts, int minDepth = 1, int maxDepth = 1, bool resetRandomPerm = true,
-    bool hadamardRandomBits = false, bool logNormal = false, bool randQubits = false)
+void benchmarkLoopVariable(std::string name, std::function<void(Qrack::QInterfacePtr, int, int)> fn, int mnQbts,
+    int mxQbts, int minDepth = 1, int maxDepth = 1, bool resetRandomPerm = true, bool hadamardRandomBits = false,
+    bool logNormal = false, bool randQubits = false)
 {
+    const int iterations = benchmarkOptions.iterations;
+
     // Get OpenCL header out of the way:
     Qrack::QInterfacePtr qftReg = Qrack::CreateQuantumInterface(Qrack::QINTERFACE_OPENCL, 1, 0);
 
+    BenchmarkRowWriter rowWriter(benchmarkOptions.out, benchmarkOptions.format);
+
     std::cout << std::endl;
-    std::cout << ITERATIONS << " iterations" << std::endl;
+    std::cout << iterations << " iterations" << std::endl;
     std::cout << "# of Qubits, ";
     std::cout << "Depth, ";
     std::cout << "Average Time (ms), ";
@@ -51,24 +274,33 @@ void benchmarkLoopVariable(std::function<void(Qrack::QInterfacePtr, int, int)> f
     std::cout << "1st Quartile (ms), ";
     std::cout << "Median (ms), ";
     std::cout << "3rd Quartile (ms), ";
-    std::cout << "Slowest (ms)," << std::endl;
+    std::cout << "Slowest (ms), ";
+    std::cout << "Average CPU Time (ms), ";
+    std::cout << "Parallelism (CPU / Wall)," << std::endl;
 
+    // clock() sums CPU time over all threads, on Linux, so it is reported next to the wall clock time, rather than
+    // instead of it. Their ratio is the effective parallelism of the engine.
     clock_t tClock, iterClock;
-    Qrack::real1 trialClocks[ITERATIONS];
+    std::chrono::steady_clock::time_point iterWall;
+    double tWall;
+    std::vector<Qrack::real1> trialClocks(iterations);
 
-    bitLenInt i, j, numBits, depth;
+    int i, numBits, depth;
+    bitLenInt j;
 
-    double avgt, stdet;
+    double avgt, stdet, avgCpu, avgWall;
 
-    for (numBits = MAX_QUBITS; numBits <= MAX_QUBITS; numBits++) {
-        qftReg = Qrack::CreateQuantumInterface(Qrack::QINTERFACE_OPTIMAL_MULTI, numBits, 0);
+    for (numBits = mnQbts; numBits <= mxQbts; numBits++) {
+        qftReg = Qrack::CreateQuantumInterface(benchmarkOptions.engine, numBits, 0);
         for (depth = minDepth; depth <= maxDepth; depth++) {
             avgt = 0.0;
+            avgCpu = 0.0;
+            avgWall = 0.0;
 
-            for (i = 0; i < ITERATIONS; i++) {
+            for (i = 0; i < iterations; i++) {
 
                 if (randQubits) {
-                    for (bitLenInt b = 0; b < numBits; b++) {
+                    for (int b = 0; b < numBits; b++) {
                         if (b == 0) {
                             qftReg = MakeRandQubit();
                         } else {
@@ -91,6 +323,7 @@ void benchmarkLoopVariable(std::function<void(Qrack::QInterfacePtr, int, int)> f
 
                 qftReg->Finish();
 
+                iterWall = std::chrono::steady_clock::now();
                 iterClock = clock();
 
                 // Run loop body
@@ -100,55 +333,72 @@ void benchmarkLoopVariable(std::function<void(Qrack::QInterfacePtr, int, int)> f
 
                 // Collect interval data
                 tClock = clock() - iterClock;
+                tWall = std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - iterWall).count();
+                rowWriter.write(name, numBits, depth, tWall / 1000.0, (double)tClock / CLOCKS_PER_SEC);
+                avgCpu += tClock * CLOCK_FACTOR;
+                avgWall += tWall;
                 if (logNormal) {
-                    trialClocks[i] = log2(tClock * CLOCK_FACTOR);
+                    trialClocks[i] = log2(tWall);
                 } else {
-                    trialClocks[i] = tClock * CLOCK_FACTOR;
+                    trialClocks[i] = tWall;
                 }
                 avgt += trialClocks[i];
             }
-            avgt /= ITERATIONS;
+            avgt /= iterations;
+            avgCpu /= iterations;
+            avgWall /= iterations;
 
             stdet = 0.0;
-            for (i = 0; i < ITERATIONS; i++) {
+            for (i = 0; i < iterations; i++) {
                 stdet += (trialClocks[i] - avgt) * (trialClocks[i] - avgt);
             }
-            stdet = sqrt(stdet / ITERATIONS);
+            stdet = sqrt(stdet / iterations);
 
-            std::sort(trialClocks, trialClocks + ITERATIONS);
+            std::sort(trialClocks.begin(), trialClocks.end());
 
             std::cout << (int)numBits << ", "; /* # of Qubits */
             std::cout << (int)depth << ", "; /* Depth */
             std::cout << formatTime(avgt, logNormal) << ","; /* Average Time (ms) */
             std::cout << formatTime(stdet, logNormal) << ","; /* Sample Std. Deviation (ms) */
             std::cout << formatTime(trialClocks[0], logNormal) << ","; /* Fastest (ms) */
-            if (ITERATIONS % 4 == 0) {
-                std::cout << formatTime((trialClocks[ITERATIONS / 4 - 1] + trialClocks[ITERATIONS / 4]) / 2, logNormal)
+            if (iterations % 4 == 0) {
+                std::cout << formatTime((trialClocks[iterations / 4 - 1] + trialClocks[iterations / 4]) / 2, logNormal)
                           << ","; /* 1st Quartile (ms) */
             } else {
-                std::cout << formatTime(trialClocks[ITERATIONS / 4 - 1] / 2, logNormal) << ","; /* 1st Quartile (ms) */
+                std::cout << formatTime(trialClocks[iterations / 4 - 1] / 2, logNormal) << ","; /* 1st Quartile (ms) */
             }
-            if (ITERATIONS % 2 == 0) {
-                std::cout << formatTime((trialClocks[ITERATIONS / 2 - 1] + trialClocks[ITERATIONS / 2]) / 2, logNormal)
+            if (iterations % 2 == 0) {
+                std::cout << formatTime((trialClocks[iterations / 2 - 1] + trialClocks[iterations / 2]) / 2, logNormal)
                           << ","; /* Median (ms) */
             } else {
-                std::cout << formatTime(trialClocks[ITERATIONS / 2 - 1] / 2, logNormal) << ","; /* Median (ms) */
+                std::cout << formatTime(trialClocks[iterations / 2 - 1] / 2, logNormal) << ","; /* Median (ms) */
             }
-            if (ITERATIONS % 4 == 0) {
+            if (iterations % 4 == 0) {
                 std::cout << formatTime(
-                                 (trialClocks[(3 * ITERATIONS) / 4 - 1] + trialClocks[(3 * ITERATIONS) / 4]) / 2, logNormal)
+                                 (trialClocks[(3 * iterations) / 4 - 1] + trialClocks[(3 * iterations) / 4]) / 2, logNormal)
                           << ","; /* 3rd Quartile (ms) */
             } else {
-                std::cout << formatTime(trialClocks[(3 * ITERATIONS) / 4 - 1] / 2, logNormal)
+                std::cout << formatTime(trialClocks[(3 * iterations) / 4 - 1] / 2, logNormal)
                           << ","; /* 3rd Quartile (ms) */
             }
-            std::cout << formatTime(trialClocks[ITERATIONS - 1], logNormal) << std::endl; /* Slowest (ms) */
+            std::cout << formatTime(trialClocks[iterations - 1], logNormal) << ","; /* Slowest (ms) */
+            std::cout << avgCpu << ","; /* Average CPU Time (ms) */
+            std::cout << ((avgWall > 0) ? (avgCpu / avgWall) : 0) << std::endl; /* Parallelism (CPU / Wall) */
         }
     }
 }
 
-void benchmarkLoop(std::function<void(Qrack::QInterfacePtr, int, int)> fn, int minDepth = 1, int maxDepth = 1, bool resetRandomPerm = true,
-    bool hadamardRandomBits = false, bool logNormal = false, bool randQubits = false)
+void benchmarkLoop(std::string name, std::function<void(Qrack::QInterfacePtr, int, int)> fn, int minDepth = 1,
+    int maxDepth = 1, bool resetRandomPerm = true, bool hadamardRandomBits = false, bool logNormal = false,
+    bool randQubits = false)
 {
-    benchmarkLoopVariable(fn, MAX_QUBITS, minDepth, maxDepth, resetRandomPerm, hadamardRandomBits, logNormal, randQubits);
+    if (benchmarkOptions.minDepth > 0) {
+        minDepth = benchmarkOptions.minDepth;
+    }
+    if (benchmarkOptions.maxDepth > 0) {
+        maxDepth = benchmarkOptions.maxDepth;
+    }
+
+    benchmarkLoopVariable(name, fn, benchmarkOptions.minQubits, benchmarkOptions.maxQubits, minDepth, maxDepth,
+        resetRandomPerm, hadamardRandomBits, logNormal, randQubits);
 }
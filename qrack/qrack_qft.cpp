@@ -5,12 +5,13 @@
 
 #include "qrack_benchmarks.hpp"
 
-int main()
+int main(int argc, char* argv[])
 {
+    parseBenchmarkArgs(argc, argv);
 
     // Random permutation basis eigenstate initialization
     std::cout<<">>>Random Permutation Basis Eigenstate Initialization:"<<std::endl;
-    benchmarkLoop(
+    benchmarkLoop("qrack_qft",
         [](Qrack::QInterfacePtr qftReg, int n, int unused) {
             qftReg->QFT(0, n, false);
             qftReg->MAll();
@@ -18,7 +19,7 @@ int main()
 
     // Random permutation basis eigenstate, with random Hadamard gates initialization
     std::cout<<">>>Random Permutation Basis w/ Random Hadamard Initialization:"<<std::endl;
-    benchmarkLoop(
+    benchmarkLoop("qrack_qft_hadamard",
         [](Qrack::QInterfacePtr qftReg, int n, int unused) {
             qftReg->QFT(0, n, false);
             qftReg->MAll();
@@ -26,7 +27,7 @@ int main()
 
     // Totally random, totally separable qubits, for initialization
     std::cout<<">>>Random Separable Bits:"<<std::endl;
-    benchmarkLoop(
+    benchmarkLoop("qrack_qft_separable",
         [](Qrack::QInterfacePtr qftReg, int n, int unused) {
             qftReg->QFT(0, n, false);
             qftReg->MAll();
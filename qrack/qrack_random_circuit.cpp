@@ -20,12 +20,14 @@ bitLenInt pickRandomBit(QInterfacePtr qReg, std::set<bitLenInt>* unusedBitsPtr)
     return bitRand;
 }
 
-int main()
+int main(int argc, char* argv[])
 {
+    parseBenchmarkArgs(argc, argv);
+
     const int DimCount1Qb = 4;
     const int DimCountMultiQb = 4;
 
-    benchmarkLoop(
+    benchmarkLoop("qrack_random",
         [&](QInterfacePtr qReg, int n, int Depth) {
             int d;
             bitLenInt i;
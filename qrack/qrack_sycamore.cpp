@@ -9,11 +9,13 @@
 
 using namespace Qrack;
 
-int main()
+int main(int argc, char* argv[])
 {
+    parseBenchmarkArgs(argc, argv);
+
     // See https://doi.org/10.1038/s41586-019-1666-5
 
-    benchmarkLoop([&](QInterfacePtr qReg, int n, int depth) {
+    benchmarkLoop("qrack_sycamore", [&](QInterfacePtr qReg, int n, int depth) {
         // The test runs 2 bit gates according to a tiling sequence.
         // The 1 bit indicates +/- column offset.
         // The 2 bit indicates +/- row offset.
@@ -9,9 +9,11 @@
 
 using namespace Qrack;
 
-int main()
+int main(int argc, char* argv[])
 {
-    benchmarkLoop([&](QInterfacePtr qReg, int n, int depth) {
+    parseBenchmarkArgs(argc, argv);
+
+    benchmarkLoop("qrack_universal_nearest_neighbor", [&](QInterfacePtr qReg, int n, int depth) {
 
         // The test runs 2 bit gates according to a tiling sequence.
         // The 1 bit indicates +/- column offset.
@@ -0,0 +1,18 @@
+#Random single qubit unitaries, shared by the per-gate microbenchmarks
+
+import math
+import random
+
+import numpy as np
+
+# Scripts in the simulator directories import this with the usual sys.path entry for the repository root, and convert
+# the matrix to their framework's gate type (a flat row-major list, for pyqrack).
+
+def random_u3():
+    # Random single qubit unitary, from U3 angles
+    th = random.uniform(0, 4 * math.pi)
+    ph = random.uniform(0, 2 * math.pi)
+    lm = random.uniform(0, 2 * math.pi)
+    c = math.cos(th / 2)
+    s = math.sin(th / 2)
+    return np.array([[c, -np.exp(1j * lm) * s], [np.exp(1j * ph) * s, np.exp(1j * (ph + lm)) * c]])
@@ -0,0 +1,218 @@
+#Vectorized NumPy reference statevector engine
+
+import math
+
+import numpy as np
+
+# The state is a flat array of 2^n amplitudes, with qubit q as bit q of the basis state index. Gates are applied in
+# place, through strided views of the state as a (2,)*n tensor, in which qubit q is axis (n - 1 - q). Temporary
+# copies are at most the size of the slices a gate mixes.
+#
+# Circuits are run from a simple intermediate representation (IR): a list of (name, qubits) or
+# (name, qubits, params) tuples, applied as getattr(sim, name)(*qubits, *params). For example:
+#
+#     [('h', (0,)), ('cx', (0, 1)), ('cp', (1, 2), (math.pi / 4,)), ('mtrx', (2,), (matrix,))]
+#
+# Multi-qubit matrices take their first qubit as the most significant, as in Cirq.
+
+SQRTW = np.array([[(1-1j)/2, 1/math.sqrt(2)+0j], [1j/math.sqrt(2), (1-1j)/2]])
+
+# Named gates, for any engine that implements mcmtrx(controls, m, target) and mtrx2(q1, q2, m)
+class GateSet:
+    def mtrx(self, q, m):
+        self.mcmtrx([], m, q)
+
+    # Single qubit gates
+
+    def h(self, q):
+        self.mtrx(q, np.array([[1, 1], [1, -1]]) / math.sqrt(2))
+
+    def x(self, q):
+        self.mtrx(q, [[0, 1], [1, 0]])
+
+    def y(self, q):
+        self.mtrx(q, [[0, -1j], [1j, 0]])
+
+    def z(self, q):
+        self.mtrx(q, [[1, 0], [0, -1]])
+
+    def s(self, q):
+        self.mtrx(q, [[1, 0], [0, 1j]])
+
+    def sdg(self, q):
+        self.mtrx(q, [[1, 0], [0, -1j]])
+
+    def t(self, q):
+        self.mtrx(q, [[1, 0], [0, np.exp(1j * math.pi / 4)]])
+
+    def tdg(self, q):
+        self.mtrx(q, [[1, 0], [0, np.exp(-1j * math.pi / 4)]])
+
+    def sx(self, q):
+        self.mtrx(q, np.array([[1+1j, 1-1j], [1-1j, 1+1j]]) / 2)
+
+    def sw(self, q):
+        self.mtrx(q, SQRTW)
+
+    def rx(self, q, theta):
+        c = math.cos(theta / 2)
+        s = math.sin(theta / 2)
+        self.mtrx(q, [[c, -1j * s], [-1j * s, c]])
+
+    def ry(self, q, theta):
+        c = math.cos(theta / 2)
+        s = math.sin(theta / 2)
+        self.mtrx(q, [[c, -s], [s, c]])
+
+    def rz(self, q, theta):
+        self.mtrx(q, [[np.exp(-0.5j * theta), 0], [0, np.exp(0.5j * theta)]])
+
+    def p(self, q, theta):
+        self.mtrx(q, [[1, 0], [0, np.exp(1j * theta)]])
+
+    def u(self, q, theta, phi, lam):
+        c = math.cos(theta / 2)
+        s = math.sin(theta / 2)
+        self.mtrx(q, [[c, -np.exp(1j * lam) * s], [np.exp(1j * phi) * s, np.exp(1j * (phi + lam)) * c]])
+
+    # Multi-qubit gates
+
+    def cx(self, c, t):
+        self.mcmtrx([c], [[0, 1], [1, 0]], t)
+
+    def cy(self, c, t):
+        self.mcmtrx([c], [[0, -1j], [1j, 0]], t)
+
+    def cz(self, c, t):
+        self.mcmtrx([c], [[1, 0], [0, -1]], t)
+
+    def cp(self, c, t, theta):
+        self.mcmtrx([c], [[1, 0], [0, np.exp(1j * theta)]], t)
+
+    def ccx(self, c1, c2, t):
+        self.mcmtrx([c1, c2], [[0, 1], [1, 0]], t)
+
+    def swap(self, q1, q2):
+        self.mtrx2(q1, q2, [[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
+
+    def iswap(self, q1, q2):
+        self.mtrx2(q1, q2, [[1, 0, 0, 0], [0, 0, 1j, 0], [0, 1j, 0, 0], [0, 0, 0, 1]])
+
+    # Circuits
+
+    def run(self, gates):
+        for gate in gates:
+            params = gate[2] if len(gate) > 2 else ()
+            getattr(self, gate[0])(*gate[1], *params)
+
+class StateVector(GateSet):
+    # If "state" is given, it is used (not copied) as the state vector, for example to wrap a shared memory buffer
+    def __init__(self, num_qubits, dtype=np.complex128, state=None):
+        self.num_qubits = num_qubits
+        self.dtype = np.dtype(dtype)
+        if state is None:
+            self.state = np.zeros(1 << num_qubits, dtype=self.dtype)
+            self.state[0] = 1
+        else:
+            self.state = state
+
+    def reset(self):
+        self.state.fill(0)
+        self.state[0] = 1
+
+    def _tensor(self):
+        return self.state.reshape((2,) * self.num_qubits)
+
+    def _axis(self, q):
+        return self.num_qubits - 1 - q
+
+    # Index tuple selecting value v (or a slice) on each given axis, and everything on all other axes
+    def _index(self, ndim, values):
+        index = [slice(None)] * ndim
+        for axis, v in values.items():
+            index[axis] = v
+        return tuple(index)
+
+    # View of the tensor with every control qubit fixed to 1, and the axes that remain for the other qubits
+    def _controlled(self, controls, qubits):
+        tensor = self._tensor()
+        if len(controls) == 0:
+            return tensor, [self._axis(q) for q in qubits]
+        view = tensor[self._index(tensor.ndim, { self._axis(c): 1 for c in controls })]
+        kept = [a for a in range(tensor.ndim) if a not in [self._axis(c) for c in controls]]
+        return view, [kept.index(self._axis(q)) for q in qubits]
+
+    def _apply_1q(self, view, axis, m):
+        i0 = self._index(view.ndim, { axis: 0 })
+        i1 = self._index(view.ndim, { axis: 1 })
+        if m[0, 1] == 0 and m[1, 0] == 0:
+            # Diagonal
+            if m[0, 0] != 1:
+                view[i0] *= m[0, 0]
+            if m[1, 1] != 1:
+                view[i1] *= m[1, 1]
+            return
+        a0 = view[i0].copy()
+        view[i0] *= m[0, 0]
+        view[i0] += m[0, 1] * view[i1]
+        view[i1] *= m[1, 1]
+        view[i1] += m[1, 0] * a0
+
+    def _apply_2q(self, view, axes, m):
+        indices = [self._index(view.ndim, { axes[0]: i >> 1, axes[1]: i & 1 }) for i in range(4)]
+        a = [view[index].copy() for index in indices]
+        for i in range(4):
+            view[indices[i]] = 0
+            for j in range(4):
+                if m[i, j] != 0:
+                    view[indices[i]] += m[i, j] * a[j]
+
+    def mcmtrx(self, controls, m, target):
+        m = np.asarray(m, dtype=self.dtype).reshape(2, 2)
+        view, axes = self._controlled(controls, [target])
+        self._apply_1q(view, axes[0], m)
+
+    def mtrx2(self, q1, q2, m):
+        m = np.asarray(m, dtype=self.dtype).reshape(4, 4)
+        view, axes = self._controlled([], [q1, q2])
+        self._apply_2q(view, axes, m)
+
+    # Specialized, in place of the generic GateSet versions
+
+    def swap(self, q1, q2):
+        view, axes = self._controlled([], [q1, q2])
+        i01 = self._index(view.ndim, { axes[0]: 0, axes[1]: 1 })
+        i10 = self._index(view.ndim, { axes[0]: 1, axes[1]: 0 })
+        a01 = view[i01].copy()
+        view[i01] = view[i10]
+        view[i10] = a01
+
+    def iswap(self, q1, q2):
+        self.swap(q1, q2)
+        view, axes = self._controlled([], [q1, q2])
+        view[self._index(view.ndim, { axes[0]: 0, axes[1]: 1 })] *= 1j
+        view[self._index(view.ndim, { axes[0]: 1, axes[1]: 0 })] *= 1j
+
+    # Measurement
+
+    def probabilities(self):
+        probs = np.abs(self.state) ** 2
+        return probs / probs.sum()
+
+    # Sample basis states (with qubit q as bit q), without collapsing the state
+    def sample(self, shots=1):
+        return np.random.choice(len(self.state), size=shots, p=self.probabilities())
+
+    def measure_all(self):
+        return int(self.sample(1)[0])
+
+    # Measure one qubit, and collapse the state onto the result
+    def measure(self, q):
+        view, axes = self._controlled([], [q])
+        i0 = self._index(view.ndim, { axes[0]: 0 })
+        i1 = self._index(view.ndim, { axes[0]: 1 })
+        p1 = np.sum(np.abs(view[i1]) ** 2) / np.sum(np.abs(self.state) ** 2)
+        result = int(np.random.random() < p1)
+        view[i1 if result == 0 else i0] = 0
+        self.state /= math.sqrt(p1 if result == 1 else 1 - p1)
+        return result
@@ -0,0 +1,140 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+import math
+
+from reference_engine import StateVector
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+from random_unitary import random_u3
+
+# Per-gate microbenchmark: each sample applies one gate "reps" times to a fixed target (and its next neighbor, for
+# two qubit gates), and reports the average time per gate. The state is first randomized and entangled, outside the
+# timer. Fit a cost model to the output with analysis/gate_cost_model.py.
+
+def random_mtrx():
+    return random_u3()
+
+def apply_h(sim, q1, q2, m):
+    sim.h(q1)
+
+def apply_s(sim, q1, q2, m):
+    sim.s(q1)
+
+def apply_t(sim, q1, q2, m):
+    sim.t(q1)
+
+def apply_cx(sim, q1, q2, m):
+    sim.cx(q1, q2)
+
+def apply_cz(sim, q1, q2, m):
+    sim.cz(q1, q2)
+
+def apply_swap(sim, q1, q2, m):
+    sim.swap(q1, q2)
+
+def apply_iswap(sim, q1, q2, m):
+    sim.iswap(q1, q2)
+
+def apply_cp(sim, q1, q2, m):
+    sim.cp(q1, q2, math.pi / 6)
+
+def apply_mtrx(sim, q1, q2, m):
+    sim.mtrx(q1, m)
+
+gates = {
+    'h': apply_h,
+    's': apply_s,
+    't': apply_t,
+    'cx': apply_cx,
+    'cz': apply_cz,
+    'swap': apply_swap,
+    'iswap': apply_iswap,
+    'cp': apply_cp,
+    'mtrx': apply_mtrx
+}
+
+def prepare(sim):
+    sim.reset()
+    for i in range(sim.num_qubits):
+        sim.u(i, random.uniform(0, 4 * math.pi), random.uniform(0, 2 * math.pi), random.uniform(0, 2 * math.pi))
+    for i in range(sim.num_qubits - 1):
+        sim.cx(i, i + 1)
+
+def bench(sim, gate, target, reps):
+    prepare(sim)
+    other = (target + 1) % sim.num_qubits
+    m = random_mtrx()
+    fn = gates[gate]
+    start = time.time()
+    for i in range(reps):
+        fn(sim, target, other, m)
+    return (time.time() - start) / reps
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'gate', 'target', 'reps', 'time']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--reps', default=100, help='How many times to apply the gate, per sample')
+@click.option('--gates', 'gate_names', default=','.join(gates.keys()), help='Comma-separated gates to test')
+@click.option('--target-stride', default=1, help='Test every target-stride-th qubit index as the gate target')
+@click.option('--dtype', default='complex128', type=click.Choice(['complex64', 'complex128']), help='Amplitude precision')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, reps, gate_names, target_stride, dtype, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    name = 'reference_gates' if dtype == 'complex128' else 'reference_gates_' + dtype
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        sim = StateVector(n + 1, dtype)
+
+        # Progress counter
+        telemetry.point(num_qubits=n+1)
+
+        # Run the benchmarks
+        for gate in gate_names.split(','):
+            for target in range(0, n + 1, target_stride):
+                for i in range(samples):
+                    try:
+                        t = bench(sim, gate, target, reps)
+                        write_csv(writer, {'name': name, 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': t})
+                    except:
+                        write_csv(writer, {'name': name, 'num_qubits': n+1, 'gate': gate, 'target': target, 'reps': reps, 'time': -999})
+
+        # Free the old width BEFORE allocating the new width
+        del sim
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,100 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import csv
+import os.path
+import sys
+
+from reference_memmap_engine import MemmapStateVector
+from reference_qft import qft_gates
+from reference_random_circuit import random_circuit_gates
+from reference_sycamore import sycamore_gates
+from reference_t_nn import t_nn_gates
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
+# Out-of-core benchmarks, for widths beyond RAM. Put --path on the disk to test: the state file takes
+# 2^n * 16 bytes (or 2^n * 8 bytes, with --dtype complex64), and is deleted after each width.
+
+circuits = {
+    'qft': lambda n, d: qft_gates(n),
+    'random': random_circuit_gates,
+    'sycamore': sycamore_gates,
+    't_nn': t_nn_gates
+}
+
+def bench(sim, circuit, depth):
+    sim.reset()
+    sim.passes = 0
+    sim.bytes_io = 0
+    gates = circuits[circuit](sim.num_qubits, depth)
+    stats = census(gates, sim.num_qubits)
+    start = time.time()
+    sim.run(gates)
+    sim.measure_all()
+    return time.time() - start, stats
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'block_qubits', 'passes', 'bytes_io', 'io_throughput', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=34, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--circuit', default='sycamore', type=click.Choice(list(circuits.keys())), help='Which circuit family to run')
+@click.option('--path', default='statevector.bin', help='Where to keep the memory-mapped state vector file')
+@click.option('--block-qubits', default=24, help='log2 of the number of amplitudes read and written at once')
+@click.option('--pass-qubits', default=2, help='How many high qubits a pass may act on; each pass holds 2^(block-qubits + pass-qubits) amplitudes in RAM')
+@click.option('--dtype', default='complex128', type=click.Choice(['complex64', 'complex128']), help='Amplitude precision')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, circuit, path, block_qubits, pass_qubits, dtype, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    name = 'reference_memmap_' + circuit
+    if dtype != 'complex128':
+        name = name + '_' + dtype
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), [depth]), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        sim = MemmapStateVector(n + 1, path, block_qubits, pass_qubits, dtype)
+
+        for d in [depth - 1]:
+            # Progress counter
+            telemetry.point(num_qubits=n+1, depth=d+1)
+
+            # Run the benchmarks
+            for i in range(samples):
+                t, stats = bench(sim, circuit, d + 1)
+                write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'block_qubits': sim.block_qubits, 'passes': sim.passes, 'bytes_io': sim.bytes_io, 'io_throughput': sim.bytes_io / t, 'time': t, **census_row(stats, t)})
+
+        # Delete the old width's state file BEFORE allocating the new width
+        sim.close()
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,126 @@
+#Out-of-core NumPy reference statevector engine, with the amplitudes kept in a memory-mapped file
+
+import os
+
+import numpy as np
+
+from reference_engine import StateVector
+
+# The state is a flat np.memmap of 2^n amplitudes, split into blocks of 2^b contiguous amplitudes: qubits below b
+# ("local" qubits) index within a block, and qubits from b up ("high" qubits) index the block.
+#
+# A circuit (reference_engine.py IR) is run as a sequence of passes over the file. Each pass is assigned a set of at
+# most "pass_qubits" high qubits, and gathers the 2^k blocks that differ only in those qubits into one in-memory
+# StateVector of (b + k) qubits, applies every gate of the pass to it, and writes it back. So, every pass reads and
+# writes the whole state once, and any run of gates on local qubits costs a single pass.
+#
+# Passes are planned greedily: a gate whose high qubits do not fit in the current pass is deferred, and later gates
+# are pulled forward past it if their qubits are disjoint from those of every deferred gate (in which case they
+# commute).
+
+class MemmapStateVector:
+    def __init__(self, num_qubits, path, block_qubits=20, pass_qubits=2, dtype=np.complex128):
+        self.num_qubits = num_qubits
+        self.path = path
+        self.block_qubits = min(block_qubits, num_qubits)
+        self.pass_qubits = min(pass_qubits, num_qubits - self.block_qubits)
+        self.dtype = np.dtype(dtype)
+        self.state = np.memmap(path, dtype=self.dtype, mode='w+', shape=(1 << num_qubits,))
+        self.passes = 0
+        self.bytes_io = 0
+        self.reset()
+
+    def close(self):
+        del self.state
+        os.remove(self.path)
+
+    def _block_len(self):
+        return 1 << self.block_qubits
+
+    def _num_blocks(self):
+        return 1 << (self.num_qubits - self.block_qubits)
+
+    def reset(self):
+        block_len = self._block_len()
+        for blk in range(self._num_blocks()):
+            self.state[blk * block_len:(blk + 1) * block_len] = 0
+        self.state[0] = 1
+        self.state.flush()
+
+    def _high(self, gate):
+        return set(q for q in gate[1] if q >= self.block_qubits)
+
+    def plan(self, gates):
+        passes = []
+        pending = list(gates)
+        while len(pending) > 0:
+            high = set()
+            pass_gates = []
+            deferred = []
+            blocked = set()
+            for gate in pending:
+                qubits = set(gate[1])
+                gate_high = self._high(gate)
+                # A gate with more high qubits than fit in any pass gets a pass to itself
+                fits = len(high | gate_high) <= self.pass_qubits or len(pass_gates) == 0
+                if len(qubits & blocked) == 0 and fits:
+                    high |= gate_high
+                    pass_gates.append(gate)
+                else:
+                    deferred.append(gate)
+                    blocked |= qubits
+            passes.append((sorted(high), pass_gates))
+            pending = deferred
+
+        return passes
+
+    # Block index, with the high qubits of the pass set from the bits of j
+    def _spread(self, base, high, j):
+        blk = base
+        for i, q in enumerate(high):
+            if (j >> i) & 1:
+                blk |= 1 << (q - self.block_qubits)
+        return blk
+
+    def _run_pass(self, high, gates, sim):
+        b = self.block_qubits
+        block_len = self._block_len()
+        mapping = { q: q for q in range(b) }
+        for i, q in enumerate(high):
+            mapping[q] = b + i
+        local_gates = [(g[0], tuple(mapping[q] for q in g[1])) + tuple(g[2:]) for g in gates]
+
+        high_mask = 0
+        for q in high:
+            high_mask |= 1 << (q - b)
+
+        buffer = sim.state.reshape(1 << len(high), block_len)
+        for base in range(self._num_blocks()):
+            if base & high_mask:
+                continue
+            blocks = [self._spread(base, high, j) for j in range(1 << len(high))]
+            for j, blk in enumerate(blocks):
+                buffer[j] = self.state[blk * block_len:(blk + 1) * block_len]
+            sim.run(local_gates)
+            for j, blk in enumerate(blocks):
+                self.state[blk * block_len:(blk + 1) * block_len] = buffer[j]
+
+        self.state.flush()
+        self.passes += 1
+        self.bytes_io += 2 * self.state.nbytes
+
+    def run(self, gates):
+        for high, pass_gates in self.plan(gates):
+            sim = StateVector(self.block_qubits + len(high), self.dtype)
+            self._run_pass(high, pass_gates, sim)
+            del sim
+
+    # Sample one basis state (with qubit q as bit q), without collapsing the state: first a block, by its total
+    # probability, then an amplitude within it. This is one read-only pass.
+    def measure_all(self):
+        block_len = self._block_len()
+        norms = np.array([np.sum(np.abs(self.state[blk * block_len:(blk + 1) * block_len]) ** 2) for blk in range(self._num_blocks())])
+        self.bytes_io += self.state.nbytes
+        blk = np.random.choice(len(norms), p=norms / norms.sum())
+        probs = np.abs(self.state[blk * block_len:(blk + 1) * block_len]) ** 2
+        return int(blk * block_len + np.random.choice(block_len, p=probs / probs.sum()))
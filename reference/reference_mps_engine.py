@@ -0,0 +1,143 @@
+#NumPy matrix product state (MPS) reference engine
+
+import numpy as np
+
+from reference_engine import GateSet
+
+# The state is a chain of n site tensors, each of shape (left bond, 2, right bond), kept in mixed canonical form
+# around an orthogonality center. Logical qubits are mapped to sites by a layout, which starts as the identity.
+#
+# A two qubit gate on non-adjacent sites first moves one qubit next to the other with SWAP gates, and leaves it there
+# (updating the layout). The gate is applied to the contracted pair of sites, which is split again by SVD. Singular
+# values are dropped from the smallest, while their total weight stays within "threshold" (relative to the pair's
+# norm), and then down to at most "max_bond". The weight dropped is accumulated as the truncation error, an upper
+# bound on 1 - fidelity.
+#
+# Circuits are run from the same IR as reference_engine.py, with up to 2 qubit gates.
+
+class MatrixProductState(GateSet):
+    def __init__(self, num_qubits, max_bond=None, threshold=1e-12, dtype=np.complex128):
+        self.num_qubits = num_qubits
+        self.max_bond = max_bond
+        self.threshold = threshold
+        self.dtype = np.dtype(dtype)
+        self.reset()
+
+    def reset(self):
+        self.tensors = []
+        for i in range(self.num_qubits):
+            a = np.zeros((1, 2, 1), dtype=self.dtype)
+            a[0, 0, 0] = 1
+            self.tensors.append(a)
+        self.layout = list(range(self.num_qubits))
+        self.center = 0
+        self.fidelity = 1.0
+
+    def truncation_error(self):
+        return 1 - self.fidelity
+
+    def bond_dims(self):
+        return [a.shape[2] for a in self.tensors[:-1]]
+
+    def max_bond_dim(self):
+        return max(self.bond_dims(), default=1)
+
+    def memory(self):
+        return sum(a.nbytes for a in self.tensors)
+
+    # Move the orthogonality center to site i, by QR decompositions
+    def _move_center(self, i):
+        while self.center < i:
+            a = self.tensors[self.center]
+            l, d, r = a.shape
+            q, rr = np.linalg.qr(a.reshape(l * d, r))
+            self.tensors[self.center] = q.reshape(l, d, q.shape[1])
+            self.tensors[self.center + 1] = np.tensordot(rr, self.tensors[self.center + 1], axes=1)
+            self.center += 1
+        while self.center > i:
+            a = self.tensors[self.center]
+            l, d, r = a.shape
+            q, rr = np.linalg.qr(a.reshape(l, d * r).T)
+            self.tensors[self.center] = q.T.reshape(q.shape[1], d, r)
+            self.tensors[self.center - 1] = np.tensordot(self.tensors[self.center - 1], rr.T, axes=1)
+            self.center -= 1
+
+    def mcmtrx(self, controls, m, target):
+        if len(controls) > 1:
+            raise ValueError('MPS engine supports gates on at most 2 qubits')
+        m = np.asarray(m, dtype=self.dtype).reshape(2, 2)
+        if len(controls) == 1:
+            cm = np.eye(4, dtype=self.dtype)
+            cm[2:, 2:] = m
+            self.mtrx2(controls[0], target, cm)
+            return
+        i = self.layout[target]
+        self.tensors[i] = np.einsum('ij,ajb->aib', m, self.tensors[i])
+
+    # Apply a 4x4 gate to adjacent sites i and i + 1, with the site i qubit as the most significant
+    def _apply_pair(self, i, m):
+        self._move_center(i)
+        a = self.tensors[i]
+        b = self.tensors[i + 1]
+        theta = np.tensordot(a, b, axes=1)
+        theta = np.einsum('klij,aijc->aklc', m.reshape(2, 2, 2, 2), theta)
+        l, r = theta.shape[0], theta.shape[3]
+
+        u, s, vh = np.linalg.svd(theta.reshape(l * 2, 2 * r), full_matrices=False)
+        weights = s ** 2
+        total = weights.sum()
+        # Smallest first: drop while the dropped weight stays within the threshold
+        dropped = np.cumsum(weights[::-1]) / total
+        keep = len(s) - np.searchsorted(dropped, self.threshold, side='right')
+        keep = max(keep, 1)
+        if self.max_bond is not None:
+            keep = min(keep, self.max_bond)
+        self.fidelity *= weights[:keep].sum() / total
+
+        s = s[:keep] / np.sqrt(weights[:keep].sum() / total)
+        self.tensors[i] = u[:, :keep].reshape(l, 2, keep)
+        self.tensors[i + 1] = (s[:, None] * vh[:keep]).reshape(keep, 2, r)
+        self.center = i + 1
+
+    def _swap_sites(self, i):
+        self._apply_pair(i, np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=self.dtype))
+        q1 = self.layout.index(i)
+        q2 = self.layout.index(i + 1)
+        self.layout[q1], self.layout[q2] = i + 1, i
+
+    def mtrx2(self, q1, q2, m):
+        m = np.asarray(m, dtype=self.dtype).reshape(4, 4)
+        # Bring q2 next to q1
+        while abs(self.layout[q2] - self.layout[q1]) > 1:
+            if self.layout[q2] > self.layout[q1]:
+                self._swap_sites(self.layout[q2] - 1)
+            else:
+                self._swap_sites(self.layout[q2])
+        if self.layout[q1] < self.layout[q2]:
+            self._apply_pair(self.layout[q1], m)
+        else:
+            # Exchange the roles of the two qubits in the matrix
+            self._apply_pair(self.layout[q2], m.reshape(2, 2, 2, 2).transpose(1, 0, 3, 2).reshape(4, 4))
+
+    # Sample one basis state (with qubit q as bit q), without collapsing the state, site by site from the left
+    def measure_all(self):
+        self._move_center(0)
+        v = np.ones(1, dtype=self.dtype)
+        result = 0
+        for i, a in enumerate(self.tensors):
+            m = np.tensordot(v, a, axes=1)
+            probs = np.sum(np.abs(m) ** 2, axis=1)
+            bit = np.random.choice(2, p=probs / probs.sum())
+            v = m[bit] / np.sqrt(probs[bit])
+            result |= int(bit) << self.layout.index(i)
+        return result
+
+    # Contract to a dense state vector (with qubit q as bit q), for checking against other engines at small widths
+    def state_vector(self):
+        psi = np.ones((1, 1), dtype=self.dtype)
+        for a in self.tensors:
+            psi = np.tensordot(psi, a, axes=1).reshape(-1, a.shape[2])
+        tensor = psi.reshape((2,) * self.num_qubits)
+        # Axis i is site i; reorder to axis (n - 1 - q) for logical qubit q
+        axes = [self.layout[self.num_qubits - 1 - a] for a in range(self.num_qubits)]
+        return np.ascontiguousarray(np.transpose(tensor, axes)).reshape(-1)
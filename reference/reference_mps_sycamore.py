@@ -0,0 +1,80 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import csv
+import os.path
+import sys
+
+from reference_mps_engine import MatrixProductState
+from reference_sycamore import sycamore_gates
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
+def bench(sim, depth):
+    sim.reset()
+    gates = sycamore_gates(sim.num_qubits, depth)
+    stats = census(gates, sim.num_qubits)
+    start = time.time()
+    sim.run(gates)
+    sim.measure_all()
+    return time.time() - start, stats
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'max_bond', 'threshold', 'max_bond_dim', 'truncation_error', 'memory', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=100, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--max-bond', default=0, help='Maximum bond dimension (0 for no limit)')
+@click.option('--threshold', default=1e-12, help='Singular value weight that may be dropped per two qubit gate')
+@click.option('--dtype', default='complex128', type=click.Choice(['complex64', 'complex128']), help='Amplitude precision')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, max_bond, threshold, dtype, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    name = 'reference_mps_sycamore' if dtype == 'complex128' else 'reference_mps_sycamore_' + dtype
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        sim = MatrixProductState(n + 1, max_bond if max_bond > 0 else None, threshold, dtype)
+
+        for d in range(depth):
+            # Progress counter
+            telemetry.point(num_qubits=n+1, depth=d+1)
+
+            # Run the benchmarks
+            for i in range(samples):
+                t, stats = bench(sim, d + 1)
+                write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'max_bond': max_bond, 'threshold': threshold, 'max_bond_dim': sim.max_bond_dim(), 'truncation_error': sim.truncation_error(), 'memory': sim.memory(), 'time': t, **census_row(stats, t)})
+
+        del sim
+
+if __name__ == '__main__':
+    benchmark()
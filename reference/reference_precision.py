@@ -0,0 +1,124 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+import multiprocessing
+import resource
+import tempfile
+
+import numpy as np
+
+from reference_engine import StateVector
+from reference_qft import qft_gates
+from reference_random_circuit import random_circuit_gates
+from reference_sycamore import sycamore_gates
+from reference_t_nn import t_nn_gates
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+
+# Precision sweep: each sample runs one seeded circuit at each precision, each in its own child process, so that the
+# peak memory of each run can be told apart. Peak memory is the child's growth in peak resident set size over the
+# run. Fidelity is the overlap of each final state with the complex128 one, before measurement.
+
+circuits = {
+    'qft': lambda n, d: qft_gates(n),
+    'random': random_circuit_gates,
+    'sycamore': sycamore_gates,
+    't_nn': t_nn_gates
+}
+
+def run_child(conn, path, num_qubits, depth, circuit, dtype, seed):
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    random.seed(seed)
+    gates = circuits[circuit](num_qubits, depth)
+    start = time.time()
+    sim = StateVector(num_qubits, dtype)
+    sim.run(gates)
+    t = time.time() - start
+    # ru_maxrss is in kilobytes, on Linux
+    peak = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) * 1024
+    np.save(path, sim.state)
+    conn.send((t, peak))
+    conn.close()
+
+def bench(num_qubits, depth, circuit, dtype, seed, state_dir):
+    fd, path = tempfile.mkstemp(suffix='.npy', dir=state_dir)
+    os.close(fd)
+    try:
+        conn, child_conn = multiprocessing.Pipe()
+        p = multiprocessing.Process(target=run_child, args=(child_conn, path, num_qubits, depth, circuit, dtype, seed))
+        p.start()
+        t, peak = conn.recv()
+        p.join()
+        # The mapping outlives the file's name
+        state = np.load(path, mmap_mode='r')
+    finally:
+        os.remove(path)
+    return t, peak, state
+
+# Upcast one chunk at a time, rather than whole copies of both states
+def fidelity(ket1, ket2, chunk=1 << 20):
+    overlap = 0
+    for i in range(0, len(ket1), chunk):
+        overlap += np.vdot(ket1[i:i + chunk].astype(np.complex128), ket2[i:i + chunk].astype(np.complex128))
+    return abs(overlap) ** 2
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'precision', 'time', 'peak_memory', 'fidelity']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--circuit', default='sycamore', type=click.Choice(list(circuits.keys())), help='Which circuit family to run')
+@click.option('--state-dir', default='.', help='Where each run writes its final state for the fidelity (at large widths, not a tmpfs)')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, circuit, state_dir, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    name = 'reference_precision_' + circuit
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), [depth]), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        for d in [depth - 1]:
+            # Progress counter
+            telemetry.point(num_qubits=n+1, depth=d+1)
+
+            # Run the benchmarks
+            for i in range(samples):
+                seed = random.getrandbits(32)
+                t, peak, exact = bench(n + 1, d + 1, circuit, 'complex128', seed, state_dir)
+                write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'precision': 'double', 'time': t, 'peak_memory': peak, 'fidelity': 1.0})
+                t, peak, state = bench(n + 1, d + 1, circuit, 'complex64', seed, state_dir)
+                write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'precision': 'single', 'time': t, 'peak_memory': peak, 'fidelity': fidelity(exact, state)})
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,91 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import math
+import sys
+
+from reference_engine import StateVector
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, single_qubit_qft_census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
+# The semi-classical QFT, on one qubit, as the other stacks' qft_single_qubit scripts run it: a random unitary on the
+# qubit, then the phases of every earlier result that measured 1, a Hadamard, a measurement, and a reset (by X, if the
+# result was 1), once per bit. The gates depend on mid-circuit results, so they are applied directly, not as IR, and
+# there is no census. The random angles are drawn before the timer starts.
+
+def bench(sim, num_qubits):
+    sim.reset()
+    angles = [(random.uniform(0, 4 * math.pi), random.uniform(0, 4 * math.pi), random.uniform(0, 4 * math.pi)) for i in range(num_qubits)]
+    m_results = []
+    start = time.time()
+    for i in range(num_qubits):
+        sim.u(0, *angles[i])
+
+        # We use the single control qubit "trick" referenced in Beauregard:
+        for j in range(i):
+            if m_results[j]:
+                sim.p(0, math.pi / (1 << (i - j)))
+        sim.h(0)
+        m_results.append(sim.measure(0))
+
+        if m_results[-1]:
+            sim.x(0)
+
+    return time.time() - start, m_results
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=100, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--dtype', default='complex128', type=click.Choice(['complex64', 'complex128']), help='Amplitude precision')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, dtype, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    name = 'reference_qft_single_qubit' if dtype == 'complex128' else 'reference_qft_single_qubit_' + dtype
+    writer = create_csv(out)
+    sim = StateVector(1, dtype)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        # Progress counter
+        telemetry.point(num_qubits=n+1)
+
+        # Run the benchmarks
+        for i in range(samples):
+            t, m_results = bench(sim, n + 1)
+            stats = single_qubit_qft_census(m_results)
+            write_csv(writer, {'name': name, 'num_qubits': n+1, 'time': t, **census_row(stats, t)})
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,110 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+
+from reference_engine import StateVector
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
+# Implementation of random universal circuit, as reference engine IR
+def random_circuit_gates(num_qubits, depth):
+    single_bit_gates = 'h', 'x', 'y', 'z', 't'
+    multi_bit_gates = 'swap', 'cx', 'cz', 'ccx'
+    gates = []
+
+    for i in range(depth):
+        # Single bit gates
+        for j in range(num_qubits):
+            gate = random.choice(single_bit_gates)
+            gates.append((gate, (j,)))
+
+        # Multi bit gates
+        bit_set = [i for i in range(num_qubits)]
+        while len(bit_set) > 1:
+            b1 = random.choice(bit_set)
+            bit_set.remove(b1)
+            b2 = random.choice(bit_set)
+            bit_set.remove(b2)
+            gate = random.choice(multi_bit_gates)
+            while len(bit_set) == 0 and gate == 'ccx':
+                gate = random.choice(multi_bit_gates)
+            if gate == 'ccx':
+                b3 = random.choice(bit_set)
+                bit_set.remove(b3)
+                gates.append((gate, (b1, b2, b3)))
+            else:
+                gates.append((gate, (b1, b2)))
+
+    return gates
+
+def bench(sim, depth):
+    sim.reset()
+    gates = random_circuit_gates(sim.num_qubits, depth)
+    stats = census(gates, sim.num_qubits)
+    start = time.time()
+    sim.run(gates)
+    sim.measure_all()
+    return time.time() - start, stats
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=100, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--dtype', default='complex128', type=click.Choice(['complex64', 'complex128']), help='Amplitude precision')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, dtype, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    name = 'reference_random' if dtype == 'complex128' else 'reference_random_' + dtype
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        sim = StateVector(n + 1, dtype)
+
+        for d in range(depth):
+            # Progress counter
+            telemetry.point(num_qubits=n+1, depth=d+1)
+
+            # Run the benchmarks
+            for i in range(samples):
+                t, stats = bench(sim, d + 1)
+                write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'time': t, **census_row(stats, t)})
+
+        # Free the old width BEFORE allocating the new width
+        del sim
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,112 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+
+from reference_shared_engine import SharedStateVector
+from reference_qft import qft_gates
+from reference_random_circuit import random_circuit_gates
+from reference_sycamore import sycamore_gates
+from reference_t_nn import t_nn_gates
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
+# Strong scaling of the shared memory engine: every worker count runs the same circuits (via shared seeds), and
+# "speedup" is the mean time with the first worker count over the mean time with this one, at the same width.
+
+circuits = {
+    'qft': lambda n, d: qft_gates(n),
+    'random': random_circuit_gates,
+    'sycamore': sycamore_gates,
+    't_nn': t_nn_gates
+}
+
+def bench(sim, circuit, depth, seed):
+    sim.reset()
+    random.seed(seed)
+    gates = circuits[circuit](sim.num_qubits, depth)
+    stats = census(gates, sim.num_qubits)
+    start = time.time()
+    sim.run(gates)
+    sim.measure_all()
+    return time.time() - start, stats
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'workers', 'swaps', 'time', 'speedup'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--circuit', default='sycamore', type=click.Choice(list(circuits.keys())), help='Which circuit family to run')
+@click.option('--workers', default='1,2,4,8', help='Comma-separated worker process counts (powers of 2) to compare')
+@click.option('--dtype', default='complex128', type=click.Choice(['complex64', 'complex128']), help='Amplitude precision')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, circuit, workers, dtype, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    name = 'reference_shared_' + circuit
+    if dtype != 'complex128':
+        name = name + '_' + dtype
+    worker_counts = [int(w) for w in workers.split(',')]
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), [depth]), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        for d in [depth - 1]:
+            # Progress counter
+            telemetry.point(num_qubits=n+1, depth=d+1)
+
+            seeds = [random.getrandbits(32) for i in range(samples)]
+            baseline = None
+            for w in worker_counts:
+                # Each worker needs room for 3 local qubits
+                if (n + 1) - (w.bit_length() - 1) < 3:
+                    continue
+                sim = SharedStateVector(n + 1, w, dtype)
+
+                # Run the benchmarks
+                times = []
+                for seed in seeds:
+                    t, stats = bench(sim, circuit, d + 1, seed)
+                    times.append((t, sim.swaps, stats))
+
+                mean_time = sum(t for t, s, stats in times) / len(times)
+                if baseline is None:
+                    baseline = mean_time
+                for t, s, stats in times:
+                    write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'workers': w, 'swaps': s, 'time': t, 'speedup': baseline / mean_time, **census_row(stats, t)})
+
+                # Stop the old workers and free the old state BEFORE allocating the next
+                sim.close()
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,147 @@
+#Multi-process NumPy reference statevector engine, with the amplitudes in shared memory
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from reference_engine import StateVector
+
+# The state is split across 2^k worker processes, as in a distributed statevector simulator: worker w owns the
+# contiguous slice of 2^(n-k) amplitudes whose top k index bits ("global" bit positions) equal w. The other (n-k) bit
+# positions are "local".
+#
+# Logical qubits are mapped to bit positions by a layout, which starts as the identity. Gates on local positions only
+# are batched, and every worker applies the batch to its own slice in parallel. Before a gate on a global position,
+# that position is swapped with a local position the gate does not use: each pair of workers that differ in the
+# global bit exchanges the halves of their slices that differ in the local bit, directly through shared memory. The
+# two logical qubits then trade positions in the layout, and no amplitudes move back.
+
+def worker_main(conn, shm_name, num_qubits, num_workers, worker, dtype):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    state = np.ndarray((num_workers, 1 << num_qubits), dtype=dtype, buffer=shm.buf)
+    sim = StateVector(num_qubits, dtype, state[worker])
+    tensors = [state[w].reshape((2,) * num_qubits) for w in range(num_workers)]
+
+    while True:
+        command = conn.recv()
+        if command[0] == 'run':
+            sim.run(command[1])
+            conn.send(None)
+        elif command[0] == 'swap':
+            # Exchange with the partner worker that differs in the global bit, if this is the lower of the two
+            global_bit, local_pos = command[1], command[2]
+            if not (worker >> global_bit) & 1:
+                partner = worker | (1 << global_bit)
+                axis = num_qubits - 1 - local_pos
+                mine = sim._index(num_qubits, { axis: 1 })
+                theirs = sim._index(num_qubits, { axis: 0 })
+                temp = tensors[worker][mine].copy()
+                tensors[worker][mine] = tensors[partner][theirs]
+                tensors[partner][theirs] = temp
+            conn.send(None)
+        elif command[0] == 'reset':
+            sim.state.fill(0)
+            if worker == 0:
+                sim.state[0] = 1
+            conn.send(None)
+        elif command[0] == 'norm':
+            conn.send(float(np.sum(np.abs(sim.state) ** 2)))
+        elif command[0] == 'sample':
+            probs = np.abs(sim.state) ** 2
+            conn.send(int(np.random.choice(len(probs), p=probs / probs.sum())))
+        else:
+            break
+
+    del sim, tensors, state
+    shm.close()
+    conn.send(None)
+
+class SharedStateVector:
+    def __init__(self, num_qubits, num_workers=1, dtype=np.complex128):
+        self.global_qubits = num_workers.bit_length() - 1
+        if (1 << self.global_qubits) != num_workers:
+            raise ValueError('Worker count must be a power of 2: ' + str(num_workers))
+        self.num_qubits = num_qubits
+        self.num_workers = num_workers
+        self.local_qubits = num_qubits - self.global_qubits
+        # Room to swap in every qubit of a 3 qubit gate
+        if self.local_qubits < 3:
+            raise ValueError('Too many workers for {0} qubits: {1}'.format(num_qubits, num_workers))
+        self.dtype = np.dtype(dtype)
+        self.layout = list(range(num_qubits))
+        self.swaps = 0
+        self.pending = []
+
+        self.shm = shared_memory.SharedMemory(create=True, size=(1 << num_qubits) * self.dtype.itemsize)
+        self.conns = []
+        self.processes = []
+        for w in range(num_workers):
+            conn, worker_conn = multiprocessing.Pipe()
+            p = multiprocessing.Process(target=worker_main, args=(worker_conn, self.shm.name, self.local_qubits, num_workers, w, self.dtype))
+            p.start()
+            self.conns.append(conn)
+            self.processes.append(p)
+        self.reset()
+
+    def close(self):
+        self._all(('stop',))
+        for p in self.processes:
+            p.join()
+        self.shm.close()
+        self.shm.unlink()
+
+    # Send a command to every worker, and wait for all of them to finish it
+    def _all(self, command):
+        for conn in self.conns:
+            conn.send(command)
+        return [conn.recv() for conn in self.conns]
+
+    def _flush(self):
+        if len(self.pending) > 0:
+            self._all(('run', self.pending))
+            self.pending = []
+
+    def reset(self):
+        self.pending = []
+        self.layout = list(range(self.num_qubits))
+        self.swaps = 0
+        self._all(('reset',))
+
+    def _swap_in(self, q, busy):
+        self._flush()
+        pos = self.layout[q]
+        local_pos = max(p for p in range(self.local_qubits) if p not in busy)
+        self._all(('swap', pos - self.local_qubits, local_pos))
+        other = self.layout.index(local_pos)
+        self.layout[q], self.layout[other] = local_pos, pos
+        self.swaps += 1
+
+    def run(self, gates):
+        for gate in gates:
+            qubits = gate[1]
+            busy = set(self.layout[q] for q in qubits if self.layout[q] < self.local_qubits)
+            for q in qubits:
+                if self.layout[q] >= self.local_qubits:
+                    self._swap_in(q, busy)
+                    busy.add(self.layout[q])
+            self.pending.append((gate[0], tuple(self.layout[q] for q in qubits)) + tuple(gate[2:]))
+        self._flush()
+
+    # Sample one basis state (with qubit q as bit q), without collapsing the state: first a worker, by the total
+    # probability of its slice, then an amplitude within it.
+    def measure_all(self):
+        self._flush()
+        norms = np.array(self._all(('norm',)))
+        w = np.random.choice(self.num_workers, p=norms / norms.sum())
+        self.conns[w].send(('sample',))
+        physical = (w << self.local_qubits) | self.conns[w].recv()
+        return sum(((physical >> self.layout[q]) & 1) << q for q in range(self.num_qubits))
+
+    # Gather the state vector, in logical qubit order, for checking against other engines
+    def state_vector(self):
+        self._flush()
+        physical = np.ndarray((1 << self.num_qubits,), dtype=self.dtype, buffer=self.shm.buf).copy()
+        tensor = physical.reshape((2,) * self.num_qubits)
+        axes = [self.num_qubits - 1 - self.layout[self.num_qubits - 1 - a] for a in range(self.num_qubits)]
+        return np.ascontiguousarray(np.transpose(tensor, axes)).reshape(-1)
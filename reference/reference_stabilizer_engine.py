@@ -0,0 +1,155 @@
+#Bit-packed NumPy CHP stabilizer tableau engine, for Clifford circuits. See https://arxiv.org/abs/quant-ph/0406196
+
+import numpy as np
+
+# The tableau holds 2n rows of n-qubit Pauli operators: destabilizers in rows 0 to n - 1, and stabilizers in rows n
+# to 2n - 1. The X and Z bits of each row are packed 64 qubits to a uint64 word (qubit q is bit
+# q % 64 of word q // 64), and each row has a sign bit. Gates act on one bit column of every row at once, and
+# measurement multiplies whole rows together, word by word.
+#
+# Circuits are run from the same IR as reference_engine.py, restricted to Clifford gates.
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(words, axis):
+        return np.bitwise_count(words).sum(axis=axis, dtype=np.int64)
+else:
+    POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+    def popcount(words, axis):
+        return POPCOUNT_TABLE[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=(axis, -1))
+
+CLIFFORD_GATES = 'h', 's', 'sdg', 'x', 'y', 'z', 'cx', 'cy', 'cz', 'swap'
+
+class StabilizerTableau:
+    def __init__(self, num_qubits):
+        self.num_qubits = num_qubits
+        self.words = (num_qubits + 63) // 64
+        self.xs = np.zeros((2 * num_qubits, self.words), dtype=np.uint64)
+        self.zs = np.zeros((2 * num_qubits, self.words), dtype=np.uint64)
+        self.r = np.zeros(2 * num_qubits, dtype=np.uint8)
+        self.reset()
+
+    # |0...0>: destabilizer i is X_i, and stabilizer i is Z_i
+    def reset(self):
+        self.xs.fill(0)
+        self.zs.fill(0)
+        self.r.fill(0)
+        for q in range(self.num_qubits):
+            w, b = q >> 6, np.uint64(1 << (q & 63))
+            self.xs[q, w] = b
+            self.zs[self.num_qubits + q, w] = b
+
+    # Column q of x or z, as 0 or 1 per row
+    def _col(self, bits, q):
+        return ((bits[:, q >> 6] >> np.uint64(q & 63)) & np.uint64(1)).astype(np.uint8)
+
+    # Flip column q of x or z, in the rows where flips is 1
+    def _flip(self, bits, q, flips):
+        bits[:, q >> 6] ^= flips.astype(np.uint64) << np.uint64(q & 63)
+
+    # Single qubit gates
+
+    def h(self, q):
+        xq = self._col(self.xs, q)
+        zq = self._col(self.zs, q)
+        self.r ^= xq & zq
+        self._flip(self.xs, q, xq ^ zq)
+        self._flip(self.zs, q, xq ^ zq)
+
+    def s(self, q):
+        xq = self._col(self.xs, q)
+        self.r ^= xq & self._col(self.zs, q)
+        self._flip(self.zs, q, xq)
+
+    def sdg(self, q):
+        xq = self._col(self.xs, q)
+        self.r ^= xq & (self._col(self.zs, q) ^ 1)
+        self._flip(self.zs, q, xq)
+
+    def x(self, q):
+        self.r ^= self._col(self.zs, q)
+
+    def y(self, q):
+        self.r ^= self._col(self.xs, q) ^ self._col(self.zs, q)
+
+    def z(self, q):
+        self.r ^= self._col(self.xs, q)
+
+    # Two qubit gates
+
+    def cx(self, c, t):
+        xc = self._col(self.xs, c)
+        zc = self._col(self.zs, c)
+        xt = self._col(self.xs, t)
+        zt = self._col(self.zs, t)
+        self.r ^= xc & zt & (xt ^ zc ^ 1)
+        self._flip(self.xs, t, xc)
+        self._flip(self.zs, c, zt)
+
+    def cy(self, c, t):
+        self.sdg(t)
+        self.cx(c, t)
+        self.s(t)
+
+    def cz(self, c, t):
+        self.h(t)
+        self.cx(c, t)
+        self.h(t)
+
+    def swap(self, q1, q2):
+        for bits in self.xs, self.zs:
+            diff = self._col(bits, q1) ^ self._col(bits, q2)
+            self._flip(bits, q1, diff)
+            self._flip(bits, q2, diff)
+
+    def run(self, gates):
+        for gate in gates:
+            if gate[0] not in CLIFFORD_GATES:
+                raise ValueError('Not a Clifford gate: ' + gate[0])
+            getattr(self, gate[0])(*gate[1])
+
+    # Phase exponent (mod 4) of the products P_i * P_h, row by row (or for one row i against a stack of rows h),
+    # counting the +i and -i factors qubit by qubit
+    def _phases(self, xi, zi, xh, zh):
+        plus = (xi & ~zi & xh & zh) | (xi & zi & ~xh & zh) | (~xi & zi & xh & ~zh)
+        minus = (xi & ~zi & ~xh & zh) | (xi & zi & xh & ~zh) | (~xi & zi & xh & zh)
+        return popcount(plus, 1) - popcount(minus, 1)
+
+    # Measure qubit q in the Z basis, and collapse the state
+    def measure(self, q):
+        n = self.num_qubits
+        xq = self._col(self.xs, q)
+        stabilizers = np.nonzero(xq[n:])[0]
+
+        if len(stabilizers) > 0:
+            # Random outcome: every other row that anticommutes with Z_q is multiplied by stabilizer p
+            p = n + stabilizers[0]
+            rows = np.nonzero(xq)[0]
+            rows = rows[rows != p]
+            phase = 2 * self.r[rows].astype(np.int64) + 2 * int(self.r[p]) + self._phases(self.xs[p], self.zs[p], self.xs[rows], self.zs[rows])
+            self.r[rows] = (phase % 4) // 2
+            self.xs[rows] ^= self.xs[p]
+            self.zs[rows] ^= self.zs[p]
+
+            self.xs[p - n] = self.xs[p]
+            self.zs[p - n] = self.zs[p]
+            self.r[p - n] = self.r[p]
+            self.xs[p] = 0
+            self.zs[p] = 0
+            self.zs[p, q >> 6] = np.uint64(1 << (q & 63))
+            self.r[p] = np.random.randint(2)
+            return int(self.r[p])
+
+        # Deterministic outcome: the sign of the product of the stabilizers paired with the destabilizers that
+        # anticommute with Z_q. The running product before each factor is a prefix XOR of the factors.
+        rows = n + np.nonzero(xq[:n])[0]
+        xs = self.xs[rows]
+        zs = self.zs[rows]
+        xh = np.zeros_like(xs)
+        zh = np.zeros_like(zs)
+        xh[1:] = np.bitwise_xor.accumulate(xs, axis=0)[:-1]
+        zh[1:] = np.bitwise_xor.accumulate(zs, axis=0)[:-1]
+        phase = 2 * int(self.r[rows].sum()) + int(np.sum(self._phases(xs, zs, xh, zh)))
+        return (phase % 4) // 2
+
+    def measure_all(self):
+        return sum(self.measure(q) << q for q in range(self.num_qubits))
@@ -0,0 +1,80 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+
+from reference_stabilizer_engine import StabilizerTableau
+from reference_t_count import t_count_gates
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
+# Clifford-only T-NN circuits (the reference_t_count.py skeleton, with no T gates), on the CHP tableau engine. Since
+# this is polynomial in width, widths double up to --qubits, rather than stepping by 1. Compare with
+# qiskit/qiskit_t_count.py --method stabilizer --max-t-count 0, and pyqrack/pyqrack_t_count.py --max-t-count 0.
+
+def bench(sim, depth, seed):
+    sim.reset()
+    gates = t_count_gates(sim.num_qubits, depth, 0, seed)
+    stats = census(gates, sim.num_qubits)
+    start = time.time()
+    sim.run(gates)
+    sim.measure_all()
+    return time.time() - start, stats
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=4096, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, out, single):
+    if single:
+        widths = [qubits]
+    else:
+        widths = [1 << k for k in range(2, qubits.bit_length()) if (1 << k) <= qubits]
+
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(widths, [depth]), samples)
+    writer = telemetry.watch(writer)
+
+    for n in widths:
+        sim = StabilizerTableau(n)
+
+        for d in [depth - 1]:
+            # Progress counter
+            telemetry.point(num_qubits=n, depth=d+1)
+
+            # Run the benchmarks
+            for i in range(samples):
+                t, stats = bench(sim, d + 1, random.getrandbits(32))
+                write_csv(writer, {'name': 'reference_stabilizer_t_nn', 'num_qubits': n, 'depth': d+1, 'time': t, **census_row(stats, t)})
+
+        del sim
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,140 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import math
+import sys
+
+from reference_engine import StateVector, SQRTW
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
+def sqrtx(t):
+    return ('sx', (t,))
+
+def sqrty(t):
+    return ('ry', (t,), (math.pi / 2,))
+
+def sqrtw(t):
+    return ('mtrx', (t,), (SQRTW,))
+
+# Implementation of Sycamore circuit, as reference engine IR
+def sycamore_gates(num_qubits, depth):
+    gateSequence = [ 0, 3, 2, 1, 2, 1, 0, 3 ]
+    single_bit_gates = sqrtx, sqrty, sqrtw
+    gates = []
+
+    colLen = math.floor(math.sqrt(num_qubits))
+    while ((math.floor(num_qubits / colLen) * colLen) != num_qubits):
+        colLen = colLen - 1
+    rowLen = num_qubits // colLen;
+
+    lastSingleBitGates = []
+
+    for i in range(depth):
+        # Single bit gates
+        singleBitGates = []
+        for j in range(num_qubits):
+            gate = random.choice(single_bit_gates)
+            if len(lastSingleBitGates) > 0:
+                while gate == lastSingleBitGates[j]:
+                    gate = random.choice(single_bit_gates)
+            gates.append(gate(j))
+            singleBitGates.append(gate)
+
+        lastSingleBitGates = singleBitGates
+
+        gate = gateSequence[0]
+        gateSequence.pop(0)
+        gateSequence.append(gate)
+
+        for row in range(1, rowLen, 2):
+            for col in range(0, colLen):
+                tempRow = row;
+                tempCol = col;
+
+                tempRow = tempRow + (1 if (gate & 2) else -1)
+                if colLen != 1:
+                    tempCol = tempCol + (1 if (gate & 1) else 0)
+
+                if (tempRow < 0) or (tempCol < 0) or (tempRow >= rowLen) or (tempCol >= colLen):
+                    continue;
+
+                b1 = row * colLen + col;
+                b2 = tempRow * colLen + tempCol;
+
+                # Two bit gates
+                gates.append(('cp', (b1, b2), (math.pi / 6,)))
+                gates.append(('iswap', (b1, b2)))
+
+    return gates
+
+def bench(sim, depth):
+    sim.reset()
+    gates = sycamore_gates(sim.num_qubits, depth)
+    stats = census(gates, sim.num_qubits)
+    start = time.time()
+    sim.run(gates)
+    sim.measure_all()
+    return time.time() - start, stats
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=100, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--dtype', default='complex128', type=click.Choice(['complex64', 'complex128']), help='Amplitude precision')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, dtype, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    name = 'reference_sycamore' if dtype == 'complex128' else 'reference_sycamore_' + dtype
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        sim = StateVector(n + 1, dtype)
+
+        for d in range(depth):
+            # Progress counter
+            telemetry.point(num_qubits=n+1, depth=d+1)
+
+            # Run the benchmarks
+            for i in range(samples):
+                t, stats = bench(sim, d + 1)
+                write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'time': t, **census_row(stats, t)})
+
+        # Free the old width BEFORE allocating the new width
+        del sim
+
+if __name__ == '__main__':
+    benchmark()
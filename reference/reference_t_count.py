@@ -0,0 +1,190 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+import math
+
+from reference_engine import StateVector
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, census, census_row
+from benchmark_telemetry import Telemetry
+
+# Near-Clifford sweep, with the same seeded Clifford skeleton and T gate placement as qiskit/qiskit_t_count.py, as a
+# dense statevector floor.
+
+def x_to_y(gates, q):
+    gates.append(('s', (q,)))
+
+def x_to_z(gates, q):
+    gates.append(('h', (q,)))
+
+def y_to_z(gates, q):
+    gates.append(('sdg', (q,)))
+    gates.append(('h', (q,)))
+
+def y_to_x(gates, q):
+    gates.append(('sdg', (q,)))
+
+def z_to_x(gates, q):
+    gates.append(('h', (q,)))
+
+def z_to_y(gates, q):
+    gates.append(('h', (q,)))
+    gates.append(('s', (q,)))
+
+def cx(gates, q1, q2):
+    gates.append(('cx', (q1, q2)))
+
+def cy(gates, q1, q2):
+    gates.append(('cy', (q1, q2)))
+
+def cz(gates, q1, q2):
+    gates.append(('cz', (q1, q2)))
+
+def acx(gates, q1, q2):
+    gates.append(('x', (q1,)))
+    gates.append(('cx', (q1, q2)))
+
+def acy(gates, q1, q2):
+    gates.append(('x', (q1,)))
+    gates.append(('cy', (q1, q2)))
+
+def acz(gates, q1, q2):
+    gates.append(('x', (q1,)))
+    gates.append(('cz', (q1, q2)))
+
+def swap(gates, q1, q2):
+    gates.append(('swap', (q1, q2)))
+
+def ident(gates, q1, q2):
+    pass
+
+# Implementation of near-Clifford circuit
+def t_count_gates(num_qubits, depth, t_count, seed):
+    random.seed(seed)
+    single_bit_gates = x_to_y, x_to_z, y_to_z, y_to_x, z_to_x, z_to_y
+    two_bit_gates = ident, swap, cx, cz, cy, acx, acz, acy
+    gateSequence = [ 0, 3, 2, 1, 2, 1, 0, 3 ]
+    gates = []
+    colLen = math.floor(math.sqrt(num_qubits))
+    while ((math.floor(num_qubits / colLen) * colLen) != num_qubits):
+        colLen = colLen - 1
+    rowLen = num_qubits // colLen;
+
+    slots = list(range(num_qubits * depth))
+    random.shuffle(slots)
+    t_slots = set(slots[:t_count])
+
+    for i in range(depth):
+        # Single bit gates
+        for j in range(num_qubits):
+            # Random basis switch
+            gate = random.choice(single_bit_gates)
+            gate(gates, j)
+
+            # Random 1/4 increment phase change, x0 to x3
+            if random.getrandbits(1) > 0:
+                gates.append(('z', (j,)))
+            if random.getrandbits(1) > 0:
+                if random.getrandbits(1) > 0:
+                    gates.append(('s', (j,)))
+                else:
+                    gates.append(('sdg', (j,)))
+
+            # The sign is drawn for every slot, so the skeleton does not depend on t_count
+            adjoint = random.getrandbits(1) > 0
+            if (i * num_qubits + j) in t_slots:
+                if adjoint:
+                    gates.append(('tdg', (j,)))
+                else:
+                    gates.append(('t', (j,)))
+
+        gate = gateSequence[0]
+        gateSequence.pop(0)
+        gateSequence.append(gate)
+
+        for row in range(1, rowLen, 2):
+            for col in range(0, colLen):
+                tempRow = row;
+                tempCol = col;
+
+                tempRow = tempRow + (1 if (gate & 2) else -1)
+                if colLen != 1:
+                    tempCol = tempCol + (1 if (gate & 1) else 0)
+
+                if (tempRow < 0) or (tempCol < 0) or (tempRow >= rowLen) or (tempCol >= colLen):
+                    continue;
+
+                b1 = row * colLen + col;
+                b2 = tempRow * colLen + tempCol;
+
+                # Two bit gates
+                g = random.choice(two_bit_gates)
+                g(gates, b1, b2)
+
+    return gates
+
+def bench(sim, depth, t_count, seed):
+    sim.reset()
+    gates = t_count_gates(sim.num_qubits, depth, t_count, seed)
+    stats = census(gates, sim.num_qubits)
+    start = time.time()
+    sim.run(gates)
+    sim.measure_all()
+    return time.time() - start, stats
+
+# Reporting
+def create_csv(filename):
+    # The census has the t_count column, counted from the circuit
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each T count.')
+@click.option('--qubits', default=24, help='Circuit width')
+@click.option('--depth', default=20, help='Circuit depth')
+@click.option('--max-t-count', default=32, help='Largest T count to test; T counts run from 0 to this')
+@click.option('--t-step', default=1, help='Step between tested T counts')
+@click.option('--dtype', default='complex128', type=click.Choice(['complex64', 'complex128']), help='Amplitude precision')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+def benchmark(samples, qubits, depth, max_t_count, t_step, dtype, out):
+    t_counts = list(range(0, min(max_t_count, qubits * depth) + 1, t_step))
+    seeds = [random.getrandbits(32) for i in range(samples)]
+
+    name = 'reference_t_count' if dtype == 'complex128' else 'reference_t_count_' + dtype
+    writer = create_csv(out)
+
+    sim = StateVector(qubits, dtype)
+
+    telemetry = Telemetry([{ 'num_qubits': qubits, 'depth': depth, 't_count': t } for t in t_counts], samples)
+    writer = telemetry.watch(writer)
+
+    for t_count in t_counts:
+        # Progress counter
+        telemetry.point(num_qubits=qubits, depth=depth, t_count=t_count)
+
+        # Run the benchmarks
+        for seed in seeds:
+            t, stats = bench(sim, depth, t_count, seed)
+            write_csv(writer, {'name': name, 'num_qubits': qubits, 'depth': depth, 'time': t, **census_row(stats, t)})
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,174 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import math
+import sys
+
+from reference_engine import StateVector
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from circuit_census import CENSUS_HEADERS, census, census_row
+from benchmark_telemetry import Telemetry, sweep
+
+def x_to_y(gates, q):
+    gates.append(('s', (q,)))
+
+def x_to_z(gates, q):
+    gates.append(('h', (q,)))
+
+def y_to_z(gates, q):
+    gates.append(('sdg', (q,)))
+    gates.append(('h', (q,)))
+
+def y_to_x(gates, q):
+    gates.append(('sdg', (q,)))
+
+def z_to_x(gates, q):
+    gates.append(('h', (q,)))
+
+def z_to_y(gates, q):
+    gates.append(('h', (q,)))
+    gates.append(('s', (q,)))
+
+def cx(gates, q1, q2):
+    gates.append(('cx', (q1, q2)))
+
+def cy(gates, q1, q2):
+    gates.append(('cy', (q1, q2)))
+
+def cz(gates, q1, q2):
+    gates.append(('cz', (q1, q2)))
+
+def acx(gates, q1, q2):
+    gates.append(('x', (q1,)))
+    gates.append(('cx', (q1, q2)))
+    gates.append(('x', (q1,)))
+
+def acy(gates, q1, q2):
+    gates.append(('x', (q1,)))
+    gates.append(('cy', (q1, q2)))
+    gates.append(('x', (q1,)))
+
+def acz(gates, q1, q2):
+    gates.append(('x', (q1,)))
+    gates.append(('cz', (q1, q2)))
+    gates.append(('x', (q1,)))
+
+def swap(gates, q1, q2):
+    gates.append(('swap', (q1, q2)))
+
+def ident(gates, q1, q2):
+    pass
+
+# Implementation of random universal circuit, as reference engine IR
+def t_nn_gates(num_qubits, depth):
+    single_bit_gates = x_to_y, x_to_z, y_to_z, y_to_x, z_to_x, z_to_y
+    two_bit_gates = swap, ident, cx, cz, cy, acx, acz, acy
+    gateSequence = [ 0, 3, 2, 1, 2, 1, 0, 3 ]
+    gates = []
+    colLen = math.floor(math.sqrt(num_qubits))
+    while ((math.floor(num_qubits / colLen) * colLen) != num_qubits):
+        colLen = colLen - 1
+    rowLen = num_qubits // colLen;
+
+    for i in range(depth):
+        # Single bit gates
+        for j in range(num_qubits):
+            # Random basis switch
+            gate = random.choice(single_bit_gates)
+            gate(gates, j)
+            gates.append(('p', (j,), (random.uniform(0, 4 * math.pi),)))
+
+        gate = gateSequence[0]
+        gateSequence.pop(0)
+        gateSequence.append(gate)
+
+        for row in range(1, rowLen, 2):
+            for col in range(0, colLen):
+                tempRow = row;
+                tempCol = col;
+
+                tempRow = tempRow + (1 if (gate & 2) else -1)
+                if colLen != 1:
+                    tempCol = tempCol + (1 if (gate & 1) else 0)
+
+                if (tempRow < 0) or (tempCol < 0) or (tempRow >= rowLen) or (tempCol >= colLen):
+                    continue;
+
+                b1 = row * colLen + col;
+                b2 = tempRow * colLen + tempCol;
+
+                # Two bit gates
+                g = random.choice(two_bit_gates)
+                g(gates, b1, b2)
+
+    return gates
+
+def bench(sim, depth):
+    sim.reset()
+    gates = t_nn_gates(sim.num_qubits, depth)
+    stats = census(gates, sim.num_qubits)
+    start = time.time()
+    sim.run(gates)
+    sim.measure_all()
+    return time.time() - start, stats
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'time'] + CENSUS_HEADERS
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=100, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=28, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--dtype', default='complex128', type=click.Choice(['complex64', 'complex128']), help='Amplitude precision')
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, dtype, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    name = 'reference_t_nn' if dtype == 'complex128' else 'reference_t_nn_' + dtype
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), range(1, depth + 1)), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        sim = StateVector(n + 1, dtype)
+
+        for d in range(depth):
+            # Progress counter
+            telemetry.point(num_qubits=n+1, depth=d+1)
+
+            # Run the benchmarks
+            for i in range(samples):
+                t, stats = bench(sim, d + 1)
+                write_csv(writer, {'name': name, 'num_qubits': n+1, 'depth': d+1, 'time': t, **census_row(stats, t)})
+
+        # Free the old width BEFORE allocating the new width
+        del sim
+
+if __name__ == '__main__':
+    benchmark()
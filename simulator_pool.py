@@ -0,0 +1,103 @@
+#Pools of pre-allocated simulator instances, with allocation, reset and teardown timed apart from the circuit
+
+import time
+
+# Scripts in the simulator directories import this with:
+#
+#     sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+#     from simulator_pool import ...
+#
+# A pool keeps idle simulator instances per width, and a lifecycle policy decides what each sample runs on:
+#
+#   reuse: an idle instance, reset first (one is allocated only when none is idle), returned to the pool afterwards
+#   fresh: a newly allocated instance (pre-allocated by fill(), or allocated on demand), torn down afterwards
+#
+# Either way, allocation, reset and teardown happen outside the function that times the circuit, and are timed on their
+# own. An instance's allocation time is reported by the first sample that runs on it, even if fill() allocated it
+# ahead of time. The pool owns its instances: sample() lends one to a function, and keeps the only other reference, so
+# teardown (the teardown callback, if any, then dropping the last reference) measures what the destructor actually
+# costs. An instance that raised is torn down, never reused.
+
+LIFECYCLE_POLICIES = 'reuse', 'fresh'
+
+LIFECYCLE_HEADERS = ['lifecycle', 'alloc_time', 'reset_time', 'teardown_time']
+
+class SimulatorPool:
+    def __init__(self, allocate, reset=None, teardown=None, policy='reuse', size=1):
+        if policy not in LIFECYCLE_POLICIES:
+            raise ValueError('Unknown lifecycle policy: ' + policy)
+        if policy == 'reuse' and reset is None:
+            raise ValueError('The reuse policy needs a reset function')
+        self.allocate = allocate
+        self.reset = reset
+        self.teardown = teardown
+        self.policy = policy
+        self.size = size
+        self.idle = {}
+        self.last = { 'alloc_time': 0, 'reset_time': 0, 'teardown_time': 0 }
+
+    def _allocate(self, width):
+        start = time.time()
+        sim = self.allocate(width)
+        return sim, time.time() - start
+
+    def _teardown(self, held):
+        start = time.time()
+        while len(held) > 0:
+            sim = held.pop()[0]
+            if self.teardown is not None:
+                self.teardown(sim)
+            del sim
+        return time.time() - start
+
+    # Allocate idle instances of a width, up to the pool size, and return the time it took
+    def fill(self, width):
+        idle = self.idle.setdefault(width, [])
+        total = 0
+        while len(idle) < self.size:
+            sim, t = self._allocate(width)
+            idle.append((sim, t))
+            del sim
+            total += t
+        return total
+
+    # Tear down the idle instances of a width (or of every width), and return the time it took
+    def drain(self, width=None):
+        widths = list(self.idle.keys()) if width is None else [width]
+        return sum(self._teardown(self.idle.pop(w, [])) for w in widths)
+
+    # Run fn on an instance of the given width, and return its result. With retire=True, a reused instance is torn
+    # down afterwards rather than returned to the pool, so that the last sample at a width records the teardown.
+    def sample(self, width, fn, retire=False):
+        idle = self.idle.setdefault(width, [])
+        if len(idle) == 0:
+            sim, t = self._allocate(width)
+            idle.append((sim, t))
+            del sim
+
+        held = [idle.pop()]
+        alloc_time = held[0][1]
+        reset_time = 0
+        if self.policy == 'reuse':
+            start = time.time()
+            self.reset(held[0][0])
+            reset_time = time.time() - start
+
+        try:
+            result = fn(held[0][0])
+        except:
+            self.last = { 'alloc_time': alloc_time, 'reset_time': reset_time, 'teardown_time': self._teardown(held) }
+            raise
+
+        teardown_time = 0
+        if self.policy == 'reuse' and not retire:
+            idle.append((held.pop()[0], 0))
+        else:
+            teardown_time = self._teardown(held)
+        self.last = { 'alloc_time': alloc_time, 'reset_time': reset_time, 'teardown_time': teardown_time }
+
+        return result
+
+    # CSV columns for the lifecycle of the last sample
+    def lifecycle_row(self):
+        return { 'lifecycle': self.policy, **self.last }
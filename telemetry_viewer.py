@@ -0,0 +1,97 @@
+#Watch the telemetry stream of running benchmark sweeps (see benchmark_telemetry.py)
+
+import click
+import json
+import os
+import socket
+import time
+
+from benchmark_telemetry import format_eta
+
+# Run a sweep with BENCHMARK_TELEMETRY set, and point this at the same destination:
+#
+#     BENCHMARK_TELEMETRY=telemetry.jsonl python3 qiskit/qiskit_sycamore.py ... &
+#     python3 telemetry_viewer.py telemetry.jsonl
+#
+#     python3 telemetry_viewer.py udp://127.0.0.1:9999 &
+#     BENCHMARK_TELEMETRY=udp://127.0.0.1:9999 python3 qiskit/qiskit_sycamore.py ...
+#
+# One line is printed per point started, point summary (one per series of rows, such as one per simulator), failure
+# and sweep start or end, tagged with the script and its process ID, so several sweeps can share a stream. Sample
+# events are shown only with --samples.
+
+def format_point(point):
+    return ' '.join('{0}={1}'.format(k, v) for k, v in point.items())
+
+def format_event(e, show_samples):
+    tag = '[{0} {1}]'.format(e.get('script'), e.get('pid'))
+    event = e.get('event')
+    if event == 'start':
+        return '{0} started: {1} points, {2} samples each'.format(tag, len(e['plan']), e['samples'])
+    if event == 'point':
+        return '{0} {1:5.1f}% {2} (ETA {3})'.format(tag, 100 * e['progress'], format_point(e['point']), format_eta(e['eta']))
+    if event == 'summary':
+        line = '{0} {1}: {2} samples, {3} failed'.format(tag, format_point({ **e['point'], **e.get('series', {}) }), e['samples'], e['failures'])
+        if 'mean' in e:
+            line += ', mean {0:.6g}s (median {1:.6g}s, min {2:.6g}s, max {3:.6g}s)'.format(e['mean'], e['median'], e['min'], e['max'])
+        resources = e['resources']
+        line += ', {0:.1f}s wall, max RSS {1:.0f} MB, load {2:.2f}'.format(e['elapsed'], resources['max_rss_kb'] / 1024, resources['load_average'])
+        return line + ' (ETA {0})'.format(format_eta(e['eta']))
+    if event == 'failure':
+        return '{0} FAILED: {1}'.format(tag, json.dumps(e['row']))
+    if event == 'sample' and show_samples:
+        return '{0} sample: {1}'.format(tag, json.dumps(e['row']))
+    if event == 'end':
+        return '{0} finished: {1} points in {2}'.format(tag, e['points'], format_eta(e['elapsed']))
+    return None
+
+def show(line, show_samples):
+    try:
+        e = json.loads(line)
+    except ValueError:
+        return
+    text = format_event(e, show_samples)
+    if text is not None:
+        print(text, flush=True)
+
+def follow_file(path, show_samples, from_start, poll):
+    while not os.path.exists(path):
+        time.sleep(poll)
+    with open(path) as f:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        partial = ''
+        while True:
+            line = f.readline()
+            if line == '':
+                time.sleep(poll)
+                continue
+            partial += line
+            if partial.endswith('\n'):
+                show(partial, show_samples)
+                partial = ''
+
+def listen_udp(address, show_samples):
+    host, port = address.rsplit(':', 1)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, int(port)))
+    while True:
+        data, sender = sock.recvfrom(1 << 16)
+        show(data.decode(), show_samples)
+
+@click.command()
+@click.argument('source')
+@click.option('--samples', 'show_samples', default=False, help='Also print every sample')
+@click.option('--from-start', default=True, help='For a file, print the events already in it before following it')
+@click.option('--poll', default=0.5, help='Seconds between checks for new events in a file')
+def viewer(source, show_samples, from_start, poll):
+    try:
+        if source.startswith('udp://'):
+            listen_udp(source[len('udp://'):], show_samples)
+        else:
+            follow_file(source, show_samples, from_start, poll)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    viewer()
@@ -0,0 +1,271 @@
+#Adapted from https://github.com/libtangle/qcgpu/blob/master/benchmark/benchmark.py by Adam Kelly
+
+import click
+import time
+import random
+import csv
+import os.path
+import sys
+import math
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from benchmark_csv import has_header
+from benchmark_telemetry import Telemetry, sweep
+
+# Linear cross-entropy benchmarking (XEB) of the Sycamore circuit family. See https://doi.org/10.1038/s41586-019-1666-5
+#
+# Every simulator samples shots from the same Sycamore circuit, and each sample is scored against the ideal output
+# probabilities, computed here with NumPy:
+#
+#     F_XEB = 2^n * <P_ideal(x_i)>_i - 1
+#
+# F_XEB is ~1 for a faithful sampler of a deep enough random circuit, and ~0 for a uniform (or wrong) one. The
+# "_approximation" simulators apply the same gate substitutions as pyquil/pyquil_sycamore_approximation.py and
+# qcgpu/qcgpu_sycamore_approximation.py, so their rows show what those substitutions cost in fidelity.
+
+SQRTX = np.array([[1+1j, 1-1j], [1-1j, 1+1j]]) / 2
+SQRTY = np.array([[1+1j, -1-1j], [1+1j, 1+1j]]) / 2
+SQRTW = np.array([[(1-1j)/2, 1/math.sqrt(2)+0j], [1j/math.sqrt(2), (1-1j)/2]])
+H = np.array([[1, 1], [1, -1]]) / math.sqrt(2)
+CP = np.diag([1, 1, 1, np.exp(1j * math.pi / 6)])
+ISWAP = np.array([[1, 0, 0, 0], [0, 0, 1j, 0], [0, 1j, 0, 0], [0, 0, 0, 1]])
+SWAP = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
+
+MATRICES = { 'sqrtx': SQRTX, 'sqrty': SQRTY, 'sqrtw': SQRTW, 'h': H, 'cp': CP, 'iswap': ISWAP, 'swap': SWAP }
+
+# Sycamore circuit, as a list of (gate name, qubits) pairs
+def sycamore_gates(num_qubits, depth):
+    gateSequence = [ 0, 3, 2, 1, 2, 1, 0, 3 ]
+    single_bit_gates = 'sqrtx', 'sqrty', 'sqrtw'
+    gates = []
+
+    colLen = math.floor(math.sqrt(num_qubits))
+    while ((math.floor(num_qubits / colLen) * colLen) != num_qubits):
+        colLen = colLen - 1
+    rowLen = num_qubits // colLen;
+
+    lastSingleBitGates = []
+
+    for i in range(depth):
+        # Single bit gates
+        singleBitGates = []
+        for j in range(num_qubits):
+            gate = random.choice(single_bit_gates)
+            if len(lastSingleBitGates) > 0:
+                while gate == lastSingleBitGates[j]:
+                    gate = random.choice(single_bit_gates)
+            gates.append((gate, (j,)))
+            singleBitGates.append(gate)
+
+        lastSingleBitGates = singleBitGates
+
+        gate = gateSequence[0]
+        gateSequence.pop(0)
+        gateSequence.append(gate)
+
+        for row in range(1, rowLen, 2):
+            for col in range(0, colLen):
+                tempRow = row;
+                tempCol = col;
+
+                tempRow = tempRow + (1 if (gate & 2) else -1)
+                if colLen != 1:
+                    tempCol = tempCol + (1 if (gate & 1) else 0)
+
+                if (tempRow < 0) or (tempCol < 0) or (tempRow >= rowLen) or (tempCol >= colLen):
+                    continue;
+
+                b1 = row * colLen + col;
+                b2 = tempRow * colLen + tempCol;
+
+                # Two bit gates
+                gates.append(('cp', (b1, b2)))
+                gates.append(('iswap', (b1, b2)))
+
+    return gates
+
+# Ideal output distribution. Qubit q is bit q of the basis state index, and so axis (n - 1 - q) of the state tensor.
+# Multi-qubit matrices take their first qubit as the most significant.
+def ideal_probabilities(gates, num_qubits):
+    state = np.zeros((2,) * num_qubits, dtype=np.complex128)
+    state[(0,) * num_qubits] = 1
+    for name, qubits in gates:
+        k = len(qubits)
+        axes = [num_qubits - 1 - q for q in qubits]
+        matrix = MATRICES[name].reshape((2,) * (2 * k))
+        state = np.tensordot(matrix, state, axes=(list(range(k, 2 * k)), axes))
+        state = np.moveaxis(state, list(range(k)), axes)
+    probs = np.abs(state.reshape(-1)) ** 2
+    return probs / probs.sum()
+
+def linear_xeb(probs, num_qubits, samples):
+    return (2 ** num_qubits) * np.mean(probs[samples]) - 1
+
+# Samplers return an integer array of measured basis states, with qubit q as bit q
+def sample_numpy(gates, num_qubits, shots):
+    probs = ideal_probabilities(gates, num_qubits)
+    return np.random.choice(len(probs), size=shots, p=probs)
+
+def sample_qiskit(gates, num_qubits, shots, backend=None):
+    from qiskit import QuantumCircuit, execute, Aer
+    if backend is None:
+        backend = Aer.get_backend('qasm_simulator')
+    circ = QuantumCircuit(num_qubits, num_qubits)
+    for name, qubits in gates:
+        if name == 'cp':
+            circ.cp(math.pi / 6, qubits[0], qubits[1])
+        elif name == 'iswap':
+            circ.iswap(qubits[0], qubits[1])
+        else:
+            circ.unitary(MATRICES[name], [qubits[0]])
+    for j in range(num_qubits):
+        circ.measure(j, j)
+    counts = execute([circ], backend, timeout=600, shots=shots).result().get_counts()
+    return np.repeat([int(k, 2) for k in counts.keys()], list(counts.values()))
+
+def sample_qiskit_qrack(gates, num_qubits, shots):
+    from qiskit.providers.qrack import QasmSimulator
+    return sample_qiskit(gates, num_qubits, shots, backend=QasmSimulator())
+
+def sample_cirq(gates, num_qubits, shots):
+    import cirq
+    reg = cirq.LineQubit.range(num_qubits)
+    circ = cirq.Circuit()
+    for name, qubits in gates:
+        if name == 'cp':
+            circ.append(cirq.CZPowGate(exponent=1/6).on(reg[qubits[0]], reg[qubits[1]]))
+        elif name == 'iswap':
+            circ.append(cirq.ISWAP(reg[qubits[0]], reg[qubits[1]]))
+        else:
+            circ.append(cirq.MatrixGate(MATRICES[name]).on(reg[qubits[0]]))
+    circ.append(cirq.measure(*reg, key='m'))
+    bits = cirq.Simulator().run(program=circ, repetitions=shots).measurements['m']
+    return bits.astype(np.int64) @ (1 << np.arange(num_qubits, dtype=np.int64))
+
+def sample_pyqrack(gates, num_qubits, shots):
+    from pyqrack import QrackSimulator
+    sim = QrackSimulator(num_qubits)
+    for name, qubits in gates:
+        if name == 'cp':
+            sim.mcmtrx([qubits[0]], [1, 0, 0, np.exp(1j * math.pi / 6)], qubits[1])
+        elif name == 'iswap':
+            sim.iswap(qubits[0], qubits[1])
+        else:
+            sim.mtrx(list(MATRICES[name].reshape(-1)), qubits[0])
+    return np.array(sim.measure_shots(list(range(num_qubits)), shots))
+
+def sample_qcgpu_approximation(gates, num_qubits, shots):
+    import qcgpu
+    state = qcgpu.State(num_qubits)
+    for name, qubits in gates:
+        if name == 'cp':
+            state.cu1(qubits[0], qubits[1], math.pi / 6)
+        elif name == 'iswap':
+            # As qcgpu/qcgpu_sycamore_approximation.py, swap is used instead.
+            state.cx(qubits[0], qubits[1])
+            state.cx(qubits[1], qubits[0])
+            state.cx(qubits[0], qubits[1])
+        else:
+            state.apply_gate(qcgpu.Gate(MATRICES[name]), qubits[0])
+    counts = state.measure(samples=shots)
+    return np.repeat([int(k, 2) for k in counts.keys()], list(counts.values()))
+
+def sample_pyquil_approximation(gates, num_qubits, shots):
+    from pyquil import get_qc, Program
+    from pyquil.gates import SWAP, RX, RY, H, CPHASE
+    circ = []
+    for name, qubits in gates:
+        if name == 'cp':
+            circ.append(CPHASE(math.pi / 6, qubits[0], qubits[1]))
+        elif name == 'iswap':
+            # As pyquil/pyquil_sycamore_approximation.py, swap is used instead.
+            circ.append(SWAP(qubits[0], qubits[1]))
+        elif name == 'sqrtx':
+            circ.append(RX(math.pi / 2, qubits[0]))
+        elif name == 'sqrty':
+            circ.append(RY(math.pi / 2, qubits[0]))
+        else:
+            # As pyquil/pyquil_sycamore_approximation.py, H is used instead of sqrtw.
+            circ.append(H(qubits[0]))
+    qc = get_qc(str(num_qubits) + 'q-qvm')
+    bits = qc.run_and_measure(Program().inst(circ), trials=shots)
+    return sum(np.asarray(bits[q], dtype=np.int64) << q for q in range(num_qubits))
+
+samplers = {
+    'numpy': sample_numpy,
+    'qiskit': sample_qiskit,
+    'qiskit_qrack': sample_qiskit_qrack,
+    'cirq': sample_cirq,
+    'pyqrack': sample_pyqrack,
+    'qcgpu_approximation': sample_qcgpu_approximation,
+    'pyquil_approximation': sample_pyquil_approximation
+}
+
+def bench(sampler, gates, probs, num_qubits, shots):
+    start = time.time()
+    samples = sampler(gates, num_qubits, shots)
+    t = time.time() - start
+    return t, linear_xeb(probs, num_qubits, samples)
+
+# Reporting
+def create_csv(filename):
+    headers = ['name', 'num_qubits', 'depth', 'shots', 'time', 'xeb_fidelity', 'fidelity_per_second']
+    file_exists = has_header(filename, headers)
+    csvfile = open(filename, 'a')
+    writer = csv.DictWriter(csvfile, delimiter=',', lineterminator='\n',fieldnames=headers)
+
+    if not file_exists:
+        writer.writeheader()  # file doesn't exist yet, write a header
+
+    return writer
+
+def write_csv(writer, data):
+    writer.writerow(data)
+
+
+
+@click.command()
+@click.option('--samples', default=10, help='Number of samples to take for each qubit.')
+@click.option('--qubits', default=16, help='How many qubits you want to test for')
+@click.option('--depth', default=20, help='How large a circuit depth you want to test for')
+@click.option('--shots', default=10000, help='How many shots to sample from each circuit')
+@click.option('--simulators', default='numpy', help='Comma-separated simulators to score: ' + ', '.join(samplers.keys()))
+@click.option('--out', default='benchmark_data.csv', help='Where to store the CSV output of each test')
+@click.option('--single', default=False, help='Only run the benchmark for a single amount of qubits, and print an analysis')
+def benchmark(samples, qubits, depth, shots, simulators, out, single):
+    if single:
+        low = qubits - 1
+    else:
+        low = 3
+    high = qubits
+
+    names = simulators.split(',')
+    for name in names:
+        if name not in samplers:
+            raise click.BadParameter('Unknown simulator: ' + name)
+
+    writer = create_csv(out)
+
+    telemetry = Telemetry(sweep(range(low + 1, high + 1), [depth]), samples)
+    writer = telemetry.watch(writer)
+
+    for n in range(low, high):
+        for d in [depth - 1]:
+            # Progress counter
+            telemetry.point(num_qubits=n+1, depth=d+1)
+
+            # Run the benchmarks
+            for i in range(samples):
+                gates = sycamore_gates(n + 1, d + 1)
+                probs = ideal_probabilities(gates, n + 1)
+                for name in names:
+                    try:
+                        t, f = bench(samplers[name], gates, probs, n + 1, shots)
+                        write_csv(writer, {'name': 'xeb_' + name, 'num_qubits': n+1, 'depth': d+1, 'shots': shots, 'time': t, 'xeb_fidelity': f, 'fidelity_per_second': f / t})
+                    except:
+                        write_csv(writer, {'name': 'xeb_' + name, 'num_qubits': n+1, 'depth': d+1, 'shots': shots, 'time': -999, 'xeb_fidelity': -999, 'fidelity_per_second': -999})
+
+if __name__ == '__main__':
+    benchmark()